@@ -0,0 +1,167 @@
+"""
+Analysis Cache — İçerik Adresli Statik Analiz Önbelleği
+======================================================
+
+Kullanıcı aynı scripti /analyze ve /chat'e defalarca yapıştırır; her seferinde
+UnityAnalyzer.analyze(), format_analysis (CodeFixer dahil) ve lookup_for_code
+yeniden çalışıyordu. Bu sınıf sonuçları kodun sha256 özeti + sürüm anahtarıyla
+saklar:
+
+  - bellek katmanı : LRUCache (process içi, en sık yapıştırılan scriptler)
+  - SQLite katmanı : DatabaseManager.analysis_cache tablosu (opsiyonel, restart'a dayanır)
+
+Sürüm = analyzer kural seti sürümü (RULESET_VERSION) + rapor üreten modüllerin
+(code_fixer, kb_engine) kaynak özeti. Kural değişince anahtar değişir; eski
+sürümün SQLite satırları açılışta silinir.
+
+Önbellekte olmayan kod için session verilirse (konuşma / dosya anahtarı)
+UnityAnalyzer.analyze_incremental() kullanılır: aynı session'ın önceki
+analizinden değişmeyen metodların smell'leri alınır, kurallar sadece değişen
+metodlarda çalışır.
+
+lookup_for_code sonucu KB'ye bağlıdır: sadece bellek katmanında, KB
+generation'ı ile birlikte tutulur; KB reload'unda yeniden hesaplanır.
+
+Kullanım:
+    cache = AnalysisCache(db)
+    static_results = cache.static_results(code, session="user:1:Player")         # /analyze
+    static_results, analysis_text, kb_ref = cache.report(code, kb, session=...)  # /chat (KB modu)
+    cache.stats()
+"""
+
+import copy
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+import code_fixer
+from analyzer import RULESET_VERSION, UnityAnalyzer
+from code_detector import CodeDetector
+from lru_cache import LRUCache
+
+_APP_DIR = Path(__file__).resolve().parent
+
+
+def _report_version() -> str:
+    """format_analysis çıktısını belirleyen kaynakların özeti (kural seti + fixer + rapor)."""
+    digest = hashlib.sha256(RULESET_VERSION.encode())
+    for module_file in (code_fixer.__file__, _APP_DIR / "knowledge" / "kb_engine.py"):
+        try:
+            digest.update(Path(module_file).read_bytes())
+        except (OSError, TypeError):
+            pass  # paketli sürüm: kaynak yok, kural seti sürümü yeterli
+    return digest.hexdigest()[:16]
+
+
+ANALYSIS_CACHE_VERSION = _report_version()
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def script_session(user_id: int, code: str) -> str:
+    """/analyze ve workspace izleyicisinin ortak session anahtarı (kullanıcı + sınıf adı)."""
+    return f"user:{user_id}:{CodeDetector.extract_class_name(code)}"
+
+
+class AnalysisCache:
+    """Kod özeti → statik analiz sonucu; bellek LRU + opsiyonel SQLite katmanı."""
+
+    def __init__(self, db=None, maxsize: int = 256, version: str = ANALYSIS_CACHE_VERSION,
+                 max_sessions: int = 512):
+        self.version = version
+        self._db = db
+        self._memory = LRUCache(maxsize=maxsize)
+        # session → son analizin AnalysisSnapshot'ı (artımlı analiz için; sadece bellekte)
+        self._snapshots = LRUCache(maxsize=max_sessions)
+        self._lock = threading.Lock()
+        self._hits = {"memory": 0, "sqlite": 0}
+        self._misses = 0
+        self._incremental = {"runs": 0, "segments": 0, "reused_segments": 0}
+        if db is not None:
+            db.purge_analysis_cache(version)
+
+    # ── Okuma ────────────────────────────────────────────────────────────────
+    def static_results(self, code: str, session: Optional[str] = None) -> dict:
+        """UnityAnalyzer(code).analyze() sonucu (çağırana ait kopya)."""
+        _, entry = self._entry(code, session)
+        return copy.deepcopy(entry["static_results"])
+
+    def report(self, code: str, kb, session: Optional[str] = None) -> tuple[dict, str, Optional[object]]:
+        """KB modu analiz yanıtı için (static_results, format_analysis metni, lookup_for_code sonucu)."""
+        key, entry = self._entry(code, session)
+        if entry["analysis_text"] is None:
+            entry["analysis_text"] = kb.format_analysis(entry["static_results"], original_code=code)
+            self._persist(key, entry)
+        kb_ref = entry.get("kb_ref")
+        if kb_ref is None or kb_ref[0] != kb.generation:
+            kb_ref = entry["kb_ref"] = (kb.generation, kb.lookup_for_code(code))
+        return copy.deepcopy(entry["static_results"]), entry["analysis_text"], kb_ref[1]
+
+    def _entry(self, code: str, session: Optional[str] = None) -> tuple[str, dict]:
+        key = code_hash(code)
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._count("memory")
+            if session is not None and entry.get("snapshot") is not None:
+                self._snapshots.put(session, entry["snapshot"])
+            return key, entry
+        if self._db is not None:
+            stored = self._db.get_analysis_cache(key, self.version)
+            if stored is not None:
+                self._count("sqlite")
+                self._memory.put(key, stored)
+                return key, stored
+        self._count(None)
+        if session is None:
+            entry = {"static_results": UnityAnalyzer(code).analyze(), "analysis_text": None}
+        else:
+            static_results, snapshot = UnityAnalyzer(code).analyze_incremental(self._snapshots.get(session))
+            self._snapshots.put(session, snapshot)
+            self._count_incremental(snapshot)
+            entry = {"static_results": static_results, "analysis_text": None, "snapshot": snapshot}
+        self._memory.put(key, entry)
+        self._persist(key, entry)
+        return key, entry
+
+    def _persist(self, key: str, entry: dict) -> None:
+        if self._db is not None:
+            self._db.put_analysis_cache(key, self.version, entry["static_results"], entry["analysis_text"])
+
+    def _count(self, tier: Optional[str]) -> None:
+        with self._lock:
+            if tier is None:
+                self._misses += 1
+            else:
+                self._hits[tier] += 1
+
+    def _count_incremental(self, snapshot) -> None:
+        with self._lock:
+            self._incremental["runs"] += 1
+            self._incremental["segments"] += snapshot.total
+            self._incremental["reused_segments"] += snapshot.reused
+
+    # ── İstatistik ───────────────────────────────────────────────────────────
+    def clear(self) -> None:
+        """Bellek katmanını ve session snapshot'larını boşaltır (SQLite satırları sürüm değişene kadar kalır)."""
+        self._memory.clear()
+        self._snapshots.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = dict(self._hits)
+            misses = self._misses
+            incremental = dict(self._incremental)
+        total = sum(hits.values()) + misses
+        return {
+            "version": self.version,
+            "sqlite": self._db is not None,
+            "size": len(self._memory),
+            "maxsize": self._memory.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(sum(hits.values()) / total, 3) if total else 0.0,
+            "incremental": {**incremental, "sessions": len(self._snapshots)},
+        }
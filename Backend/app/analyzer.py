@@ -1,4 +1,261 @@
+import hashlib
 import re
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Optional
+
+import csharp_lexer
+from csharp_lexer import is_word_start, lex
+
+# Gövdeleri yapısal indekste önceden yerleri çıkarılan Unity callback imzaları
+CALLBACK_SIGNATURES = (
+    "void Update()",
+    "void FixedUpdate()",
+    "void LateUpdate()",
+    "void Start()",
+    "void Awake()",
+    "void OnGUI()",
+)
+
+_SIGNATURE = re.compile(r'(\w+)\s+(\w+)\(\)$')
+_WHILE = re.compile(r'while\s*\(')
+_WHITESPACE = re.compile(r'\s*')
+
+
+# ─── KURAL KAYDI ─────────────────────────────────────────────────────────────
+# Satır kuralları kapsamlarını ve derlenmiş desenlerini bildirir; motor her
+# kapsamın satırlarını bir kez dolaşır ve kapsamdaki tüm desenlerin birleşik
+# alternation'ı ile eşleşmeyen satırları kuralları hiç denemeden atlar.
+# Yapısal kurallar (gövde boşluğu, döngü sınırları, sayım) metod olarak kalır.
+# RULES sırası smell çıktısının sırasıdır.
+
+CODE_SCOPE = ()  # tüm kod satırları; aksi halde gövdesi taranan callback imzaları
+
+
+@dataclass(frozen=True)
+class LineRule:
+    """Kapsamındaki her satırda desenleri dener; eşleşen her desen bir smell üretir."""
+    name: str
+    scope: tuple
+    type: str
+    patterns: tuple                  # ((re.Pattern, mesaj), ...)
+    first_match_only: bool = False   # satır başına sadece ilk eşleşen desen
+    when: Optional[Callable] = None  # analyzer → bool; False ise kural bu script'te çalışmaz
+
+
+@dataclass(frozen=True)
+class CustomRule:
+    """Satır deseniyle ifade edilemeyen kontrol; UnityAnalyzer metodunu çağırır."""
+    name: str
+    method: str
+
+
+def _line_rule(name, scope, smell_type, patterns, **kwargs) -> LineRule:
+    return LineRule(
+        name, tuple(scope), smell_type,
+        tuple((re.compile(pattern), msg) for pattern, msg in patterns),
+        **kwargs,
+    )
+
+
+def _has_rigidbody(analyzer) -> bool:
+    return analyzer._text_flags["rigidbody"]
+
+
+_ANIMATOR_METHODS = ["SetBool", "SetFloat", "SetInteger", "SetTrigger", "GetBool", "GetFloat", "GetInteger"]
+
+RULES = (
+    # 1: Ağır Update işlemleri
+    _line_rule("heavy_update", ["void Update()"], "⚡ Performans", [
+        (r"GetComponent", "⚠️ GetComponent her karede çağrılıyor — oyunu yavaşlatır. Awake() içinde bir değişkene ata, sonra onu kullan."),
+        (r"GameObject\.Find", "⚠️ Find her karede tüm sahneyi tarar — çok yavaş. Oyuncuyu Awake'de bir kere bul ve değişkende tut."),
+        (r"FindObjectOfType", "⚠️ FindObjectOfType çok ağır bir arama yapar. Referansı Inspector'dan sürükle-bırak ile ata."),
+        (r"Object\.Instantiate", "⚠️ Update içinde sürekli obje oluşturmak belleği şişirir. Object Pooling ile önceden oluşturup tekrar kullan."),
+    ]),
+    # 2: Tag kontrolü
+    _line_rule("string_searches", CODE_SCOPE, "🔧 Düzeltme", [
+        (r'\.tag == "|\.tag\.Equals\(', "⚠️ Tag karşılaştırmasında == yerine CompareTag() kullan — daha hızlı ve yazım hatasını yakalar."),
+    ]),
+    # 3: FixedUpdate içinde Input
+    _line_rule("input_logic", ["void FixedUpdate()"], "🐛 Mantık Hatası", [
+        (r"Input\.Get", "⚠️ FixedUpdate içinde tuş kontrolü güvenilmez — bazen basışı kaçırır. Input kontrolünü Update'e taşı."),
+    ]),
+    # 4: Camera.main
+    _line_rule("camera_access", CODE_SCOPE, "⚡ Performans", [
+        (r"Camera\.main", "⚠️ Camera.main her kullanıldığında kamerayı arar. Awake'de bir değişkene ata ve onu kullan."),
+    ]),
+    # 5: Public field (method / static / class bildirimleri hariç)
+    _line_rule("public_fields", CODE_SCOPE, "💡 Öneri", [
+        (r"^\s*public (?!.*(?:void |static |class |\())", "💡 Bu değişken public — dışarıdan herkes değiştirebilir. [SerializeField] private yaparak Inspector'dan ayarlanabilir ama güvende tut."),
+    ]),
+    # 6: Destroy kullanımı
+    CustomRule("destroy_usage", "_check_destroy_usage"),
+    # 7: Fizik yanlış kullanımı (Rigidbody varken transform ile hareket)
+    _line_rule("physics_misuse", CODE_SCOPE, "🎯 Fizik", [
+        (r"^(?!.*Distance)(?=.*=).*transform\.position", "⚠️ Rigidbody varken transform.position ile hareket fizik motorunu atlar. rb.MovePosition veya rb.velocity kullan."),
+        (r"transform\.Translate", "⚠️ Rigidbody varken Translate kullanmak çarpışmaları bozar. Rigidbody ile hareket ettir."),
+    ], first_match_only=True, when=_has_rigidbody),
+    # 8: Boş callback
+    CustomRule("empty_callbacks", "_check_empty_callbacks"),
+    # 9: SendMessage
+    _line_rule("send_message", CODE_SCOPE, "⚡ Performans", [
+        (r"SendMessage\(|BroadcastMessage\(|SendMessageUpwards\(", "⚠️ SendMessage reflection kullanır — yavaş ve yazım hatası sessizce geçer. Doğrudan referans veya C# event/delegate kullan."),
+    ]),
+    # 10: OnGUI kullanımı
+    CustomRule("ongui_usage", "_check_ongui_usage"),
+    # 11: Update içinde string birleştirme
+    _line_rule("string_concat_in_update", ["void Update()"], "⚡ Performans", [
+        (r'\".*\"\s*\+\s*|\+\s*\".*\"', "⚠️ Update içinde string birleştirme her karede yeni string oluşturur (GC baskısı). StringBuilder veya önbellek kullan."),
+    ]),
+    # 12: Önbelleksiz WaitForSeconds
+    CustomRule("uncached_waitforseconds", "_check_uncached_waitforseconds"),
+    # 13: Update içinde Vector3.Distance
+    _line_rule("distance_in_update", ["void Update()", "void FixedUpdate()"], "⚡ Performans", [
+        (r"Vector3\.Distance|Vector2\.Distance", "⚠️ Distance() karekök hesaplar, her karede pahalıdır. Mesafe karşılaştırması için `(a - b).sqrMagnitude < range * range` kullan."),
+    ]),
+    # 14: Animator string parametreleri
+    _line_rule("animator_string_params", CODE_SCOPE, "⚡ Performans", [
+        (re.escape(method) + r"\([\"']", f"⚠️ `{method}(\"string\")` her çağrıda hash hesaplar. `Animator.StringToHash()` ile bir kere hesapla ve int olarak kullan.")
+        for method in _ANIMATOR_METHODS
+    ], first_match_only=True),
+    # 15: Update içinde AddComponent
+    _line_rule("addcomponent_in_update", ["void Update()"], "⚡ Performans", [
+        (r"AddComponent", "⚠️ Update içinde AddComponent çok ağır — her karede yeni component eklemek belleği şişirir. Awake/Start'ta ekle veya Object Pooling kullan."),
+    ]),
+)
+
+
+def _group_scopes(rules) -> dict:
+    """Kapsam → (kurallar, birleşik ön-filtre regex'i); kapsamlar ilk görüldükleri sırada."""
+    grouped: dict = {}
+    for rule in rules:
+        if isinstance(rule, LineRule):
+            grouped.setdefault(rule.scope, []).append(rule)
+    return {
+        scope: (scope_rules, re.compile("|".join(
+            f"(?:{pattern.pattern})" for rule in scope_rules for pattern, _ in rule.patterns
+        )))
+        for scope, scope_rules in grouped.items()
+    }
+
+
+_SCOPES = _group_scopes(RULES)
+
+
+def _scope_label(scope: tuple) -> str:
+    return "+".join(_SIGNATURE.match(sig).group(2) for sig in scope) if scope else "code"
+
+
+class RuleStats:
+    """
+    Kural başına kümülatif süre ve hit (smell) sayısı; kapsam başına tarama süresi.
+
+    Her analyze() kendi ölçümlerini yerel toplar ve sonunda tek seferde kilit
+    altında birleştirir. Sayaçlar process ömrü boyunca birikir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._analyses = 0
+        self._rules: dict = {}    # ad → [çalışma, hit, toplam saniye]
+        self._scopes: dict = {}   # kapsam → [tarama, satır, toplam saniye]
+
+    def merge(self, rule_times: dict, rule_hits: dict, scope_stats: dict) -> None:
+        with self._lock:
+            self._analyses += 1
+            for name, elapsed in rule_times.items():
+                entry = self._rules.setdefault(name, [0, 0, 0.0])
+                entry[0] += 1
+                entry[1] += rule_hits.get(name, 0)
+                entry[2] += elapsed
+            for label, (lines, elapsed) in scope_stats.items():
+                entry = self._scopes.setdefault(label, [0, 0, 0.0])
+                entry[0] += 1
+                entry[1] += lines
+                entry[2] += elapsed
+
+    def snapshot(self) -> dict:
+        """Kurallar toplam süreye göre azalan sırada — yavaş kurallar başta."""
+        with self._lock:
+            rules = {
+                name: {
+                    "runs": runs,
+                    "hits": hits,
+                    "total_ms": round(total * 1000, 3),
+                    "avg_ms": round(total * 1000 / runs, 4) if runs else 0.0,
+                }
+                for name, (runs, hits, total) in sorted(self._rules.items(), key=lambda kv: -kv[1][2])
+            }
+            scopes = {
+                label: {"passes": passes, "lines": lines, "total_ms": round(total * 1000, 3)}
+                for label, (passes, lines, total) in self._scopes.items()
+            }
+            return {"analyses": self._analyses, "rules": rules, "scopes": scopes}
+
+
+RULE_STATS = RuleStats()
+
+
+# Kural kaydıyla ifade edilmeyen davranış değişikliklerinde (yapısal kural
+# metodları, lexer) elle artırılır; kaynak dosyaları okunamayan paketli
+# sürümde (PyInstaller) bu değişiklikleri sürüme taşıyan tek işarettir.
+_RULESET_REVISION = 1
+
+
+def _rule_signature(rule) -> str:
+    if isinstance(rule, CustomRule):
+        return f"custom:{rule.name}:{rule.method}"
+    patterns = "\x1f".join(f"{pattern.pattern}\x1e{msg}" for pattern, msg in rule.patterns)
+    when = getattr(rule.when, "__name__", "")
+    return f"line:{rule.name}:{rule.scope}:{rule.type}:{rule.first_match_only}:{when}:{patterns}"
+
+
+def _ruleset_version() -> str:
+    """
+    Kural seti sürümü: kural kaydı + _RULESET_REVISION (+ okunabiliyorsa kaynaklar).
+
+    Kural, kapsam veya yapısal indeks değişikliği sürümü değiştirir; analiz
+    sonuçlarını saklayan önbellekler (analysis_cache.py) bunu anahtarına katar.
+    Paketli sürümde .py kaynakları olmayabilir; o zaman yalnızca kayıt özeti
+    ve revizyon kullanılır.
+    """
+    digest = hashlib.sha256(f"rev:{_RULESET_REVISION}".encode())
+    for signature in CALLBACK_SIGNATURES:
+        digest.update(signature.encode())
+    for rule in RULES:
+        digest.update(_rule_signature(rule).encode())
+    for module_file in (__file__, csharp_lexer.__file__):
+        try:
+            digest.update(Path(module_file).read_bytes())
+        except (OSError, TypeError):
+            pass
+    return digest.hexdigest()[:16]
+
+
+RULESET_VERSION = _ruleset_version()
+
+
+@dataclass
+class AnalysisSnapshot:
+    """
+    analyze_incremental() çıktısı: bir sonraki analizde yeniden kullanılacak segmentler.
+
+    segments: segment özeti → [(başlangıç satırı, {kural adı: [smell]})] (aynı metinli
+    segmentler dosya sırasıyla). context farklıysa (ör. Rigidbody eklendi) önceki
+    sonuçlar kullanılmaz.
+    """
+    context: tuple
+    segments: dict = field(default_factory=dict)
+    total: int = 0      # bu analizdeki segment sayısı
+    reused: int = 0     # önceki analizden kaydırılarak alınan segment sayısı
+
 
 class UnityAnalyzer:
     """Unity scriptlerini analiz eden motor."""
@@ -6,170 +263,358 @@ class UnityAnalyzer:
     def __init__(self, code: str):
         self.code = code
         self.lines = code.split('\n')
+        # imza seti → [MethodSpan]
+        self._span_cache = {}
 
     def analyze(self):
-        smells = []
-        # 15 kontrol
-        smells.extend(self._check_heavy_update())
-        smells.extend(self._check_string_searches())
-        smells.extend(self._check_input_logic())
-        smells.extend(self._check_camera_access())
-        smells.extend(self._check_public_fields())
-        smells.extend(self._check_destroy_usage())
-        smells.extend(self._check_physics_misuse())
-        smells.extend(self._check_empty_callbacks())
-        smells.extend(self._check_send_message())
-        smells.extend(self._check_ongui_usage())
-        smells.extend(self._check_string_concat_in_update())
-        smells.extend(self._check_uncached_waitforseconds())
-        smells.extend(self._check_distance_in_update())
-        smells.extend(self._check_animator_string_params())
-        smells.extend(self._check_addcomponent_in_update())
-
-        # Her smell'e gerçek kod satırını ekle (format_analysis somut fix gösterebilsin)
-        for smell in smells:
-            line_num = smell.get("line")
-            if isinstance(line_num, int) and 0 < line_num <= len(self.lines):
-                smell["code"] = self.lines[line_num - 1].strip()
+        result, _ = self._analyze(None, keep_snapshot=False)
+        return result
 
+    def iter_smells(self):
+        """
+        analyze() ile aynı smell'leri bulundukları anda yield eder ("code" eklenmiş).
+
+        Sıra kural sırası değil tarama sırasıdır: önce tüm kod satırlarındaki
+        kurallar — satırlar lexer'dan akarken, dosyanın tamamı maskelenmeden —
+        sonra callback gövdeleri ve yapısal kurallar. Kural başına liste ve
+        snapshot tutulmaz; tüketici erken bırakırsa kalan kurallar çalışmaz.
+
+        Koşullu kuralların ve stats()'ın metin bayrakları akış sırasında toplanır.
+        Yapısal kurallar için tam LexedSource yine kurulur, ama lex() önbelleğine
+        girmez: analyzer ile birlikte serbest kalır.
+        """
+        rule_times, rule_hits, scope_stats = {}, {}, {}
+        try:
+            for name, smell in self._iter_rules(None, rule_times, scope_stats, stream=True):
+                rule_hits[name] = rule_hits.get(name, 0) + 1
+                yield self._with_code(smell)
+        finally:
+            RULE_STATS.merge(rule_times, rule_hits, scope_stats)
+
+    def stats(self) -> dict:
+        """analyze()["stats"]; iter_smells() tüketildikten sonra ek tarama gerektirmez."""
         return {
-            "smells": smells,
-            "stats": {
-                "total_lines": len(self.lines),
-                "class_name": self._extract_class_name(),
-                "has_update": "Update()" in self.code
-            }
+            "total_lines": len(self.lines),
+            "class_name": self._extract_class_name(),
+            "has_update": self._text_flags["update"]
         }
 
-    def _is_commented(self, line: str):
-        return line.strip().startswith("//") or line.strip().startswith("/*")
+    def analyze_incremental(self, previous: Optional[AnalysisSnapshot] = None):
+        """
+        analyze() ile aynı sonucu üretir; değişmeyen metodların smell'lerini previous'tan alır.
 
-    def _extract_class_name(self):
-        match = re.search(r'class\s+(\w+)', self.code)
-        return match.group(1) if match else "UnknownScript"
+        Script segmentlere ayrılır: üst düzey metodlar (bildirim satırından kapanış
+        satırına) ve aralarındaki bloklar. Segment özeti yorumları maskelenmiş
+        metinden hesaplanır; önceki analizde aynı özetli segment varsa smell'leri
+        satır farkı kadar kaydırılarak kullanılır, kurallar sadece değişen
+        segmentlerin satırlarında çalışır. Dönüş: (sonuç, yeni snapshot).
+        """
+        return self._analyze(previous, keep_snapshot=True)
 
-    # ─── ORTAK HELPER: Metod gövdesindeki satırları döner ───
-    def _iter_method_body(self, method_signatures):
+    def _analyze(self, previous, keep_snapshot):
+        segments = self._segments() if keep_snapshot else []
+        context = self._context()
+        reused, dirty = {}, None
+        if previous is not None and previous.context == context:
+            pool = {digest: list(entries) for digest, entries in previous.segments.items()}
+            dirty = set()
+            for index, (start, end, digest) in enumerate(segments):
+                entries = pool.get(digest)
+                if entries:
+                    old_start, by_rule = entries.pop(0)
+                    reused[index] = (start - old_start, by_rule)
+                else:
+                    dirty.update(range(start, end + 1))
+
+        rule_smells, rule_times, scope_stats = self._run_rules(dirty)
+        RULE_STATS.merge(rule_times, {name: len(found) for name, found in rule_smells.items()}, scope_stats)
+        if reused:
+            for delta, by_rule in reused.values():
+                for name, found in by_rule.items():
+                    rule_smells.setdefault(name, []).extend({**smell, "line": smell["line"] + delta} for smell in found)
+            # Kural içi sıra tam analizle aynı: satır sırası (aynı satırdakiler tek segmentten gelir)
+            for found in rule_smells.values():
+                found.sort(key=lambda smell: smell["line"] if isinstance(smell["line"], int) else -1)
+
+        snapshot = None
+        if keep_snapshot:
+            snapshot = self._snapshot(context, segments, rule_smells)
+            snapshot.reused = len(reused)
+
+        smells = [self._with_code(smell) for rule in RULES for smell in rule_smells.get(rule.name, ())]
+        return {"smells": smells, "stats": self.stats()}, snapshot
+
+    def _with_code(self, smell: dict) -> dict:
+        # Smell'e gerçek kod satırını ekle (format_analysis somut fix gösterebilsin)
+        line_num = smell.get("line")
+        if isinstance(line_num, int) and 0 < line_num <= len(self.lines):
+            smell["code"] = self.lines[line_num - 1].strip()
+        return smell
+
+    # ─── ARTIMLI ANALİZ: segmentler ───
+    def _context(self) -> tuple:
+        """Segment dışı durumdan etkilenen kural koşulları; değişirse hiçbir segment yeniden kullanılmaz."""
+        return (RULESET_VERSION,) + tuple(
+            rule.when(self) for rule in RULES if isinstance(rule, LineRule) and rule.when is not None
+        )
+
+    def _segments(self):
+        """
+        Tüm satırları kapsayan [(başlangıç, bitiş, özet)] listesi (0-based, dahil).
+        Üst düzey metodlar kendi segmentidir; aynı satırı paylaşan metodlar birleşir.
         """
-        Verilen metod imzalarının gövdesindeki satırları yield eder.
-        Allman style (açık parantez ayrı satırda) destekler.
+        src = self._src
+        spans = []
+        for method in src.methods:
+            if spans and method.open < spans[-1][2]:
+                continue  # iç içe metod (local function) dış metodun segmentinde
+            start, end = src.line_of(method.decl), src.line_of(method.close)
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]), method.close)
+            else:
+                spans.append((start, end, method.close))
 
-        Kullanım:
-            for i, line in self._iter_method_body(["void Update()", "void LateUpdate()"]):
-                # i = satır indexi (0-based), line = satır metni
+        bounds = []
+        cursor = 0
+        for start, end, _ in spans:
+            if start > cursor:
+                bounds.append((cursor, start - 1))
+            bounds.append((start, end))
+            cursor = end + 1
+        if cursor < len(self.lines):
+            bounds.append((cursor, len(self.lines) - 1))
+
+        code_lines = src.code_lines
+        return [
+            (start, end, hashlib.blake2b("\n".join(code_lines[start:end + 1]).encode("utf-8", "surrogatepass"),
+                                         digest_size=16).digest())
+            for start, end in bounds
+        ]
+
+    def _snapshot(self, context, segments, rule_smells) -> AnalysisSnapshot:
+        starts = [start for start, _, _ in segments]
+        buckets = [{} for _ in segments]
+        for name, found in rule_smells.items():
+            for smell in found:
+                line = smell["line"]
+                if not isinstance(line, int):
+                    continue  # "Genel" smell'ler (Destroy sayısı) her analizde yeniden hesaplanır
+                index = bisect_right(starts, line - 1) - 1
+                stored = {key: value for key, value in smell.items() if key != "code"}
+                buckets[index].setdefault(name, []).append(stored)
+        snapshot = AnalysisSnapshot(context, total=len(segments))
+        for (start, _, digest), by_rule in zip(segments, buckets):
+            snapshot.segments.setdefault(digest, []).append((start, by_rule))
+        return snapshot
+
+    @staticmethod
+    def rule_metrics() -> dict:
+        """Kural başına kümülatif süre / hit sayıları (process geneli)."""
+        return RULE_STATS.snapshot()
+
+    # ─── KURAL MOTORU ───
+    def _run_rules(self, dirty=None):
+        """
+        Tüm kuralları çalıştırır: (kural → smell listesi, kural → saniye, kapsam → (satır, saniye)).
+        dirty verilirse (0-based satır seti) sadece bu satırlar ve bildirimi bu satırlarda
+        olan metodlar değerlendirilir; satırsız ("Genel") smell'ler her zaman hesaplanır.
+        """
+        rule_smells, rule_times, scope_stats = {}, {}, {}
+        for name, smell in self._iter_rules(dirty, rule_times, scope_stats):
+            rule_smells.setdefault(name, []).append(smell)
+        for name in rule_times:
+            rule_smells.setdefault(name, [])
+        return rule_smells, rule_times, scope_stats
+
+    def _iter_rules(self, dirty, rule_times, scope_stats, stream=False):
+        """
+        (kural adı, smell) çiftlerini bulundukça yield eder; süreleri rule_times /
+        scope_stats'a yazar (tüketicide geçen süre sayılmaz).
+
+        Satır kuralları kapsam başına tek geçişte değerlendirilir. Birleşik ön-filtre
+        eşleşmeyen satırlar atlanır; eşleşen satırda her kural kendi desenlerini
+        sırayla dener (smell sırası kural başına satır, satır içinde desen sırasıdır).
 
-        Mantık:
-            1. Metod imzası bulunca "bekleme" moduna geç
-            2. İlk '{' görünce brace_depth sayacını başlat
-            3. brace_depth tekrar 0'a düşünce metod bitti
+        stream=True: kod kapsamı ilk sırada ve iter_code_lines üzerinden taranır.
+        Koşullu (when) kuralların koşulu tüm metne bakar; smell'leri geçiş bitene
+        kadar bekletilir, koşul sağlanmazsa atılır.
         """
-        waiting_for_brace = False
-        in_method = False
-        brace_depth = 0
-
-        for i, line in enumerate(self.lines):
-            # Yeni metod imzası bul
-            if not in_method and not waiting_for_brace:
-                for sig in method_signatures:
-                    if sig in line:
-                        # İmza satırında { varsa direkt gir
-                        if "{" in line:
-                            in_method = True
-                            brace_depth = line.count("{") - line.count("}")
-                        else:
-                            waiting_for_brace = True
-                        break
+        scopes = list(_SCOPES.items())
+        if stream:
+            scopes.sort(key=lambda item: item[0] != CODE_SCOPE)
+        for scope, (scope_rules, prefilter) in scopes:
+            if stream and scope == CODE_SCOPE:
+                lines = self.code_lines if "_src" in self.__dict__ else self._stream_code_lines()
+                held = {rule.name: [] for rule in scope_rules if rule.when is not None}
+                for name, smell in self._scan_scope(scope, scope_rules, prefilter, lines, rule_times, scope_stats):
+                    if name in held:
+                        held[name].append(smell)
+                    else:
+                        yield name, smell
+                for rule in scope_rules:
+                    if rule.name not in held:
+                        continue
+                    if rule.when(self):
+                        for smell in held[rule.name]:
+                            yield rule.name, smell
+                    else:
+                        del rule_times[rule.name]
+                if "_src" not in self.__dict__:
+                    self._src = csharp_lexer.LexedSource(self.code)
                 continue
 
-            # İmza bulundu, ilk '{' bekleniyor (Allman style)
-            if waiting_for_brace:
-                if "{" in line:
-                    in_method = True
-                    waiting_for_brace = False
-                    brace_depth = line.count("{") - line.count("}")
+            active = [rule for rule in scope_rules if rule.when is None or rule.when(self)]
+            if not active:
                 continue
+            if scope != CODE_SCOPE:
+                lines = self._iter_method_body(scope, dirty)
+            elif dirty is None:
+                lines = self.code_lines
+            else:
+                lines = [(i, line) for i, line in self.code_lines if i in dirty]
+            yield from self._scan_scope(scope, active, prefilter, lines, rule_times, scope_stats)
 
-            # Metod gövdesindeyiz
-            if in_method:
-                brace_depth += line.count("{") - line.count("}")
-                if not self._is_commented(line):
-                    yield i, line
-                if brace_depth <= 0:
-                    in_method = False
+        for rule in RULES:
+            if isinstance(rule, CustomRule):
+                rule_start = perf_counter()
+                found = getattr(self, rule.method)()
+                if dirty is not None:
+                    found = [s for s in found if not isinstance(s["line"], int) or s["line"] - 1 in dirty]
+                rule_times[rule.name] = perf_counter() - rule_start
+                for smell in found:
+                    yield rule.name, smell
 
-    # ─── 1: AĞIR UPDATE İŞLEMLERİ ───
-    def _check_heavy_update(self):
-        smells = []
-        patterns = {
-            r"GetComponent": "⚠️ GetComponent her karede çağrılıyor — oyunu yavaşlatır. Awake() içinde bir değişkene ata, sonra onu kullan.",
-            r"GameObject\.Find": "⚠️ Find her karede tüm sahneyi tarar — çok yavaş. Oyuncuyu Awake'de bir kere bul ve değişkende tut.",
-            r"FindObjectOfType": "⚠️ FindObjectOfType çok ağır bir arama yapar. Referansı Inspector'dan sürükle-bırak ile ata.",
-            r"Object\.Instantiate": "⚠️ Update içinde sürekli obje oluşturmak belleği şişirir. Object Pooling ile önceden oluşturup tekrar kullan.",
-        }
-        for i, line in self._iter_method_body(["void Update()"]):
-            for pattern, msg in patterns.items():
-                if re.search(pattern, line):
-                    smells.append({"line": i + 1, "type": "⚡ Performans", "msg": msg})
-        return smells
+    @staticmethod
+    def _scan_scope(scope, rules, prefilter, lines, rule_times, scope_stats):
+        times = dict.fromkeys((rule.name for rule in rules), 0.0)
+        scanned, paused = 0, 0.0
+        scope_start = perf_counter()
+        for i, line in lines:
+            scanned += 1
+            if not prefilter.search(line):
+                continue
+            hits = []
+            for rule in rules:
+                rule_start = perf_counter()
+                for pattern, msg in rule.patterns:
+                    if pattern.search(line):
+                        hits.append((rule.name, {"line": i + 1, "type": rule.type, "msg": msg}))
+                        if rule.first_match_only:
+                            break
+                times[rule.name] += perf_counter() - rule_start
+            if hits:
+                yield_start = perf_counter()
+                yield from hits
+                paused += perf_counter() - yield_start
+        scope_stats[_scope_label(scope)] = (scanned, perf_counter() - scope_start - paused)
+        rule_times.update(times)
 
-    # ─── 2: TAG KONTROLÜ ───
-    def _check_string_searches(self):
-        smells = []
-        for i, line in enumerate(self.lines):
-            if not self._is_commented(line):
-                if '.tag == "' in line or '.tag.Equals(' in line:
-                    smells.append({
-                        "line": i + 1,
-                        "type": "🔧 Düzeltme",
-                        "msg": "⚠️ Tag karşılaştırmasında == yerine CompareTag() kullan — daha hızlı ve yazım hatasını yakalar."
-                    })
-        return smells
+    def _extract_class_name(self):
+        classes = self._src.classes
+        return classes[0].name if classes else "UnknownScript"
 
-    # ─── 3: FIXEDUPDATE İÇİNDE INPUT ───
-    def _check_input_logic(self):
-        smells = []
-        for i, line in self._iter_method_body(["void FixedUpdate()"]):
-            if "Input.Get" in line:
-                smells.append({
-                    "line": i + 1,
-                    "type": "🐛 Mantık Hatası",
-                    "msg": "⚠️ FixedUpdate içinde tuş kontrolü güvenilmez — bazen basışı kaçırır. Input kontrolünü Update'e taşı."
-                })
-        return smells
+    # ─── YAPISAL İNDEKS: Tüm kontrollerin paylaştığı tek geçiş ───
+    # Ortak lexer çıktısından (csharp_lexer.lex) ilk erişimde kurulur; iter_smells()
+    # kod satırı kurallarını lex beklemeden çalıştırabilsin diye __init__'te değil.
+    # Yorum, string ve verbatim string içindeki parantezler lexer'da maskelendiği
+    # için gövde sınırları gerçek parantezlerden gelir; blok yorum içindeki kod
+    # hiçbir kontrole girmez.
+    @cached_property
+    def _src(self):
+        return lex(self.code)
 
-    # ─── 4: CAMERA.MAIN ───
-    def _check_camera_access(self):
-        smells = []
-        for i, line in enumerate(self.lines):
-            if "Camera.main" in line and not self._is_commented(line):
-                smells.append({
-                    "line": i + 1,
-                    "type": "⚡ Performans",
-                    "msg": "⚠️ Camera.main her kullanıldığında kamerayı arar. Awake'de bir değişkene ata ve onu kullan."
-                })
-        return smells
+    @cached_property
+    def _text_flags(self):
+        """Tüm kod metnine (yorumlar hariç) bakan koşullar: Rigidbody ve Update() geçiyor mu."""
+        code = self._src.code_text
+        return {"rigidbody": "Rigidbody" in code or "rigidbody" in code, "update": "Update()" in code}
 
-    # ─── 5: PUBLIC FIELD ───
-    def _check_public_fields(self):
-        smells = []
-        for i, line in enumerate(self.lines):
-            stripped = line.strip()
-            if not self._is_commented(line) and stripped.startswith("public "):
-                if "void " not in stripped and "static " not in stripped and "class " not in stripped and "(" not in stripped:
-                    smells.append({
-                        "line": i + 1,
-                        "type": "💡 Öneri",
-                        "msg": "💡 Bu değişken public — dışarıdan herkes değiştirebilir. [SerializeField] private yaparak Inspector'dan ayarlanabilir ama güvende tut."
-                    })
-        return smells
+    def _stream_code_lines(self):
+        """iter_code_lines akışı; geçerken _text_flags'i satırlardan toplar."""
+        rigidbody = update = False
+        for i, line in csharp_lexer.iter_code_lines(self.code):
+            rigidbody = rigidbody or "Rigidbody" in line or "rigidbody" in line
+            update = update or "Update()" in line
+            yield i, line
+        self._text_flags = {"rigidbody": rigidbody, "update": update}
+
+    @cached_property
+    def code_lines(self):
+        """Kod içeren satırlar [(index, yorumları maskelenmiş satır)]."""
+        src = self._src
+        return [(i, line) for i, line in enumerate(src.code_lines) if src.has_code[i]]
+
+    @cached_property
+    def signature_lines(self):
+        """Callback imzası → bildirimin bulunduğu satır indexleri."""
+        src = self._src
+        signature_lines = {sig: [] for sig in CALLBACK_SIGNATURES}
+        for method in src.methods:
+            sig = f"{method.return_type} {method.name}()"
+            if sig in signature_lines and not method.params.strip():
+                signature_lines[sig].append(src.line_of(method.decl))
+        return signature_lines
+
+    @cached_property
+    def class_spans(self):
+        """[(sınıf adı, '{' satırı, '}' satırı)] (0-based, dahil)."""
+        src = self._src
+        return [(cls.name, src.line_of(cls.open), src.line_of(cls.close)) for cls in src.classes]
+
+    def _methods(self, method_signatures):
+        """
+        İmza setine uyan metodlar, dosya sırasıyla.
+
+        Seçilen bir gövdenin içinde kalan metodlar (local function) ayrıca dönmez;
+        gövdeleri zaten dış metodla birlikte taranır. Sonuç imza seti başına önbelleklenir.
+        """
+        key = tuple(method_signatures)
+        methods = self._span_cache.get(key)
+        if methods is not None:
+            return methods
+        wanted = set()
+        for sig in key:
+            match = _SIGNATURE.match(sig)
+            if match:
+                wanted.add(match.groups())
+        methods = []
+        next_free = 0
+        for method in self._src.methods:
+            if method.open < next_free or method.params.strip():
+                continue
+            if (method.return_type, method.name) in wanted:
+                methods.append(method)
+                next_free = method.close
+        self._span_cache[key] = methods
+        return methods
+
+    def _method_spans(self, method_signatures):
+        """İmza setinin gövde span'ları: [('{' satırı, '}' satırı)] (0-based, dahil)."""
+        line_of = self._src.line_of
+        return [(line_of(m.open), line_of(m.close)) for m in self._methods(method_signatures)]
+
+    # ─── ORTAK HELPER: Metod gövdesindeki satırları döner ───
+    def _iter_method_body(self, method_signatures, only_lines=None):
+        """
+        Verilen metod imzalarının gövdesindeki kod satırlarını yield eder.
+        Allman style ve tek satırlık gövdeler ('void Update() { ... }') desteklenir.
+
+        Kullanım:
+            for i, line in self._iter_method_body(["void Update()", "void LateUpdate()"]):
+                # i = satır indexi (0-based), line = satırın gövdeye düşen kısmı
+
+        Gövdeler yapısal indeksten gelir (_methods); dosya yeniden taranmaz.
+        only_lines verilirse bildirim satırı bu sette olmayan metodlar atlanır.
+        """
+        src = self._src
+        for method in self._methods(method_signatures):
+            if only_lines is None or src.line_of(method.decl) in only_lines:
+                yield from src.body_lines(method.open, method.close)
 
     # ─── 6: DESTROY KULLANIMI ───
     def _check_destroy_usage(self):
         smells = []
-        destroy_count = sum(
-            1 for line in self.lines
-            if not self._is_commented(line) and "Destroy(" in line
-        )
+        destroy_count = sum(1 for _, line in self.code_lines if "Destroy(" in line)
         if destroy_count >= 2:
             smells.append({
                 "line": "Genel",
@@ -178,152 +623,60 @@ class UnityAnalyzer:
             })
         return smells
 
-    # ─── 7: FİZİK YANLIŞ KULLANIMI ───
-    def _check_physics_misuse(self):
-        smells = []
-        has_rigidbody = "Rigidbody" in self.code or "rigidbody" in self.code or "GetComponent<Rigidbody>" in self.code
-
-        if has_rigidbody:
-            for i, line in enumerate(self.lines):
-                if not self._is_commented(line):
-                    if "transform.position" in line and "=" in line and "Distance" not in line:
-                        smells.append({
-                            "line": i + 1,
-                            "type": "🎯 Fizik",
-                            "msg": "⚠️ Rigidbody varken transform.position ile hareket fizik motorunu atlar. rb.MovePosition veya rb.velocity kullan."
-                        })
-                    elif "transform.Translate" in line:
-                        smells.append({
-                            "line": i + 1,
-                            "type": "🎯 Fizik",
-                            "msg": "⚠️ Rigidbody varken Translate kullanmak çarpışmaları bozar. Rigidbody ile hareket ettir."
-                        })
-        return smells
-
     # ─── 8: BOŞ CALLBACK ───
     def _check_empty_callbacks(self):
         """Boş Update/Start/FixedUpdate performansı boşa harcar."""
         smells = []
         callbacks = ["void Update()", "void Start()", "void FixedUpdate()", "void LateUpdate()", "void Awake()"]
-        for i, line in enumerate(self.lines):
-            stripped = line.strip()
-            for cb in callbacks:
-                if cb in stripped and not self._is_commented(line):
-                    body_lines = []
-                    for j in range(i + 1, min(i + 5, len(self.lines))):
-                        s = self.lines[j].strip()
-                        if s == "{" or s == "}" or s == "":
-                            body_lines.append(s)
-                        else:
-                            break
-                    content = "".join(body_lines).replace(" ", "")
-                    if content == "{}":
-                        smells.append({
-                            "line": i + 1,
-                            "type": "⚡ Performans",
-                            "msg": f"⚠️ `{cb.split('void ')[1]}` boş tanımlanmış — Unity her karede çağırır ama hiçbir iş yapmıyor. Sil veya kullanana kadar yorum satırına al."
-                        })
-        return smells
-
-    # ─── 9: SENDMESSAGE ───
-    def _check_send_message(self):
-        """SendMessage yavaş ve tip güvenliği yok."""
-        smells = []
-        for i, line in enumerate(self.lines):
-            if not self._is_commented(line):
-                if "SendMessage(" in line or "BroadcastMessage(" in line or "SendMessageUpwards(" in line:
-                    smells.append({
-                        "line": i + 1,
-                        "type": "⚡ Performans",
-                        "msg": "⚠️ SendMessage reflection kullanır — yavaş ve yazım hatası sessizce geçer. Doğrudan referans veya C# event/delegate kullan."
-                    })
-        return smells
-
-    # ─── 10: ONGUI KULLANIMI ───
-    def _check_ongui_usage(self):
-        """OnGUI legacy sistem, her karede birden fazla çağrılır."""
-        smells = []
-        for i, line in enumerate(self.lines):
-            if "void OnGUI()" in line and not self._is_commented(line):
+        src = self._src
+        for method in self._methods(callbacks):
+            if src.is_empty_body(method.open, method.close):
                 smells.append({
-                    "line": i + 1,
+                    "line": src.line_of(method.decl) + 1,
                     "type": "⚡ Performans",
-                    "msg": "⚠️ OnGUI() eski bir sistemdir ve her karede birden fazla çağrılır. UI için Unity'nin yeni UI Toolkit veya Canvas sistemini kullan."
+                    "msg": f"⚠️ `{method.name}()` boş tanımlanmış — Unity her karede çağırır ama hiçbir iş yapmıyor. Sil veya kullanana kadar yorum satırına al."
                 })
         return smells
 
-    # ─── 11: UPDATE İÇİNDE STRING BİRLEŞTİRME ───
-    def _check_string_concat_in_update(self):
-        """Update içinde string + string GC baskısı yaratır."""
+    # ─── 10: ONGUI KULLANIMI ───
+    def _check_ongui_usage(self):
+        """OnGUI legacy sistem, her karede birden fazla çağrılır."""
         smells = []
-        for i, line in self._iter_method_body(["void Update()"]):
-            if re.search(r'\".*\"\s*\+\s*', line) or re.search(r'\+\s*\".*\"', line):
-                smells.append({
-                    "line": i + 1,
-                    "type": "⚡ Performans",
-                    "msg": "⚠️ Update içinde string birleştirme her karede yeni string oluşturur (GC baskısı). StringBuilder veya önbellek kullan."
-                })
+        for i in self.signature_lines["void OnGUI()"]:
+            smells.append({
+                "line": i + 1,
+                "type": "⚡ Performans",
+                "msg": "⚠️ OnGUI() eski bir sistemdir ve her karede birden fazla çağrılır. UI için Unity'nin yeni UI Toolkit veya Canvas sistemini kullan."
+            })
         return smells
 
     # ─── 12: ÖNBELLEKSİZ WAITFORSECONDS ───
     def _check_uncached_waitforseconds(self):
         """Coroutine döngüsünde new WaitForSeconds her seferinde GC allocation yapar."""
         smells = []
-        in_while = False
-        for i, line in enumerate(self.lines):
-            stripped = line.strip()
-            if "while" in stripped and not self._is_commented(line):
-                in_while = True
-            if in_while:
-                if "new WaitForSeconds" in stripped or "new WaitForEndOfFrame" in stripped:
-                    smells.append({
-                        "line": i + 1,
-                        "type": "⚡ Performans",
-                        "msg": "⚠️ Döngü içinde `new WaitForSeconds()` her seferinde bellek ayırır. Bir kere oluşturup değişkende tut: `WaitForSeconds wait = new WaitForSeconds(1f);`"
-                    })
-                if stripped == "}" or "break" in stripped or "return" in stripped:
-                    in_while = False
-        return smells
-
-    # ─── 13: UPDATE İÇİNDE Vector3.Distance ───
-    def _check_distance_in_update(self):
-        """Vector3.Distance karekök hesaplar, sqrMagnitude daha hızlı."""
-        smells = []
-        for i, line in self._iter_method_body(["void Update()", "void FixedUpdate()"]):
-            if "Vector3.Distance" in line or "Vector2.Distance" in line:
-                smells.append({
-                    "line": i + 1,
-                    "type": "⚡ Performans",
-                    "msg": "⚠️ Distance() karekök hesaplar, her karede pahalıdır. Mesafe karşılaştırması için `(a - b).sqrMagnitude < range * range` kullan."
-                })
-        return smells
-
-    # ─── 14: ANİMATOR STRING PARAMETRELERİ ───
-    def _check_animator_string_params(self):
-        """Animator.SetX(\"string\") her çağrıda hash hesaplar."""
-        smells = []
-        animator_methods = ["SetBool", "SetFloat", "SetInteger", "SetTrigger", "GetBool", "GetFloat", "GetInteger"]
-        for i, line in enumerate(self.lines):
-            if not self._is_commented(line):
-                for method in animator_methods:
-                    if method + "(\"" in line or method + "('" in line:
-                        smells.append({
-                            "line": i + 1,
-                            "type": "⚡ Performans",
-                            "msg": f"⚠️ `{method}(\"string\")` her çağrıda hash hesaplar. `Animator.StringToHash()` ile bir kere hesapla ve int olarak kullan."
-                        })
-                        break
-        return smells
-
-    # ─── 15: UPDATE İÇİNDE ADDCOMPONENT ───
-    def _check_addcomponent_in_update(self):
-        """Update içinde AddComponent çok ağır bir işlem."""
-        smells = []
-        for i, line in self._iter_method_body(["void Update()"]):
-            if "AddComponent" in line:
-                smells.append({
-                    "line": i + 1,
-                    "type": "⚡ Performans",
-                    "msg": "⚠️ Update içinde AddComponent çok ağır — her karede yeni component eklemek belleği şişirir. Awake/Start'ta ekle veya Object Pooling kullan."
-                })
+        src = self._src
+        bare = src.bare_text
+        loop_lines = set()
+        for match in _WHILE.finditer(bare):
+            if not is_word_start(bare, match.start()):
+                continue
+            close_paren = src.matching_paren(match.end() - 1)
+            body_start = _WHITESPACE.match(bare, close_paren + 1).end()
+            if bare.startswith("{", body_start):
+                body_end = src.braces[body_start]
+            else:
+                # Parantezsiz gövde tek deyimdir; ';' ile biter ('do { } while (x);' gövdesizdir)
+                body_end = bare.find(";", close_paren)
+                if body_end < 0:
+                    body_end = len(bare)
+                body_start = close_paren
+            for i, line in src.body_lines(body_start, body_end):
+                if "new WaitForSeconds" in line or "new WaitForEndOfFrame" in line:
+                    loop_lines.add(i)
+        for i in sorted(loop_lines):
+            smells.append({
+                "line": i + 1,
+                "type": "⚡ Performans",
+                "msg": "⚠️ Döngü içinde `new WaitForSeconds()` her seferinde bellek ayırır. Bir kere oluşturup değişkende tut: `WaitForSeconds wait = new WaitForSeconds(1f);`"
+            })
         return smells
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path, PurePath
 from typing import Any, Optional
 
@@ -24,6 +25,23 @@ def require_user(db: Any, token: str, expected_user_id: Optional[int] = None) ->
     return user_id, username
 
 
+def kb_operator_ids() -> frozenset[int]:
+    """KB_OPERATOR_USER_IDS="1,5": paylaşılan KB'yi değiştirebilen kullanıcılar (boş → kimse)."""
+    raw = os.environ.get("KB_OPERATOR_USER_IDS", "")
+    return frozenset(int(part) for part in raw.split(",") if part.strip().isdigit())
+
+
+def is_kb_operator(user_id: int) -> bool:
+    return user_id in kb_operator_ids()
+
+
+def require_kb_operator(db: Any, token: str) -> tuple[int, str]:
+    user_id, username = get_current_user(db, token)
+    if not is_kb_operator(user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu işlem için KB operatörü yetkisi gerekir.")
+    return user_id, username
+
+
 def require_conversation_owner(db: Any, token: str, conv_id: int) -> tuple[int, str]:
     user_id, username = get_current_user(db, token)
     owner_id = db.get_conversation_owner(conv_id)
@@ -15,10 +15,16 @@ Kullanım:
     if CodeDetector.is_csharp(text):
         # UnityAnalyzer'a gönder
     intent = CodeDetector.detect_intent(text)
+
+Kod tespiti ortak lexer'ın (csharp_lexer) çıktısını kullanır: yorum ve
+string içindeki belirteçler sayılmaz. lex() metin başına önbelleklendiği
+için aynı mesaj analyzer ve fixer'a geçtiğinde yeniden taranmaz.
 """
 
 import re
 
+from csharp_lexer import lex
+
 
 class CodeDetector:
     """
@@ -42,6 +48,14 @@ class CodeDetector:
         "GetComponent",
     ]
 
+    # extract_unity_apis'in aradığı Unity API sınıf adları
+    _UNITY_API_NAMES = frozenset({
+        "Rigidbody2D", "Rigidbody", "CharacterController", "AudioSource", "AudioClip",
+        "Animator", "NavMeshAgent", "Canvas", "CanvasGroup", "SceneManager", "Physics2D", "Physics",
+        "Coroutine", "WaitForSeconds", "ScriptableObject", "PlayerPrefs", "JsonUtility",
+        "NavMesh", "Collider2D", "Collider", "Transform", "Camera", "UI",
+    })
+
     # ─── Intent Sabitleri ─────────────────────────────────────────────────────
 
     _OUT_OF_SCOPE_TERMS = [
@@ -65,9 +79,11 @@ class CodeDetector:
         Kural:
           - Genel belirteçlerden en az 2'si VE
           - Unity'ye özgü belirteçlerden en az 1'i bulunmalı
+        Belirteçler yorum ve string literal'leri dışında aranır.
         """
-        general_score = sum(1 for ind in cls._GENERAL_INDICATORS if ind in text)
-        unity_score = sum(1 for ind in cls._UNITY_INDICATORS if ind in text)
+        code = lex(text).bare_text
+        general_score = sum(1 for ind in cls._GENERAL_INDICATORS if ind in code)
+        unity_score = sum(1 for ind in cls._UNITY_INDICATORS if ind in code)
         return general_score >= 2 and unity_score >= 1
 
     # ─── Intent Tespiti ───────────────────────────────────────────────────────
@@ -135,20 +151,14 @@ class CodeDetector:
 
     @staticmethod
     def extract_class_name(code: str) -> str:
-        """C# kodundan sınıf adını çıkarır."""
-        match = re.search(r"class\s+(\w+)", code)
-        return match.group(1) if match else "UnknownScript"
+        """C# kodundan sınıf adını çıkarır (yorum/string içindeki 'class' sayılmaz)."""
+        classes = lex(code).classes
+        return classes[0].name if classes else "UnknownScript"
 
-    @staticmethod
-    def extract_unity_apis(code: str) -> set:
+    @classmethod
+    def extract_unity_apis(cls, code: str) -> set:
         """
         Kodda kullanılan Unity API sınıf adlarını çıkarır.
         KB eşleştirmesi için kullanılır.
         """
-        api_pattern = re.compile(
-            r"\b(Rigidbody2D|Rigidbody|CharacterController|AudioSource|AudioClip|"
-            r"Animator|NavMeshAgent|Canvas|CanvasGroup|SceneManager|Physics2D|Physics|"
-            r"Coroutine|WaitForSeconds|ScriptableObject|PlayerPrefs|JsonUtility|"
-            r"NavMesh|Collider2D|Collider|Transform|Camera|UI)\b"
-        )
-        return set(api_pattern.findall(code))
+        return set(lex(code).identifiers & cls._UNITY_API_NAMES)
@@ -5,7 +5,9 @@ CodeFixer — Kural tabanlı Unity C# Otomatik Düzeltici
 Kullanıcının orijinal kodunu alır, tespit edilen smells'e göre
 gerçek dönüşümler uygular ve düzeltilmiş kodu döner.
 
-AI yok — tamamen deterministic, regex tabanlı.
+AI yok — tamamen deterministic, regex tabanlı. Desenler ortak lexer'ın
+(csharp_lexer) maskelediği metinde aranır; yorum ve string içindeki
+"Camera.main" / "public int x;" gibi metinler değiştirilmez.
 
 Güvenli otomatik fix:
   - Camera.main → private Camera _cam (Awake cache)
@@ -22,6 +24,18 @@ Manuel fix (işaret eder, uygulamaz):
 import re
 from dataclasses import dataclass, field
 
+from csharp_lexer import is_word_start, lex
+
+
+_CAMERA_MAIN = re.compile(r'Camera\.main\b')
+_YIELD_WAIT = re.compile(r'yield\s+return\s+new\s+WaitForSeconds\(([^)]+)\)\s*;')
+_PUBLIC_FIELD = re.compile(
+    r'^(\s+)public\s+'
+    r'(?!void|class|static|abstract|virtual|override|interface|enum|readonly)'
+    r'(\w[\w<>\[\],\s]*?\s+\w+\s*(?:=|;))',
+    re.MULTILINE,
+)
+
 
 @dataclass
 class FixResult:
@@ -60,7 +74,7 @@ class CodeFixer:
     # FIX 1: Camera.main → private Camera _cam
     # ──────────────────────────────────────────────────────────────────────────
     def _fix_camera_main(self, code: str) -> str:
-        if "Camera.main" not in code:
+        if not self._code_matches(code, _CAMERA_MAIN):
             return code
         if "_cam" in code:
             return code  # zaten cache edilmiş
@@ -68,13 +82,13 @@ class CodeFixer:
         # Her Camera.main kullanımı hangi class'ta? Tekrar eden for her class.
         for cls_name, cls_start, cls_end in self._iter_classes(code):
             cls_body = code[cls_start:cls_end]
-            if "Camera.main" not in cls_body:
+            if not self._code_matches(cls_body, _CAMERA_MAIN):
                 continue
 
             # Field ekle
             cls_body = self._insert_field(cls_body, "private Camera _cam; // Cache edildi")
-            # Tüm Camera.main → _cam (önce replace, sonra Awake ekle — double-replace önlenir)
-            cls_body = cls_body.replace("Camera.main", "_cam")
+            # Koddaki Camera.main → _cam (önce replace, sonra Awake ekle — double-replace önlenir)
+            cls_body = self._replace_in_code(cls_body, _CAMERA_MAIN, lambda m: "_cam")
             # Awake'e ekle (literal "Camera.main" artık replace edilmez)
             cls_body = self._ensure_awake_statement(cls_body, "_cam = Camera.main;")
 
@@ -87,27 +101,27 @@ class CodeFixer:
     # FIX 2: yield return new WaitForSeconds(x) → field
     # ──────────────────────────────────────────────────────────────────────────
     def _fix_waitforseconds(self, code: str) -> str:
-        pattern = re.compile(r'yield\s+return\s+new\s+WaitForSeconds\(([^)]+)\)\s*;')
-        if not pattern.search(code):
+        pattern = _YIELD_WAIT
+        if not self._code_matches(code, pattern):
             return code
 
         for cls_name, cls_start, cls_end in self._iter_classes(code):
             cls_body = code[cls_start:cls_end]
-            matches = list(pattern.finditer(cls_body))
+            matches = self._code_matches(cls_body, pattern)
             if not matches:
                 continue
 
-            # Benzersiz arg'ları topla
+            # Benzersiz arg'ları topla (arg orijinal metinden; maskelenmiş literal olabilir)
             arg_to_field: dict[str, str] = {}
             for m in matches:
-                arg = m.group(1).strip()
+                arg = cls_body[m.start(1):m.end(1)].strip()
                 if arg not in arg_to_field:
                     suffix = "" if not arg_to_field else str(len(arg_to_field) + 1)
                     arg_to_field[arg] = f"_wait{suffix}"
 
             # Terse replace (sondan başa indis kaymaması için)
             for m in reversed(matches):
-                arg = m.group(1).strip()
+                arg = cls_body[m.start(1):m.end(1)].strip()
                 fname = arg_to_field[arg]
                 cls_body = cls_body[:m.start()] + f"yield return {fname}; // GC optimize" + cls_body[m.end():]
 
@@ -129,20 +143,17 @@ class CodeFixer:
     # ──────────────────────────────────────────────────────────────────────────
     def _fix_public_fields(self, code: str) -> str:
         # Sadece field tanımı — method/class/static değil
-        pattern = re.compile(
-            r'^(\s+)public\s+'
-            r'(?!void|class|static|abstract|virtual|override|interface|enum|readonly)'
-            r'(\w[\w<>\[\],\s]*?\s+\w+\s*(?:=|;))',
-            re.MULTILINE,
-        )
-        count = len(pattern.findall(code))
+        count = len(self._code_matches(code, _PUBLIC_FIELD))
         if count == 0:
             return code
 
-        new_code = pattern.sub(
-            lambda m: m.group(0).replace("public ", "[SerializeField] private ", 1),
-            code,
-        )
+        def to_serialized(m):
+            # Girinti grubu maskelenmiş yorum satırlarını da kapsayabilir; değişiklik
+            # sadece eşleşen 'public' anahtar kelimesinden itibaren yapılır
+            keyword = m.end(1)
+            return code[m.start():keyword] + code[keyword:m.end()].replace("public ", "[SerializeField] private ", 1)
+
+        new_code = self._replace_in_code(code, _PUBLIC_FIELD, to_serialized)
         if new_code != code:
             self._applied.append(f"public field → [SerializeField] private ({count} alan, Inspector erişimi korundu)")
         return new_code
@@ -197,19 +208,29 @@ class CodeFixer:
         """
         (class_name, body_start, body_end) üçlüsü yield eder.
         body_start: açık '{' sonrası, body_end: kapama '}' öncesi.
+
+        Sınırlar lexer'ın parantez tablosundan gelir (string/yorum içindeki
+        parantezler sayılmaz). Üst düzey sınıflar sondan başa döner: çağıran
+        gövdeyi değiştirip yerine koyduğunda henüz işlenmemiş sınıfların
+        offset'leri kaymaz. İç içe sınıflar dış sınıfın gövdesiyle işlenir.
+        """
+        for cls in reversed(lex(code).top_level_classes()):
+            yield cls.name, cls.open + 1, cls.close
+
+    @staticmethod
+    def _code_matches(text: str, pattern: re.Pattern) -> list:
         """
-        for cm in re.finditer(r'\bclass\s+(\w+)[^{]*\{', code):
-            cls_name = cm.group(1)
-            start = cm.end()
-            depth = 1
-            i = start
-            while i < len(code) and depth > 0:
-                if code[i] == '{':
-                    depth += 1
-                elif code[i] == '}':
-                    depth -= 1
-                i += 1
-            yield cls_name, start, i - 1  # -1: kapama '}' dahil değil
+        pattern'in yorum ve literal dışındaki eşleşmeleri (lexer'ın bare_text'i üzerinde).
+        Offset'ler orijinal metinle aynıdır; gruplar maskelenmiş metni taşır.
+        """
+        bare = lex(text).bare_text
+        return [m for m in pattern.finditer(bare) if is_word_start(bare, m.start())]
+
+    def _replace_in_code(self, text: str, pattern: re.Pattern, repl) -> str:
+        """Koddaki eşleşmeleri repl(match) ile değiştirir; yorum/string'e dokunmaz."""
+        for m in reversed(self._code_matches(text, pattern)):
+            text = text[:m.start()] + repl(m) + text[m.end():]
+        return text
 
     def _insert_field(self, cls_body: str, field_decl: str) -> str:
         """
@@ -218,7 +239,7 @@ class CodeFixer:
         # İlk void/private/protected/public method veya property'den önce
         m = re.search(
             r'\n(\s+)((?:private|public|protected|internal|void|IEnumerator|async|static)\s)',
-            cls_body,
+            lex(cls_body).bare_text,
         )
         if m:
             indent = re.match(r'\s*', m.group(1)).group(0)
@@ -234,7 +255,9 @@ class CodeFixer:
         """
         Awake() varsa başına statement ekler; yoksa Awake() oluşturur.
         """
-        awake_m = re.search(r'([ \t]*)void\s+Awake\s*\(\s*\)\s*\{', cls_body)
+        # Aramalar maskelenmiş metinde: yorumdaki "void Awake() {" eşleşmez
+        bare = lex(cls_body).bare_text
+        awake_m = re.search(r'([ \t]*)void\s+Awake\s*\(\s*\)\s*\{', bare)
         if awake_m:
             indent = awake_m.group(1)
             inner = indent + "    "
@@ -242,7 +265,7 @@ class CodeFixer:
             return cls_body[:pos] + f"\n{inner}{statement}" + cls_body[pos:]
 
         # Awake yok — Start'tan önce oluştur
-        start_m = re.search(r'([ \t]*)void\s+Start\s*\(\s*\)', cls_body)
+        start_m = re.search(r'([ \t]*)void\s+Start\s*\(\s*\)', bare)
         if start_m:
             indent = start_m.group(1)
             inner = indent + "    "
@@ -251,7 +274,7 @@ class CodeFixer:
             return cls_body[:pos] + new_awake + cls_body[pos:]
 
         # Fallback: ilk method öncesine ekle
-        m = re.search(r'([ \t]*)void\s+', cls_body)
+        m = re.search(r'([ \t]*)void\s+', bare)
         if m:
             indent = m.group(1)
             inner = indent + "    "
@@ -0,0 +1,366 @@
+"""
+C# Lexer — Analyzer / Fixer / Detector için Ortak Ön Uç
+=======================================================
+
+UnityAnalyzer, CodeFixer ve CodeDetector aynı kodu kendi regex'leriyle ayrı
+ayrı tarıyordu; yorum ve string bilgisi olmadığı için string içindeki '{',
+blok yorum içindeki kod ve verbatim string'ler parantez derinliğini bozuyordu.
+Bu modül kodu bir kez tarar ve üç modülün paylaştığı tabloları üretir:
+
+  - regions   : yorum / string / char literal bölgeleri (tür, başlangıç, bitiş)
+  - code_text : yorumlar boşlukla maskelenmiş kod (string'ler korunur —
+                '.tag == "' gibi kurallar literal'e bakar)
+  - bare_text : yorumlar ve literal'ler maskelenmiş kod (yapı taraması için)
+  - braces    : '{' offset'i → eşleşen '}' offset'i
+  - classes   : sınıf bildirimleri (ad, '{' ve '}' offset'leri)
+  - methods   : metod bildirimleri (dönüş tipi, ad, parametreler, gövde offset'leri)
+  - tokens()  : identifier / sayı / noktalama token akışı (bare_text üzerinden)
+
+iter_code_lines() code_text'in kod içeren satırlarını metnin tamamını
+maskelemeden, tarama ilerledikçe üretir (çok büyük dosyalarda ilk satırlar
+hemen kullanılabilir).
+
+Maskeleme offset'leri ve satır sonlarını korur: bare_text'te bulunan bir
+konum orijinal metinde aynı konumdur. lex() sonucu küçük bir LRU'da metin
+başına önbelleklenir; aynı istekte analyzer, fixer ve detector aynı kodu tekrar
+taramaz. LEX_CACHE_MAX_CHARS'tan büyük metinler önbelleğe alınmaz (bellek).
+
+Kullanım:
+    src = lex(code)
+    for method in src.methods:
+        for line_no, text in src.body_lines(method.open, method.close):
+            ...
+"""
+
+import os
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Iterator, NamedTuple, Optional
+
+# Sıra önemli: verbatim / interpolated string'ler düz string'den önce denenir.
+# Tüm bölgeler _REGION_START karakterlerinden biriyle başlar; tarama bu
+# karakterlere atlayarak ilerler (her offsette alternation denemekten ~7x hızlı).
+_REGION_START = re.compile(r'[/"\'@$]')
+_REGION = re.compile(
+    r'(?P<line_comment>//[^\n]*)'
+    r'|(?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))'
+    r'|(?P<verbatim>(?:\$@|@\$|@)"(?:[^"]|"")*(?:"|\Z))'
+    r'|(?P<string>\$?"(?:\\.|[^"\\\n])*(?:"|(?=\n)|\Z))'
+    r"|(?P<char>'(?:\\[^\n]{1,6}?|[^'\\\n])')"
+)
+_NOT_NEWLINE = re.compile(r'[^\n]')
+_BRACE = re.compile(r'[{}]')
+_PAREN = re.compile(r'[()]')
+_TOKEN = re.compile(r'(?P<ident>[A-Za-z_]\w*)|(?P<number>\d[\w.]*)|(?P<punct>\S)')
+
+# Yapı regex'leri literal ile başlar ('\b' ile başlayan desenler prefix
+# optimizasyonunu kaybeder); kelime sınırı eşleşmeden sonra kontrol edilir.
+_CLASS_DECL = re.compile(r'class\s+(\w+)([^{;]*)\{')
+_METHOD_TAIL = re.compile(r'\(([^()]*)\)\s*(?:where\b[^{;]*)?\{')
+_TYPE_CHARS = frozenset("<>[],.?")
+# Metod adı olamayacak anahtar kelimeler ("else if (x) {" gibi yanlış eşleşmeler)
+_NOT_METHOD_NAMES = frozenset({
+    "if", "while", "for", "foreach", "switch", "catch", "using", "lock", "fixed",
+    "return", "new", "in", "is", "as", "await", "yield", "throw", "when", "nameof", "typeof",
+})
+
+
+class Token(NamedTuple):
+    kind: str      # "ident" / "number" / "punct"
+    value: str
+    offset: int
+
+
+@dataclass(frozen=True)
+class ClassSpan:
+    name: str
+    open: int      # '{' offset'i
+    close: int     # eşleşen '}' offset'i (kapanmamışsa metin uzunluğu)
+    bases: tuple = ()   # ':' sonrası taban sınıf / arayüz adları (generic argümanları hariç)
+    decl: int = 0       # 'class' anahtar kelimesinin offset'i
+
+
+@dataclass(frozen=True)
+class MethodSpan:
+    return_type: str
+    name: str
+    params: str
+    decl: int      # bildirimin başladığı offset
+    open: int
+    close: int
+
+    def matches(self, return_type: str, name: str, params: Optional[str] = None) -> bool:
+        return (
+            self.name == name and self.return_type == return_type
+            and (params is None or self.params.strip() == params)
+        )
+
+
+def _parse_bases(header: str) -> tuple:
+    """'<T> : Base<T>, IFoo where T : class' → ("Base", "IFoo")."""
+    depth, colon = 0, -1
+    for i, ch in enumerate(header):
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth -= 1
+        elif ch == ":" and depth == 0:
+            colon = i
+            break
+    if colon < 0:
+        return ()
+    bases, depth, part = [], 0, []
+    for ch in re.split(r'\bwhere\b', header[colon + 1:], maxsplit=1)[0]:
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth -= 1
+        elif depth == 0:
+            if ch == ",":
+                bases.append("".join(part))
+                part = []
+            else:
+                part.append(ch)
+    bases.append("".join(part))
+    return tuple(name.strip().rsplit(".", 1)[-1] for name in bases if name.strip())
+
+
+def _mask(segment: str) -> str:
+    return _NOT_NEWLINE.sub(" ", segment)
+
+
+def _is_ident_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def is_word_start(text: str, offset: int) -> bool:
+    """offset'ten önceki karakter identifier parçası değil mi (regex '\\b' yerine)."""
+    return offset == 0 or not _is_ident_char(text[offset - 1])
+
+
+def _method_head(text: str, paren_pos: int) -> Optional[tuple[str, str, int]]:
+    """
+    '(' öncesindeki "<tip> <ad>" çiftini geriye doğru okur: (tip, ad, tip offset'i).
+    Regex ile geriye arama her aday için pencereyi baştan taradığından elle yürünür.
+    """
+    i = paren_pos
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    name_end = i
+    while i > 0 and _is_ident_char(text[i - 1]):
+        i -= 1
+    name = text[i:name_end]
+    if not name or name[0].isdigit():
+        return None
+    j = i
+    while j > 0 and text[j - 1].isspace():
+        j -= 1
+    if j == i:
+        return None
+    type_end = j
+    while j > 0 and (_is_ident_char(text[j - 1]) or text[j - 1] in _TYPE_CHARS):
+        j -= 1
+    return_type = text[j:type_end]
+    if not return_type or not (return_type[0].isalpha() or return_type[0] == "_"):
+        return None
+    return return_type, name, j
+
+
+class LexedSource:
+    """lex() sonucu: maskelenmiş metinler, bölge ve yapı tabloları."""
+
+    def __init__(self, text: str):
+        self.text = text
+        regions = []
+        code_parts, bare_parts = [], []
+        pos = 0
+        for m in self._iter_regions(text):
+            start, end = m.span()
+            kind = m.lastgroup
+            regions.append((kind, start, end))
+            segment = text[pos:start]
+            code_parts.append(segment)
+            bare_parts.append(segment)
+            masked = _mask(m.group())
+            if kind.endswith("comment"):
+                code_parts.append(masked)
+            else:
+                code_parts.append(m.group())
+            bare_parts.append(masked)
+            pos = end
+        code_parts.append(text[pos:])
+        bare_parts.append(text[pos:])
+
+        self.regions = regions
+        self.code_text = "".join(code_parts)
+        self.bare_text = "".join(bare_parts)
+        self.line_starts = [0] + [m.end() for m in re.finditer(r'\n', text)]
+        self.code_lines = self.code_text.split("\n")
+        # Satırda yorum dışında kod var mı (tamamen yorum / boş satırlar False)
+        self.has_code = [bool(line.strip()) for line in self.code_lines]
+
+    # ── Yapı tabloları ───────────────────────────────────────────────────────
+    # İlk erişimde kurulur: fixer'ın ara metinleri için çoğu zaman sadece bare_text gerekir
+    @cached_property
+    def braces(self) -> dict[int, int]:
+        braces = {}
+        stack = []
+        for m in _BRACE.finditer(self.bare_text):
+            if m.group() == "{":
+                stack.append(m.start())
+            elif stack:
+                braces[stack.pop()] = m.start()
+        for open_pos in stack:
+            braces[open_pos] = len(self.text)
+        return braces
+
+    @cached_property
+    def classes(self) -> list[ClassSpan]:
+        bare, braces = self.bare_text, self.braces
+        return [
+            ClassSpan(m.group(1), m.end() - 1, braces[m.end() - 1], _parse_bases(m.group(2)), m.start())
+            for m in _CLASS_DECL.finditer(bare)
+            if is_word_start(bare, m.start())
+        ]
+
+    @cached_property
+    def methods(self) -> list[MethodSpan]:
+        bare, braces = self.bare_text, self.braces
+        methods = []
+        for m in _METHOD_TAIL.finditer(bare):
+            head = _method_head(bare, m.start())
+            if head is None:
+                continue
+            return_type, name, decl = head
+            if name in _NOT_METHOD_NAMES or return_type in _NOT_METHOD_NAMES:
+                continue
+            open_pos = m.end() - 1
+            methods.append(MethodSpan(return_type, name, m.group(1), decl, open_pos, braces[open_pos]))
+        return methods
+
+    @staticmethod
+    def _iter_regions(text: str):
+        """_REGION.finditer ile aynı eşleşmeler; aday başlangıç karakterlerine atlar."""
+        search, match = _REGION_START.search, _REGION.match
+        pos = 0
+        while True:
+            candidate = search(text, pos)
+            if candidate is None:
+                return
+            m = match(text, candidate.start())
+            if m is None:
+                pos = candidate.start() + 1
+            else:
+                yield m
+                pos = m.end()
+
+    # ── Konum ────────────────────────────────────────────────────────────────
+    def line_of(self, offset: int) -> int:
+        """Offset'in 0-based satır numarası."""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def body_lines(self, open_pos: int, close_pos: int) -> Iterator[tuple[int, str]]:
+        """
+        open_pos ile close_pos arasındaki (parantezler hariç) kodu satır satır
+        yield eder: (0-based satır, code_text dilimi). Kod içermeyen satırlar atlanır.
+        """
+        first, last = self.line_of(open_pos), self.line_of(close_pos)
+        starts, code_text, has_code = self.line_starts, self.code_text, self.has_code
+        for i in range(first, last + 1):
+            if not has_code[i]:
+                continue
+            line_start = starts[i]
+            line_end = starts[i + 1] - 1 if i + 1 < len(starts) else len(code_text)
+            segment = code_text[max(line_start, open_pos + 1):min(line_end, close_pos)]
+            if segment.strip():
+                yield i, segment
+
+    def is_empty_body(self, open_pos: int, close_pos: int) -> bool:
+        return not self.bare_text[open_pos + 1:close_pos].strip()
+
+    def matching_paren(self, open_pos: int) -> int:
+        """bare_text'teki '(' için eşleşen ')' offset'i; yoksa metin uzunluğu."""
+        depth = 0
+        bare = self.bare_text
+        for m in _PAREN.finditer(bare, open_pos):
+            depth += 1 if m.group() == "(" else -1
+            if depth == 0:
+                return m.start()
+        return len(bare)
+
+    # ── Token akışı ──────────────────────────────────────────────────────────
+    def tokens(self) -> Iterator[Token]:
+        """Yorum ve literal'ler dışındaki identifier / sayı / noktalama token'ları."""
+        for m in _TOKEN.finditer(self.bare_text):
+            yield Token(m.lastgroup, m.group(), m.start())
+
+    @cached_property
+    def identifiers(self) -> frozenset:
+        return frozenset(re.findall(r'[A-Za-z_]\w*', self.bare_text))
+
+    def top_level_classes(self) -> list[ClassSpan]:
+        """Başka bir sınıfın gövdesinde olmayan sınıflar (dosya sırasıyla)."""
+        result = []
+        for cls in self.classes:
+            if not result or cls.open > result[-1].close:
+                result.append(cls)
+        return result
+
+
+def iter_code_lines(text: str) -> Iterator[tuple[int, str]]:
+    """
+    lex(text).code_lines'ın kod içeren satırlarını (has_code) tarama ilerledikçe
+    yield eder: (0-based satır, satır). Bellekte sadece yarım kalan satır tutulur.
+    """
+    index, partial = 0, []
+
+    def pieces():
+        pos = 0
+        for m in LexedSource._iter_regions(text):
+            yield text[pos:m.start()]
+            yield _mask(m.group()) if m.lastgroup.endswith("comment") else m.group()
+            pos = m.end()
+        yield text[pos:]
+
+    for piece in pieces():
+        start = 0
+        while True:
+            newline = piece.find("\n", start)
+            if newline < 0:
+                partial.append(piece[start:])
+                break
+            partial.append(piece[start:newline])
+            line = "".join(partial)
+            if line.strip():
+                yield index, line
+            index += 1
+            partial = []
+            start = newline + 1
+    line = "".join(partial)
+    if line.strip():
+        yield index, line
+
+
+# LexedSource metnin ~8 katı bellek tutar (maskeli kopyalar + satır/offset
+# tabloları); önbellek bir isteğin analyzer/fixer/detector paylaşımı için küçük
+# tutulur, eşikten büyük metinler hiç önbelleklenmez.
+LEX_CACHE_SIZE = int(os.environ.get("LEX_CACHE_SIZE", "4"))
+LEX_CACHE_MAX_CHARS = int(os.environ.get("LEX_CACHE_MAX_CHARS", "262144"))
+
+
+@lru_cache(maxsize=LEX_CACHE_SIZE)
+def _lex_cached(text: str) -> LexedSource:
+    return LexedSource(text)
+
+
+def lex(text: str) -> LexedSource:
+    """Metni tarar; eşiğin altındaki metinler için önbellekteki sonucu döner."""
+    if len(text) > LEX_CACHE_MAX_CHARS:
+        return LexedSource(text)
+    return _lex_cached(text)
+
+
+def clear_lex_cache() -> None:
+    _lex_cached.cache_clear()
@@ -161,6 +161,52 @@ class DatabaseManager:
                 session_token TEXT NOT NULL,
                 created_at TEXT NOT NULL
             )''')
+            # KB adayları — yüksek skorlu LLM yanıtları (bkz. knowledge/kb_candidates.py)
+            cursor.execute('''CREATE TABLE IF NOT EXISTS kb_candidates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                token_key TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                critic_score REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 1,
+                status TEXT NOT NULL DEFAULT 'pending',
+                entry_id TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                UNIQUE (user_id, token_key),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )''')
+            # Statik analiz önbelleği — kod özeti + kural seti sürümü (bkz. analysis_cache.py)
+            cursor.execute('''CREATE TABLE IF NOT EXISTS analysis_cache (
+                code_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                static_results TEXT NOT NULL,
+                analysis_text TEXT,
+                last_used_at TEXT NOT NULL,
+                PRIMARY KEY (code_hash, version)
+            )''')
+            # Proje sembol indeksi — workspace scriptlerindeki sınıf/metod/field/kullanımlar (bkz. symbol_index.py)
+            cursor.execute('''CREATE TABLE IF NOT EXISTS symbol_files (
+                workspace TEXT NOT NULL,
+                path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (workspace, path)
+            )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS symbols (
+                workspace TEXT NOT NULL,
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                container TEXT,
+                detail TEXT,
+                line INTEGER NOT NULL
+            )''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols (workspace, name, kind)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbols_container ON symbols (workspace, container, kind)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbols_path ON symbols (workspace, path)')
             conn.commit()
         self._backfill_session_expiry()
 
@@ -528,3 +574,177 @@ class DatabaseManager:
                 (user_id,)
             ).fetchone()
             return row[0] if row else None
+
+    # ===================== KB ADAYLARI =====================
+    def record_kb_candidate(self, user_id: int, token_key: str, prompt: str, response: str,
+                            critic_score: float) -> int:
+        """
+        Kullanıcının aday yanıtını kaydeder. Aynı kullanıcıda aynı token_key varsa tekrar
+        sayacını artırır ve yeni yanıtın skoru daha yüksekse eskisinin yerine koyar.
+        Adaylar kullanıcıya aittir: başka kullanıcının istemi / yanıtı bir satıra karışmaz.
+        Güncel hit_count döner.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(
+                '''INSERT INTO kb_candidates (user_id, token_key, prompt, response, critic_score, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(user_id, token_key) DO UPDATE SET
+                       hit_count = hit_count + 1,
+                       updated_at = excluded.updated_at,
+                       prompt = CASE WHEN excluded.critic_score > critic_score THEN excluded.prompt ELSE prompt END,
+                       response = CASE WHEN excluded.critic_score > critic_score THEN excluded.response ELSE response END,
+                       critic_score = MAX(critic_score, excluded.critic_score)''',
+                (user_id, token_key, prompt, response, critic_score, now, now)
+            )
+            row = conn.execute(
+                'SELECT hit_count FROM kb_candidates WHERE user_id = ? AND token_key = ?', (user_id, token_key)
+            ).fetchone()
+            conn.commit()
+            return row[0]
+
+    _KB_CANDIDATE_COLUMNS = (
+        "id, user_id, token_key, prompt, response, critic_score, hit_count, status, entry_id, created_at, updated_at"
+    )
+
+    def _kb_candidate_row(self, row: Tuple) -> Dict[str, Any]:
+        keys = [c.strip() for c in self._KB_CANDIDATE_COLUMNS.split(",")]
+        return dict(zip(keys, row))
+
+    def get_kb_candidates(self, min_hits: int = 1, status: str = "pending",
+                          user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Verilen durumdaki ve en az min_hits kez tekrarlanmış adaylar (en sık önce).
+        user_id verilirse sadece o kullanıcının adayları; None → tümü (KB operatörü).
+        """
+        owner_filter = " AND user_id = ?" if user_id is not None else ""
+        params = (status, min_hits) + ((user_id,) if user_id is not None else ())
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            rows = conn.execute(
+                f'SELECT {self._KB_CANDIDATE_COLUMNS} FROM kb_candidates '
+                f'WHERE status = ? AND hit_count >= ?{owner_filter} '
+                'ORDER BY hit_count DESC, critic_score DESC, id ASC',
+                params
+            ).fetchall()
+            return [self._kb_candidate_row(r) for r in rows]
+
+    def get_kb_candidate(self, candidate_id: int) -> Optional[Dict[str, Any]]:
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            row = conn.execute(
+                f'SELECT {self._KB_CANDIDATE_COLUMNS} FROM kb_candidates WHERE id = ?', (candidate_id,)
+            ).fetchone()
+            return self._kb_candidate_row(row) if row else None
+
+    def set_kb_candidate_status(self, candidate_id: int, status: str, entry_id: Optional[str] = None) -> None:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(
+                'UPDATE kb_candidates SET status = ?, entry_id = ?, updated_at = ? WHERE id = ?',
+                (status, entry_id, now, candidate_id)
+            )
+            conn.commit()
+
+    # ===================== ANALİZ ÖNBELLEĞİ =====================
+    def get_analysis_cache(self, code_hash: str, version: str) -> Optional[Dict[str, Any]]:
+        """Kayıtlı analiz sonucu: {"static_results": dict, "analysis_text": str | None} veya None."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            row = conn.execute(
+                'SELECT static_results, analysis_text FROM analysis_cache WHERE code_hash = ? AND version = ?',
+                (code_hash, version)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                'UPDATE analysis_cache SET last_used_at = ? WHERE code_hash = ? AND version = ?',
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), code_hash, version)
+            )
+            conn.commit()
+            return {"static_results": json.loads(row[0]), "analysis_text": row[1]}
+
+    def put_analysis_cache(self, code_hash: str, version: str, static_results: dict,
+                           analysis_text: Optional[str] = None, max_rows: int = 5000) -> None:
+        """Sonucu kaydeder; tablo max_rows'u aşarsa en uzun süredir kullanılmayanlar silinir."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(
+                '''INSERT INTO analysis_cache (code_hash, version, static_results, analysis_text, last_used_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(code_hash, version) DO UPDATE SET
+                       static_results = excluded.static_results,
+                       analysis_text = COALESCE(excluded.analysis_text, analysis_text),
+                       last_used_at = excluded.last_used_at''',
+                (code_hash, version, json.dumps(static_results, ensure_ascii=False), analysis_text, now)
+            )
+            conn.execute(
+                '''DELETE FROM analysis_cache WHERE rowid IN (
+                       SELECT rowid FROM analysis_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                   )''',
+                (max_rows,)
+            )
+            conn.commit()
+
+    def purge_analysis_cache(self, keep_version: str) -> int:
+        """Başka kural seti sürümüyle kaydedilmiş sonuçları siler; silinen satır sayısını döner."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            cursor = conn.execute('DELETE FROM analysis_cache WHERE version != ?', (keep_version,))
+            conn.commit()
+            return cursor.rowcount
+
+    # ===================== SEMBOL İNDEKSİ =====================
+    def get_symbol_files(self, workspace: str) -> Dict[str, Tuple[str, int, int]]:
+        """İndekslenmiş dosyalar: path → (content_hash, mtime_ns, size)."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            rows = conn.execute(
+                'SELECT path, content_hash, mtime_ns, size FROM symbol_files WHERE workspace = ?', (workspace,)
+            ).fetchall()
+            return {r[0]: (r[1], r[2], r[3]) for r in rows}
+
+    def save_symbol_files(self, workspace: str, files: list, deleted: list = ()) -> None:
+        """
+        Tek transaction'da indeksi günceller.
+        files: [(path, content_hash, mtime_ns, size, symbols | None)] — symbols None ise
+        sadece dosya bilgisi güncellenir (içerik aynı), liste ise dosyanın sembolleri
+        [(kind, name, container, detail, line)] ile değiştirilir. deleted: silinen path'ler.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            for path in deleted:
+                conn.execute('DELETE FROM symbols WHERE workspace = ? AND path = ?', (workspace, path))
+                conn.execute('DELETE FROM symbol_files WHERE workspace = ? AND path = ?', (workspace, path))
+            for path, content_hash, mtime_ns, size, symbols in files:
+                conn.execute(
+                    '''INSERT INTO symbol_files (workspace, path, content_hash, mtime_ns, size) VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(workspace, path) DO UPDATE SET
+                           content_hash = excluded.content_hash, mtime_ns = excluded.mtime_ns, size = excluded.size''',
+                    (workspace, path, content_hash, mtime_ns, size)
+                )
+                if symbols is None:
+                    continue
+                conn.execute('DELETE FROM symbols WHERE workspace = ? AND path = ?', (workspace, path))
+                conn.executemany(
+                    'INSERT INTO symbols (workspace, path, kind, name, container, detail, line) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(workspace, path, *symbol) for symbol in symbols]
+                )
+            conn.commit()
+
+    def find_symbols(self, workspace: str, names: list = (), containers: list = (),
+                     kinds: list = (), limit: int = 200) -> List[Dict[str, Any]]:
+        """Adı names'te veya sınıfı containers'ta olan semboller (indeksli arama); kinds verilirse türe göre süzülür."""
+        # Her koşul ayrı SELECT ve sıralama Python'da: OR veya ORDER BY path ile planlayıcı
+        # (workspace, path) indeksini seçip workspace'in tüm sembollerini tarıyordu
+        kind_filter = f' AND kind IN ({",".join("?" * len(kinds))})' if kinds else ""
+        selects, params = [], []
+        for column, values in (("name", names), ("container", containers)):
+            if values:
+                selects.append(
+                    f'SELECT path, kind, name, container, detail, line FROM symbols '
+                    f'WHERE workspace = ? AND {column} IN ({",".join("?" * len(values))}){kind_filter}'
+                )
+                params.extend([workspace, *values, *kinds])
+        if not selects:
+            return []
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            rows = sorted(conn.execute(" UNION ".join(selects), params).fetchall(), key=lambda r: (r[0], r[5]))
+            return [
+                {"path": r[0], "kind": r[1], "name": r[2], "container": r[3], "detail": r[4], "line": r[5]}
+                for r in rows[:limit]
+            ]
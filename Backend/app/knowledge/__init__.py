@@ -1,3 +1,4 @@
 from .kb_engine import KBEngine, KBResult
+from .kb_watcher import KBWatcher
 
-__all__ = ["KBEngine", "KBResult"]
+__all__ = ["KBEngine", "KBResult", "KBWatcher"]
@@ -0,0 +1,100 @@
+"""
+BM25 Ranker — KB için Seyrek Terim-Doküman Matrisi
+==================================================
+
+KBEngine'in varsayılan skoru `eşleşen terim / toplam terim + 0.1 × trigger`
+sezgiselidir: her terim eşit ağırlıktadır. Bu modül alternatif bir sıralama
+backend'i sunar: KB yüklenirken triggers + keywords + turkish_keywords
+alanlarından CSR (compressed sparse row) düzeninde terim → doküman matrisi
+kurulur ve BM25 ağırlıkları önceden hesaplanır.
+
+  - Satır  = terim (term id), sütun = entry index
+  - indptr[t] .. indptr[t+1]  → terimin posting dilimi
+  - docs / weights            → entry index'leri ve BM25 ağırlıkları (array)
+
+Sorgu skoru, eşleşen terimlerin satırlarının toplamıdır (sparse satır
+toplamı); ham BM25 skoru s/(s + BM25_SATURATION) ile sırayı koruyarak 0-1
+aralığına taşınır. Nadir terimler (yüksek IDF) ve kısa entry'lerdeki
+eşleşmeler daha ağır basar.
+
+Not: backend.spec numpy'ı dışlar; matris stdlib `array` ile tutulur.
+Trigger kapısı, min_total_matches ve group/variant mantığı KBEngine'de
+aynen uygulanır — ranker sadece skoru değiştirir.
+
+Kullanım:
+    ranker = BM25Ranker(compiled_entries)
+    scores = ranker.score(matched_terms)      # {entry index: skor}
+"""
+
+import math
+from array import array
+from typing import Iterable
+
+# BM25 parametreleri (Robertson/Spärck Jones varsayılanları)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Trigger'lar keyword'lere göre daha güçlü sinyal: terim frekansı olarak 2 sayılır
+TRIGGER_TF = 2.0
+# Ham skorun 0.5'e eşlendiği nokta (≈ bir orta IDF'li trigger eşleşmesi)
+BM25_SATURATION = 4.0
+
+
+class BM25Ranker:
+    """Derlenmiş KB entry'leri üzerinde CSR BM25 matrisi."""
+
+    def __init__(self, compiled: list, k1: float = BM25_K1, b: float = BM25_B):
+        n_docs = len(compiled)
+        self.n_docs = n_docs
+
+        # Doküman terim frekansları: trigger → TRIGGER_TF, keyword → 1
+        doc_terms: list[dict[str, float]] = []
+        for c in compiled:
+            tf = {term: 1.0 for term in c.keywords}
+            for term in c.triggers:
+                tf[term] = TRIGGER_TF
+            doc_terms.append(tf)
+
+        lengths = [sum(tf.values()) for tf in doc_terms]
+        avgdl = (sum(lengths) / n_docs) if n_docs else 0.0
+
+        # terim → [(doc, tf)]
+        rows: dict[str, list[tuple[int, float]]] = {}
+        for doc, tf in enumerate(doc_terms):
+            for term, freq in tf.items():
+                rows.setdefault(term, []).append((doc, freq))
+
+        self.term_ids: dict[str, int] = {}
+        self.indptr = array("l", [0])
+        self.docs = array("l")
+        self.weights = array("d")
+
+        for term, postings in rows.items():
+            df = len(postings)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            self.term_ids[term] = len(self.term_ids)
+            for doc, freq in postings:
+                norm = k1 * (1.0 - b + b * lengths[doc] / avgdl) if avgdl else k1
+                w = idf * freq * (k1 + 1.0) / (freq + norm)
+                self.docs.append(doc)
+                self.weights.append(w)
+            self.indptr.append(len(self.docs))
+
+    def score(self, matched_terms: Iterable[str]) -> dict[int, float]:
+        """
+        Eşleşen terimlerin satır toplamı: entry index → BM25 skoru (0-1, sıra korunur).
+        Sadece en az bir terimi eşleşen entry'ler döner (seyrek vektör).
+        """
+        scores: dict[int, float] = {}
+        term_ids, indptr, docs, weights = self.term_ids, self.indptr, self.docs, self.weights
+        for term in matched_terms:
+            tid = term_ids.get(term)
+            if tid is None:
+                continue
+            for k in range(indptr[tid], indptr[tid + 1]):
+                doc = docs[k]
+                scores[doc] = scores.get(doc, 0.0) + weights[k]
+        return {doc: s / (s + BM25_SATURATION) for doc, s in scores.items()}
+
+    def score_many(self, matched_term_sets: list) -> list[dict[int, float]]:
+        """Batch skorlama — her terim seti için score()."""
+        return [self.score(terms) for terms in matched_term_sets]
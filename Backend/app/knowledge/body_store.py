@@ -0,0 +1,150 @@
+"""
+KB Body Store — Entry Gövdeleri için mmap Destekli Depo
+=======================================================
+
+lookup() sadece trigger/keyword/intent gibi metadata'ya ihtiyaç duyar;
+`code`, `explanation` ve `setup_steps` gövdeleri yalnızca kazanan sonuç
+render edilirken gerekir. Bu modül gövdeleri metadata'dan ayırıp tek bir
+ikili dosyaya yazar ve dosyayı mmap ile eşler:
+
+  - Her worker süreci aynı dosyayı eşler → gövdeler OS page cache'inde tek kopya
+  - Gövde sadece read(idx) çağrıldığında ilgili offset'ten decode edilir
+  - Dosya adı gövde içeriğinin sha256 özetini taşır; aynı KB'yi yükleyen
+    süreçler dosyayı yeniden yazmaz, KB değişince yeni dosya oluşur
+
+Cache dizini yazılamıyorsa veya mmap başarısızsa gövdeler bellek içi
+bytes buffer'da tutulur (aynı lazy decode, sadece paylaşım yok).
+
+Kullanım:
+    store, meta_entries = KBBodyStore.build(entries)
+    body = store.read(3)   # {"explanation": ..., "code": ..., "setup_steps": [...]}
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Metadata'dan ayrılıp body store'a taşınan alanlar
+BODY_FIELDS = ("explanation", "code", "setup_steps")
+
+# Paylaşılan gövde dosyalarının dizini (varsayılan: DB ile aynı kullanıcı klasörü)
+KB_CACHE_DIR = Path(os.environ.get("KB_CACHE_DIR", Path.home() / ".unity_architect_ai" / "kb_cache"))
+
+# Bu süreden eski, artık kullanılmayan gövde dosyaları temizlenir (saniye)
+_STALE_AFTER = 3600
+
+_FILE_PREFIX = "kb_bodies-"
+
+
+class KBBodyStore:
+    """Entry index → (offset, uzunluk) tablosu + mmap'li (veya bellek içi) gövde buffer'ı."""
+
+    __slots__ = ("_buf", "_offsets", "path", "digest")
+
+    def __init__(self, buf, offsets: list, path: Optional[Path], digest: str):
+        self._buf = buf                 # mmap.mmap veya bytes
+        self._offsets = offsets         # [(start, length), ...] — entry sırasıyla
+        self.path = path                # None → bellek içi
+        self.digest = digest
+
+    # ── Kurulum ──────────────────────────────────────────────────────────────
+    @classmethod
+    def build(cls, entries: list, cache_dir: Path = KB_CACHE_DIR) -> tuple["KBBodyStore", list]:
+        """
+        Entry'lerin gövdelerini ayırır ve store'u kurar.
+
+        Dönüş: (store, gövdesi çıkarılmış metadata entry listesi)
+        """
+        chunks: list[bytes] = []
+        offsets: list[tuple[int, int]] = []
+        meta_entries: list[dict] = []
+        pos = 0
+        for entry in entries:
+            body = {f: entry[f] for f in BODY_FIELDS if f in entry}
+            chunk = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            chunks.append(chunk)
+            offsets.append((pos, len(chunk)))
+            pos += len(chunk)
+            meta_entries.append({k: v for k, v in entry.items() if k not in BODY_FIELDS})
+
+        blob = b"".join(chunks)
+        digest = hashlib.sha256(blob).hexdigest()
+        return cls.attach(blob, offsets, digest, cache_dir), meta_entries
+
+    @classmethod
+    def attach(cls, blob: Optional[bytes], offsets: list, digest: str,
+               cache_dir: Path = KB_CACHE_DIR) -> "KBBodyStore":
+        """
+        Özeti `digest` olan gövde dosyasını eşler; yoksa `blob`'dan yazar.
+        blob None ise dosyanın zaten var olması beklenir (snapshot'tan yükleme).
+        """
+        size = offsets[-1][0] + offsets[-1][1] if offsets else 0
+        if size == 0:
+            return cls(b"", offsets, None, digest)
+
+        path = Path(cache_dir) / f"{_FILE_PREFIX}{digest[:32]}.bin"
+        try:
+            if not path.exists() or path.stat().st_size != size:
+                if blob is None:
+                    raise FileNotFoundError(path)
+                cls._write_atomic(path, blob)
+                cls._prune_stale(path)
+            else:
+                os.utime(path)  # Kullanımda → _prune_stale silmesin
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(buf, offsets, path, digest)
+        except (OSError, ValueError) as e:
+            if blob is None:
+                raise
+            logger.warning(f"[KBBodyStore] mmap kullanılamadı, gövdeler bellekte tutulacak: {e}")
+            return cls(blob, offsets, None, digest)
+
+    @staticmethod
+    def _write_atomic(path: Path, blob: bytes) -> None:
+        """Başka bir worker yarım dosyayı eşlemesin diye tmp + rename ile yazar."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _prune_stale(current: Path) -> None:
+        """Eski KB sürümlerine ait, uzun süredir dokunulmamış gövde dosyalarını siler."""
+        cutoff = time.time() - _STALE_AFTER
+        for old in current.parent.glob(f"{_FILE_PREFIX}*.bin"):
+            if old == current:
+                continue
+            try:
+                if old.stat().st_mtime < cutoff:
+                    old.unlink()
+            except OSError:
+                pass  # Windows'ta başka süreç eşlemiş olabilir
+
+    # ── Okuma ────────────────────────────────────────────────────────────────
+    def read(self, idx: int) -> dict:
+        """idx numaralı entry'nin gövde alanlarını decode edip döner."""
+        start, length = self._offsets[idx]
+        return json.loads(self._buf[start:start + length].decode("utf-8"))
+
+    def export(self) -> tuple[bytes, list, str]:
+        """(blob, offsets, digest) — snapshot'a gömmek için."""
+        return self._buf[:], self._offsets, self.digest
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path) if self.path else None,
+            "mapped": self.path is not None,
+            "bytes": len(self._buf),
+        }
@@ -0,0 +1,31 @@
+"""
+unity_kb.json → unity_kb.snapshot build adımı.
+
+Kullanım:
+    cd Backend/app && python -m knowledge.build_snapshot [kb_path]
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+from .kb_engine import KB_FILE, KBEngine
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str]) -> int:
+    logging.basicConfig(level=logging.INFO)
+    kb_path = Path(argv[0]) if argv else KB_FILE
+    # Eski bir snapshot'tan değil, her zaman JSON'dan derle
+    kb = KBEngine(kb_path=kb_path, use_snapshot=False)
+    if not kb.stats()["total_entries"]:
+        logger.error(f"[KBSnapshot] KB yüklenemedi: {kb_path}")
+        return 1
+    out = kb.save_snapshot()
+    logger.info(f"[KBSnapshot] Yazıldı: {out} ({out.stat().st_size} bayt)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
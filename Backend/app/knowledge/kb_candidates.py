@@ -0,0 +1,131 @@
+"""
+KB Adayları — İyi LLM Yanıtlarını Yerel KB Entry'sine Terfi Ettirme
+===================================================================
+
+KB'de olmayan her üretim isteği CodeGenerationPipeline'dan geçer (onlarca
+saniye, binlerce token) — daha önce iyi cevaplanmış neredeyse aynı istek
+için bile. Bu modül o cevapları KB adayına çevirir:
+
+  1. Kayıt   : ResponseValidator.validate'ten geçen ve Game Feel (critic)
+               skoru KB_CANDIDATE_MIN_SCORE üstünde olan yanıtlar, isteğin
+               KB token'larıyla (candidate_key) kb_candidates tablosuna,
+               isteği gönderen kullanıcı adına yazılır. Aynı kullanıcının aynı
+               token setiyle gelen tekrarları sayacı artırır; daha yüksek
+               skorlu yanıt eskisinin yerini alır.
+  2. Listeleme: KB_CANDIDATE_MIN_HITS kez tekrarlanan adaylar unity_kb.json
+               formatında entry önizlemesiyle sunulur (build_entry). Kullanıcı
+               sadece kendi adaylarını görür; KB operatörleri tümünü.
+  3. Onay    : Sadece KB operatörünün (KB_OPERATOR_USER_IDS) açık onayından
+               sonra entry yerel overlay KB dosyasına (append_overlay_entry)
+               yazılır ve paylaşılan KBEngine yeniden yüklenir.
+
+Kullanım:
+    key = candidate_key("2d dash mekaniği yaz")
+    if key and is_promotable(response, critic_score):
+        db.record_kb_candidate(user_id, key, prompt, response, critic_score)
+    entry = build_entry(db.get_kb_candidate(candidate_id))
+    append_overlay_entry(kb.overlay_path, entry); kb.reload()
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from validator import ResponseValidator
+
+from .kb_engine import KBEngine
+
+# Aday olarak kaydedilmek için minimum Game Feel / critic skoru (0-10)
+KB_CANDIDATE_MIN_SCORE = float(os.environ.get("KB_CANDIDATE_MIN_SCORE", "8.0"))
+# Terfi listesinde görünmek için aynı isteğin en az kaç kez gelmesi gerektiği
+KB_CANDIDATE_MIN_HITS = int(os.environ.get("KB_CANDIDATE_MIN_HITS", "2"))
+
+# Trigger sayılacak token'ların minimum uzunluğu ("yaz", "bir" gibi fiil/dolgu kelimeleri elenir)
+_MIN_TRIGGER_LEN = 4
+_MAX_TRIGGERS = 5
+_CODE_BLOCK = re.compile(r"```(?:csharp|cs)\s*(.*?)\s*```", re.DOTALL)
+_FILE_HEADER = re.compile(r"\*\*📄\s*[^*]+\*\*")
+_SETUP_SECTION = re.compile(r"🎮\s*Editor Setup[^\n]*\n(.*)", re.DOTALL)
+
+
+def candidate_key(message: str) -> str:
+    """İsteğin KB token'ları (sıralı, boşlukla birleşik); token yoksa boş string."""
+    return " ".join(sorted(KBEngine._tokenize(message)))
+
+
+def is_promotable(response: str, critic_score: Optional[float]) -> bool:
+    """Yanıt validator'dan geçiyor ve critic skoru eşiğin üstündeyse True."""
+    if critic_score is None or critic_score < KB_CANDIDATE_MIN_SCORE:
+        return False
+    valid, _ = ResponseValidator.validate(response)
+    return valid
+
+
+def build_entry(candidate: dict) -> dict:
+    """
+    kb_candidates satırından unity_kb.json formatında entry üretir.
+
+    Trigger'lar isteğin en uzun token'larıdır; min_total_matches token
+    sayısının yarısından fazlasıdır — sadece neredeyse aynı istekler eşleşir.
+    """
+    tokens = candidate["token_key"].split()
+    long_tokens = [t for t in tokens if len(t) >= _MIN_TRIGGER_LEN and not t.isdigit()]
+    triggers = sorted(long_tokens, key=lambda t: (-len(t), t))[:_MAX_TRIGGERS] or tokens[:1]
+
+    response = candidate["response"]
+    code = "\n\n".join(block.strip() for block in _CODE_BLOCK.findall(response))
+    before_code = _CODE_BLOCK.split(response, maxsplit=1)[0]
+    explanation = _FILE_HEADER.sub("", before_code).strip()
+    setup = _SETUP_SECTION.search(response)
+    setup_steps = []
+    if setup:
+        setup_steps = [
+            line.strip().lstrip("-*• ").strip()
+            for line in setup.group(1).splitlines()
+            if line.strip().startswith(("-", "*", "•"))
+        ]
+
+    digest = hashlib.sha1(candidate["token_key"].encode("utf-8")).hexdigest()[:10]
+    prompt = candidate["prompt"].strip().splitlines()[0] if candidate["prompt"].strip() else ""
+    return {
+        "id": f"learned_{digest}",
+        "title": prompt[:60] + ("..." if len(prompt) > 60 else ""),
+        "triggers": triggers,
+        "keywords": [t for t in tokens if t not in triggers],
+        "turkish_keywords": [],
+        "intent_types": ["generation"],
+        "min_total_matches": max(1, len(tokens) // 2 + 1),
+        "unity_version": "2021.3+",
+        "explanation": explanation,
+        "code": code,
+        "tips": [],
+        "setup_steps": setup_steps,
+        "source": "learned",
+        "critic_score": candidate.get("critic_score"),
+    }
+
+
+def load_overlay(path: Path) -> list:
+    """Overlay KB'deki entry'ler; dosya yoksa boş liste."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("entries", []) if isinstance(data, dict) else []
+
+
+def append_overlay_entry(path: Path, entry: dict) -> None:
+    """Entry'yi overlay KB dosyasına ekler (aynı id varsa değiştirir); atomik yazar."""
+    path = Path(path)
+    entries = [e for e in load_overlay(path) if e.get("id") != entry["id"]]
+    entries.append(entry)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"entries": entries}, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
@@ -18,8 +18,11 @@ Kullanım:
 
 import json
 import logging
+import os
 import re
 import sys
+import threading
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -28,6 +31,15 @@ from typing import Optional
 # CodeFixer: kb_engine ile aynı dizinde değil, bir üst dizinde
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from code_fixer import CodeFixer
+from lru_cache import LRUCache
+
+from .bm25 import BM25Ranker
+from .body_store import KBBodyStore
+from .kb_snapshot import json_digest, read_snapshot, snapshot_path, write_snapshot
+from .kb_telemetry import KBTelemetry
+from .stemmer import StemMatcher
+from .term_matcher import TermMatcher
+from .trigram_index import TrigramIndex
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +52,18 @@ def _get_kb_path() -> Path:
 
 KB_FILE = _get_kb_path()
 
+# lookup() sonuç önbelleğinin kapasitesi (farklı token seti + intent sayısı)
+KB_CACHE_SIZE = int(os.environ.get("KB_CACHE_SIZE", "512"))
+
+# Sıralama backend'i: "heuristic" (eşleşme oranı + trigger bonusu) veya "bm25"
+KB_RANKER = os.environ.get("KB_RANKER", "heuristic")
+
+# Terim eşleştirme modu: "substring" (TermMatcher) veya "stem" (StemMatcher)
+KB_MATCH_MODE = os.environ.get("KB_MATCH_MODE", "substring")
+
+# Normal eşleşme bulunamadığında yazım hatası toleranslı trigram fallback'i
+KB_FUZZY_FALLBACK = os.environ.get("KB_FUZZY_FALLBACK", "1") != "0"
+
 # Türkçe karakterleri normalize etmek için eşleştirme tablosu
 _TR_NORMALIZE = str.maketrans(
     "çğıöşüÇĞİÖŞÜ",
@@ -63,6 +87,133 @@ class KBResult:
     # Varyant/clarification alanları
     clarification_needed: bool = False              # True → kullanıcıya seçenek sor
     clarification_options: list = field(default_factory=list)  # [{id, title, variant_tags, variant_label}]
+    # Trigram fallback ile bulunduysa: yazım hatalı token → düzeltilmiş KB kelimesi
+    fuzzy_matches: dict = field(default_factory=dict)
+
+
+def _normalize(text: str) -> str:
+    """Küçük harf + Türkçe karakter normalizasyonu (_tokenize ile aynı alfabe)."""
+    return text.lower().translate(_TR_NORMALIZE).strip()
+
+
+class CompiledEntry:
+    """
+    Bir KB entry'sinin load-time derlenmiş, lookup'a hazır hali.
+
+    Terimler ve variant sinyalleri _load sırasında bir kez normalize edilip
+    frozenset/tuple olarak saklanır; lookup() sırasında normalizasyon veya
+    set oluşturma yapılmaz. Gövdesi (code/explanation/setup_steps) çıkarılmış
+    metadata entry'si `raw` içinde durur; gövde KBBodyStore'dan okunur.
+    """
+
+    __slots__ = (
+        "index", "entry_id", "triggers", "keywords", "total_terms",
+        "min_total", "intent_mask", "group", "variant_signals", "raw",
+    )
+
+    def __init__(self, index: int, raw: dict, triggers: frozenset, keywords: frozenset,
+                 intent_mask: int, variant_signals: tuple):
+        self.index = index
+        self.entry_id: str = raw["id"]
+        self.triggers = triggers                    # normalize edilmiş trigger'lar
+        self.keywords = keywords                    # keywords + turkish_keywords (normalize)
+        self.total_terms = len(triggers | keywords)
+        self.min_total: int = raw.get("min_total_matches", 1)
+        self.intent_mask = intent_mask              # desteklenen intent'lerin bit maskesi
+        self.group: Optional[str] = raw.get("group")
+        self.variant_signals = variant_signals      # ((sinyal, substring_izinli), ...)
+        self.raw = raw
+
+    def to_state(self) -> tuple:
+        """raw hariç tüm slot'lar (raw, snapshot'ta entries listesinden bağlanır)."""
+        return tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    @classmethod
+    def from_state(cls, state: tuple, raw: dict) -> "CompiledEntry":
+        entry = cls.__new__(cls)
+        for name, value in zip(cls.__slots__[:-1], state):
+            setattr(entry, name, value)
+        entry.raw = raw
+        return entry
+
+
+@dataclass(frozen=True)
+class _KBIndex:
+    """
+    Yüklü KB'nin tüm türetilmiş hali (metadata entry'leri, derlenmiş entry'ler,
+    ters indeks, matcher, gövde deposu). Tek referans olarak değiştirilir;
+    böylece lookup() asla yarı güncellenmiş bir KB görmez.
+    """
+    generation: int
+    entries: list            # gövdesi çıkarılmış metadata entry'leri
+    compiled: list
+    by_id: dict              # entry id → CompiledEntry
+    intent_bits: dict        # intent adı → bit (CompiledEntry.intent_mask için)
+    postings: dict           # terim → [(entry index, terim bu entry'de trigger mı?)]
+    matcher: TermMatcher | StemMatcher
+    bodies: KBBodyStore      # code / explanation / setup_steps (mmap)
+    source_digest: bytes = b""   # kaynak unity_kb.json'ın sha256'sı (snapshot doğrulaması)
+    bm25: Optional[BM25Ranker] = None   # sadece ranker="bm25" iken kurulur
+    trigrams: Optional[TrigramIndex] = None   # yazım hatası fallback'i (fuzzy=True)
+
+
+class _CachedLookup:
+    """Önbellekteki lookup sonucu + ilk ihtiyaçta render edilen markdown."""
+    __slots__ = ("result", "markdown")
+
+    def __init__(self, result: Optional[KBResult]):
+        self.result = result
+        self.markdown: Optional[str] = None
+
+
+# Regex metakarakterleri (\. \[ \< kaçışları literal sayılır)
+_REGEX_META = re.compile(r"[.*+?\\()\[\]{}^$|]")
+_ESCAPED_LITERAL = re.compile(r"\\([.\[<])")
+_LEADING_LITERAL = re.compile(r"(?:[A-Za-z0-9_<]|\\[.\[<])+")
+
+
+class _CodePattern:
+    """
+    lookup_for_code için class load anında derlenmiş bir _CODE_PATTERN_MAP satırı.
+
+    Pattern üst seviye `|` ile dallara ayrılır. Saf literal dallar regex yerine
+    `in` ile (C hızında substring arama) kontrol edilir; regex yapısı içeren
+    dallar önce baştaki literal çapa ile ön-elemeden geçer, sadece çapa kodda
+    varsa derlenmiş regex çalıştırılır. Grup veya karakter sınıfı içeren
+    pattern'ler tek bir regex olarak kalır.
+    """
+
+    __slots__ = ("pattern", "entry_id", "branches")
+
+    def __init__(self, pattern: str, entry_id: str):
+        self.pattern = pattern
+        self.entry_id = entry_id
+        # ((literal veya çapa, derlenmiş regex veya None), ...)
+        self.branches: tuple[tuple[str, Optional[re.Pattern]], ...] = tuple(
+            self._compile_branch(br) for br in self._split(pattern)
+        )
+
+    @staticmethod
+    def _split(pattern: str) -> list[str]:
+        unescaped = _ESCAPED_LITERAL.sub("", pattern.replace("\\\\", ""))
+        if any(ch in unescaped for ch in "()[]"):
+            return [pattern]
+        return pattern.split("|")
+
+    @staticmethod
+    def _compile_branch(branch: str) -> tuple[str, Optional[re.Pattern]]:
+        if not _REGEX_META.search(_ESCAPED_LITERAL.sub("", branch)):
+            return _ESCAPED_LITERAL.sub(r"\1", branch), None
+        m = _LEADING_LITERAL.match(branch)
+        anchor = _ESCAPED_LITERAL.sub(r"\1", m.group(0)) if m else ""
+        return anchor, re.compile(branch)
+
+    def search(self, code: str) -> bool:
+        """re.search(pattern, code) ile aynı sonucu döner."""
+        for anchor, rx in self.branches:
+            if anchor in code and (rx is None or rx.search(code)):
+                return True
+        return False
 
 
 # ─── KB Engine ───────────────────────────────────────────────────────────────
@@ -70,9 +221,9 @@ class KBEngine:
     """
     Unity bilgi bankası motoru.
 
-    Startup'ta JSON'ı tek seferinde yükler.
-    Her lookup() çağrısı O(n * k) karmaşıklığında çalışır
-    (n = entry sayısı, k = keyword sayısı — her ikisi de küçük).
+    Startup'ta JSON'ı tek seferinde yükler ve terim → entry ters indeksini kurar.
+    Her lookup() çağrısı sadece mesajla en az bir trigger paylaşan entry'leri
+    skorlar; KB büyüdükçe tüm entry'leri taramaz.
     """
 
     # Variant sinyal sözlüğü: normalize edilmiş tag → eşleşen token'lar
@@ -90,24 +241,306 @@ class KBEngine:
         "side scroller": ["platformer", "platform", "2d", "sidescroller"],
     }
 
-    def __init__(self, kb_path: Path = KB_FILE):
-        self._entries: list = []
-        self._load(kb_path)
+    _DEFAULT_INTENTS = ["chat", "generation"]
+
+    _RANKERS = ("heuristic", "bm25")
+
+    _MATCH_MODES = ("substring", "stem")
+
+    # Minimum skor eşiği — çok zayıf eşleşmeleri filtreler (false positive önleme)
+    _MIN_SCORE_THRESHOLD = 0.16
+
+    # coverage() hesabında yok sayılan istek fiilleri ve dolgu kelimeleri (normalize edilmiş)
+    _FILLER_TOKENS = frozenset({
+        "yaz", "olustur", "yap", "ekle", "kur", "gelistir", "hazirla", "ver", "istiyorum",
+        "nedir", "nasil", "ne", "neden", "kullanilir", "kullan", "yapilir", "edilir",
+        "icin", "ile", "ve", "veya", "bir", "bu", "su", "de", "da", "mi", "mu", "bana",
+        "olsun", "olan", "lutfen", "kod", "kodu", "script", "scripti", "sistem", "sistemi",
+        "ornek", "ornegi", "basit", "unity", "pattern", "implement",
+        "write", "create", "make", "how", "what", "is", "the", "an", "for", "with",
+        "and", "to", "in", "of", "me", "please", "code", "system",
+    })
+
+    def __init__(self, kb_path: Path = KB_FILE, cache_size: int = KB_CACHE_SIZE,
+                 use_snapshot: bool = True, ranker: str = KB_RANKER,
+                 match_mode: str = KB_MATCH_MODE, fuzzy: bool = KB_FUZZY_FALLBACK,
+                 overlay_path: Optional[Path] = None):
+        if ranker not in self._RANKERS:
+            raise ValueError(f"Bilinmeyen KB ranker: {ranker} (seçenekler: {', '.join(self._RANKERS)})")
+        if match_mode not in self._MATCH_MODES:
+            raise ValueError(
+                f"Bilinmeyen KB eşleştirme modu: {match_mode} (seçenekler: {', '.join(self._MATCH_MODES)})"
+            )
+        self._ranker = ranker
+        self._match_mode = match_mode
+        self._fuzzy = fuzzy
+        self._kb_path = Path(kb_path)
+        # Onaylanmış öğrenilmiş entry'lerin yazıldığı yerel KB (bkz. kb_candidates.py)
+        self.overlay_path: Optional[Path] = Path(overlay_path) if overlay_path else None
+        # True → önce derlenmiş snapshot'ı dene (bkz. kb_snapshot.py)
+        self._use_snapshot = use_snapshot
+        # (ana KB mtime, overlay mtime veya None)
+        self._kb_mtime: Optional[tuple] = None
+        self._generation = 0
+        self._index: _KBIndex = self._build_index([])
+        # (KB generation, token seti, intent) → _CachedLookup
+        self._cache = LRUCache(maxsize=cache_size)
+        # Aynı anda iki reload'un birbirinin indeksini ezmesini engeller
+        self._reload_lock = threading.Lock()
+        # Hit/miss sayaçları ve gecikme histogramı (metrics() ile raporlanır)
+        self._telemetry = KBTelemetry()
+        self._load(self._kb_path)
+
+    @property
+    def generation(self) -> int:
+        """Yüklü indeksin generation'ı; her reload'da artar (KB'ye bağlı önbellekler için)."""
+        return self._index.generation
+
+    @property
+    def _entries(self) -> list:
+        """
+        Yüklü KB entry'lerinin tam hali (metadata + gövde).
+        Her çağrıda tüm gövdeleri decode eder — sadece debug/test için.
+        """
+        index = self._index
+        return [{**entry, **index.bodies.read(i)} for i, entry in enumerate(index.entries)]
 
     # ── Yükleme ──────────────────────────────────────────────────────────────
     def _load(self, path: Path) -> None:
-        """JSON bilgi bankasını yükler. Dosya yoksa boş başlar."""
+        """Bilgi bankasını yükler (önce snapshot, sonra JSON). Dosya yoksa boş başlar."""
         if not path.exists():
             logger.warning(f"[KBEngine] Bilgi bankası bulunamadı: {path}")
             return
         try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            self._entries = data.get("entries", [])
-            logger.info(f"[KBEngine] {len(self._entries)} KB girdisi yüklendi.")
+            mtime = self._source_mtime()
+            self._swap_index(self._read_index(path))
+            self._kb_mtime = mtime
+            logger.info(f"[KBEngine] {len(self._index.entries)} KB girdisi yüklendi.")
         except Exception as e:
             logger.error(f"[KBEngine] JSON yüklenemedi: {e}")
 
+    def _read_index(self, path: Path) -> _KBIndex:
+        """
+        KB dosyasından indeks kurar. Geçerli bir snapshot varsa (aynı format
+        versiyonu + aynı JSON sha256) derlenmiş hali doğrudan yükler; yoksa
+        JSON'u parse edip indeksi baştan kurar.
+
+        overlay_path dosyası varsa entry'leri ana KB'ye eklenir; snapshot sadece
+        ana KB'yi kapsadığı için bu durumda atlanır.
+        """
+        raw = path.read_bytes()
+        overlay = self.overlay_path
+        if overlay is not None and overlay.exists():
+            overlay_raw = overlay.read_bytes()
+            entries = self._parse_entries(raw) + self._parse_entries(overlay_raw)
+            return self._build_index(entries, source_digest=json_digest(raw + overlay_raw))
+        digest = json_digest(raw)
+        if self._use_snapshot:
+            index = self._index_from_snapshot(snapshot_path(path), digest)
+            if index is not None:
+                logger.info(f"[KBEngine] Snapshot'tan yüklendi: {snapshot_path(path).name}")
+                return index
+        return self._build_index(self._parse_entries(raw), source_digest=digest)
+
+    @staticmethod
+    def _parse_entries(raw: bytes) -> list:
+        """KB JSON'unu parse eder ve entry listesini doğrular; bozuksa ValueError fırlatır."""
+        data = json.loads(raw.decode("utf-8"))
+        entries = data.get("entries") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError("'entries' listesi bulunamadı")
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict) or "id" not in entry or "title" not in entry:
+                raise ValueError(f"{i}. entry geçersiz (id/title eksik)")
+        return entries
+
+    # ── Snapshot ─────────────────────────────────────────────────────────────
+    def save_snapshot(self, path: Optional[Path] = None) -> Path:
+        """Yüklü indeksi derlenmiş snapshot olarak yazar (build adımı)."""
+        index = self._index
+        out = Path(path) if path else snapshot_path(self._kb_path)
+        blob, offsets, body_digest = index.bodies.export()
+        payload = {
+            "entries": index.entries,
+            "compiled": [c.to_state() for c in index.compiled],
+            "intent_bits": index.intent_bits,
+            "postings": index.postings,
+            # Snapshot her zaman substring matcher'ı taşır (stem modu yüklerken kendi tablosunu kurar)
+            "matcher": (
+                index.matcher if isinstance(index.matcher, TermMatcher) else TermMatcher(index.postings)
+            ).to_state(),
+            "body_offsets": offsets,
+            "body_digest": body_digest,
+        }
+        write_snapshot(out, index.source_digest, payload, blob)
+        return out
+
+    def _index_from_snapshot(self, path: Path, digest: bytes) -> Optional[_KBIndex]:
+        """Snapshot geçerliyse derlenmiş indeksi döner, değilse None (JSON'a düşülür)."""
+        snap = read_snapshot(path, digest)
+        if snap is None:
+            return None
+        payload, read_blob = snap
+        try:
+            entries = payload["entries"]
+            compiled = [CompiledEntry.from_state(st, entries[i]) for i, st in enumerate(payload["compiled"])]
+            offsets, body_digest = payload["body_offsets"], payload["body_digest"]
+            try:
+                bodies = KBBodyStore.attach(None, offsets, body_digest)
+            except OSError:
+                # Paylaşılan gövde dosyası henüz yok → snapshot'taki blob'dan yaz
+                bodies = KBBodyStore.attach(read_blob(), offsets, body_digest)
+            by_id: dict[str, CompiledEntry] = {}
+            for c in compiled:
+                by_id.setdefault(c.entry_id, c)
+            self._generation += 1
+            return _KBIndex(
+                generation=self._generation,
+                entries=entries,
+                compiled=compiled,
+                by_id=by_id,
+                intent_bits=payload["intent_bits"],
+                postings=payload["postings"],
+                # Snapshot substring matcher'ı taşır; stem tablosu postings'ten ucuzca kurulur
+                matcher=(
+                    TermMatcher.from_state(payload["matcher"]) if self._match_mode == "substring"
+                    else StemMatcher(payload["postings"])
+                ),
+                bodies=bodies,
+                source_digest=digest,
+                bm25=self._build_ranker(compiled),
+                trigrams=self._build_trigrams(entries, payload["postings"]),
+            )
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"[KBEngine] Snapshot bozuk, JSON kullanılacak: {e}")
+            return None
+
+    def reload(self) -> bool:
+        """
+        KB JSON'unu diskten yeniden okuyup yeni indeksi atomik olarak devreye alır.
+
+        Yeni indeks tamamen kurulduktan sonra tek atamayla değiştirilir; eşzamanlı
+        lookup() çağrıları ya eski ya yeni KB'yi görür. JSON bozuksa veya okunamazsa
+        eski KB hizmette kalır ve False döner.
+
+        Bloklayıcıdır — event loop içinden asyncio.to_thread(kb.reload) ile çağır.
+        """
+        with self._reload_lock:
+            path = self._kb_path
+            try:
+                mtime = self._source_mtime()
+                index = self._read_index(path)
+            except Exception as e:
+                logger.error(f"[KBEngine] Reload başarısız, eski KB korunuyor: {e}")
+                return False
+            self._swap_index(index)
+            self._kb_mtime = mtime
+            logger.info(f"[KBEngine] KB yeniden yüklendi: {len(index.entries)} girdi (gen {index.generation})")
+            return True
+
+    def reload_if_changed(self) -> bool:
+        """KB (veya overlay) dosyasının mtime'ı değiştiyse reload() çağırır. Yeniden yüklendiyse True."""
+        try:
+            mtime = self._source_mtime()
+        except OSError:
+            return False
+        if mtime == self._kb_mtime:
+            return False
+        if not self.reload():
+            # Bozuk dosyayı her poll'da tekrar denememek için mtime'ı işaretle
+            self._kb_mtime = mtime
+            return False
+        return True
+
+    def _source_mtime(self) -> tuple:
+        """Ana KB ve overlay dosyalarının mtime'ları; overlay yoksa ikincisi None."""
+        overlay = self.overlay_path
+        overlay_mtime = overlay.stat().st_mtime if overlay is not None and overlay.exists() else None
+        return (self._kb_path.stat().st_mtime, overlay_mtime)
+
+    def _swap_index(self, index: _KBIndex) -> None:
+        """
+        Yeni KB indeksini tek atamayla devreye alır ve önbelleği geçersiz kılar.
+        Önbellek anahtarı generation içerdiği için eski indeksle hesaplanıp
+        swap'tan sonra yazılan sonuçlar da bir daha okunmaz.
+        """
+        self._index = index
+        self._cache.clear()
+
+    def _build_index(self, entries: list, source_digest: bytes = b"") -> _KBIndex:
+        """
+        Entry gövdelerini KBBodyStore'a ayırır, metadata'yı derler ve
+        triggers + keywords + turkish_keywords üzerinden ters indeks kurar.
+
+        Her terim, onu içeren entry'lerin listesine (posting list) işaret eder.
+        lookup() mesajı derlenmiş TermMatcher ile tüm KB terimleriyle tek geçişte
+        eşleştirir, ardından sadece eşleşen terimlerin posting listelerini dolaşır.
+        """
+        bodies, meta_entries = KBBodyStore.build(entries)
+        intent_bits: dict[str, int] = {}
+        compiled: list[CompiledEntry] = []
+        by_id: dict[str, CompiledEntry] = {}
+        postings: dict[str, list[tuple[int, bool]]] = defaultdict(list)
+        for idx, entry in enumerate(meta_entries):
+            c = self._compile_entry(idx, entry, intent_bits)
+            compiled.append(c)
+            by_id.setdefault(c.entry_id, c)
+            for term in c.triggers | c.keywords:
+                postings[term].append((idx, term in c.triggers))
+        self._generation += 1
+        return _KBIndex(
+            generation=self._generation,
+            entries=meta_entries,
+            compiled=compiled,
+            by_id=by_id,
+            intent_bits=intent_bits,
+            postings=dict(postings),
+            matcher=self._build_matcher(postings),
+            bodies=bodies,
+            source_digest=source_digest,
+            bm25=self._build_ranker(compiled),
+            trigrams=self._build_trigrams(meta_entries, postings),
+        )
+
+    def _build_ranker(self, compiled: list) -> Optional[BM25Ranker]:
+        return BM25Ranker(compiled) if self._ranker == "bm25" else None
+
+    def _build_matcher(self, terms) -> TermMatcher | StemMatcher:
+        return StemMatcher(terms) if self._match_mode == "stem" else TermMatcher(terms)
+
+    def _build_trigrams(self, entries: list, postings) -> Optional[TrigramIndex]:
+        """KB terimlerinin kelimeleri + entry başlıkları üzerinde trigram indeksi."""
+        if not self._fuzzy:
+            return None
+        words = {word for term in postings for word in term.split()}
+        for entry in entries:
+            words.update(self._tokenize(entry["title"]))
+        return TrigramIndex(words)
+
+    def _compile_entry(self, idx: int, entry: dict, intent_bits: dict[str, int]) -> CompiledEntry:
+        """Ham JSON entry'sini normalize edilmiş CompiledEntry'ye çevirir."""
+        triggers = frozenset(_normalize(t) for t in entry.get("triggers", []))
+        keywords = frozenset(
+            _normalize(k) for k in entry.get("keywords", []) + entry.get("turkish_keywords", [])
+        )
+
+        intent_mask = 0
+        for name in entry.get("intent_types", self._DEFAULT_INTENTS):
+            bit = intent_bits.setdefault(name, 1 << len(intent_bits))
+            intent_mask |= bit
+
+        # Variant tag'leri _VARIANT_SIGNALS ile genişletilmiş sinyal listesine çevir
+        signals: list[str] = []
+        for tag in entry.get("variant_tags", []):
+            tag_norm = _normalize(tag)
+            for signal in self._VARIANT_SIGNALS.get(tag_norm, [tag_norm]):
+                sig_norm = signal.lower().translate(_TR_NORMALIZE)
+                if sig_norm not in signals:
+                    signals.append(sig_norm)
+        variant_signals = tuple((sig, len(sig) >= 3) for sig in signals)
+
+        return CompiledEntry(idx, entry, triggers, keywords, intent_mask, variant_signals)
+
     # ── Ana Arama ─────────────────────────────────────────────────────────────
     def lookup(self, message: str, intent: str = "chat") -> Optional[KBResult]:
         """
@@ -123,32 +556,202 @@ class KBEngine:
         KBResult  → Eşleşme bulunduysa
         None      → Eşleşme yoksa (LLM fallback)
         """
-        if not self._entries:
+        start = time.perf_counter()
+        slot = self._cached_lookup(message, intent)
+        result = slot.result if slot else None
+        self._record("lookup", intent, message, result, start)
+        return result
+
+    def lookup_response(self, message: str, intent: str = "chat") -> tuple[Optional[KBResult], Optional[str]]:
+        """
+        lookup() + kullanıcıya gönderilecek markdown.
+
+        Clarification sonucu için format_clarification, normal eşleşme için
+        format_response çıktısı döner. Markdown sonuçla birlikte önbellekte
+        tutulur; aynı soru tekrar geldiğinde yeniden render edilmez.
+        """
+        start = time.perf_counter()
+        slot = self._cached_lookup(message, intent)
+        self._record("lookup", intent, message, slot.result if slot else None, start)
+        if slot is None or slot.result is None:
+            return None, None
+        if slot.markdown is None:
+            result = slot.result
+            slot.markdown = (
+                self.format_clarification(result) if result.clarification_needed
+                else self.format_response(result, intent=intent)
+            )
+        return slot.result, slot.markdown
+
+    def coverage(self, message: str, result: KBResult) -> float:
+        """
+        Mesajdaki içerik token'larının (dolgu kelimeleri hariç) ne kadarının
+        sonucun eşleşen terimleriyle açıklandığı (0-1).
+
+        score entry tarafındaki kapsamayı ölçer; uzun ve çok parçalı bir istek
+        ("coyote time + dash + duvar zıplaması + ses efektleri") bir entry'ye
+        yüksek skorla eşleşip yine de o entry'nin cevaplamadığı şeyler isteyebilir.
+        coverage mesaj tarafını ölçer: 1.0 → mesajın her parçası bu entry'nin konusu.
+        """
+        tokens = [t for t in self._tokenize(message) if t not in self._FILLER_TOKENS]
+        if not tokens:
+            return 0.0
+        matched = set(result.matched_keywords)
+        # Çok kelimeli terimler ("object pool") parçalarını da kapsar
+        parts = {p for term in matched if " " in term for p in term.split()}
+        hits = self._index.matcher.match_many([{t} for t in tokens])
+        covered = sum(1 for t, terms in zip(tokens, hits) if t in parts or terms & matched)
+        return round(covered / len(tokens), 3)
+
+    def record_shortcut(self, intent: str, llm_calls: int) -> None:
+        """LLM modunda KB'nin doğrudan cevapladığı (LLM'e gitmeyen) isteği kaydeder."""
+        self._telemetry.record_shortcut(intent, llm_calls)
+
+    def record_forced_ai(self, intent: str) -> None:
+        """Kullanıcının KB cevabı yerine AI ile yeniden üretim istediğini kaydeder."""
+        self._telemetry.record_forced_ai(intent)
+
+    def _record(self, op: str, intent: str, message: str, result: Optional[KBResult], start: float) -> None:
+        """Telemetriye sonucu ve perf_counter başlangıcından beri geçen süreyi yazar."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        miss_tokens = self._tokenize(message) if result is None and op != "lookup_for_code" else ()
+        self._telemetry.record(op, intent, result, elapsed_ms, miss_tokens)
+
+    def _cached_lookup(self, message: str, intent: str) -> Optional[_CachedLookup]:
+        """Token seti + intent anahtarlı LRU önbellek üzerinden lookup."""
+        index = self._index
+        if not index.entries:
             return None
 
         tokens = self._tokenize(message)
-        raw_candidates: list[tuple[float, KBResult, dict]] = []  # (score, result, raw_entry)
+        key = (index.generation, tokens, intent)
+        slot = self._cache.get(key)
+        if slot is None:
+            slot = _CachedLookup(self._lookup_tokens(index, tokens, intent))
+            self._cache.put(key, slot)
+        else:
+            logger.debug(f"[KBEngine] Cache hit → intent={intent}")
+        return slot
+
+    def lookup_many(self, messages: list[str], intent: str = "chat") -> list[Optional[KBResult]]:
+        """
+        Birden fazla mesaj için lookup() — offline değerlendirme ve toplu triage için.
+
+        Tüm batch aynı KB indeksine karşı çalışır. Aynı token setine sahip
+        mesajlar bir kez skorlanır, önbellekte olanlar yeniden hesaplanmaz ve
+        kalanların terim eşleştirmesi TermMatcher.match_many ile token bazında
+        paylaşılır. Dönüş listesi messages ile aynı sıradadır.
+        """
+        start = time.perf_counter()
+        index = self._index
+        if not index.entries:
+            return [None] * len(messages)
+
+        token_sets = [self._tokenize(m) for m in messages]
+        resolved: dict[frozenset, Optional[KBResult]] = {}
+        pending: list[frozenset] = []
+        for tokens in dict.fromkeys(token_sets):
+            slot = self._cache.get((index.generation, tokens, intent))
+            if slot is None:
+                pending.append(tokens)
+            else:
+                resolved[tokens] = slot.result
+
+        for tokens, matched_terms in zip(pending, index.matcher.match_many(pending)):
+            result = self._lookup_tokens(index, tokens, intent, matched_terms)
+            self._cache.put((index.generation, tokens, intent), _CachedLookup(result))
+            resolved[tokens] = result
+
+        results = [resolved[tokens] for tokens in token_sets]
+        telemetry = self._telemetry
+        for tokens, result in zip(token_sets, results):
+            telemetry.record("lookup_many", intent, result, miss_tokens=tokens if result is None else ())
+        # Histogramda batch başına tek gözlem: mesaj başına ortalama süre
+        if messages:
+            telemetry.record_latency("lookup_many", (time.perf_counter() - start) * 1000 / len(messages))
+        return results
+
+    def _lookup_tokens(self, index: _KBIndex, tokens: frozenset, intent: str,
+                       matched_terms: Optional[set] = None) -> Optional[KBResult]:
+        """
+        Önbelleksiz asıl arama: verilen indeks üzerinde token setini skorlar.
+        matched_terms verilmişse (lookup_many) terim eşleştirmesi atlanır.
+        Exact / substring geçişi sonuç bulamazsa trigram fallback'i denenir.
+        """
+        # Mesajı tüm KB terimleriyle tek geçişte eşleştir
+        if matched_terms is None:
+            matched_terms = index.matcher.match(tokens)
+        result = self._rank(index, tokens, intent, matched_terms)
+        if result is None and index.trigrams is not None:
+            result = self._fuzzy_lookup(index, tokens, intent)
+        return result
+
+    def _fuzzy_lookup(self, index: _KBIndex, tokens: frozenset, intent: str) -> Optional[KBResult]:
+        """
+        Yazım hatası fallback'i: hiçbir KB terimiyle eşleşmeyen token'ları trigram
+        indeksiyle en benzer KB kelimesine düzeltir ve aramayı tekrarlar.
 
-        for entry in self._entries:
+        Trigger kapısı, min_total_matches, intent ve varyant kuralları aynen
+        uygulanır. Dönen skor düzeltmelerin ortalama benzerliğiyle çarpılır
+        (güven skoru); eşiğin altına düşerse miss sayılır.
+        """
+        corrections: dict[str, tuple[str, float]] = {}
+        for token in tokens:
+            if token in index.trigrams or index.matcher.match({token}):
+                continue
+            hit = index.trigrams.best(token)
+            if hit is not None:
+                corrections[token] = hit
+        if not corrections:
+            return None
+
+        corrected = frozenset({corrections[t][0] if t in corrections else t for t in tokens})
+        result = self._rank(index, corrected, intent, index.matcher.match(corrected))
+        if result is None:
+            return None
+
+        similarity = sum(sim for _, sim in corrections.values()) / len(corrections)
+        result.score = round(result.score * similarity, 3)
+        result.fuzzy_matches = {token: word for token, (word, _) in corrections.items()}
+        if result.score < self._MIN_SCORE_THRESHOLD and not result.clarification_needed:
+            logger.info(f"[KBEngine] Fuzzy miss (güven eşiği altı) → skor={result.score:.2f}")
+            return None
+        logger.info(f"[KBEngine] Fuzzy hit → '{result.entry_id}' düzeltmeler={result.fuzzy_matches}")
+        return result
+
+    def _rank(self, index: _KBIndex, tokens: frozenset, intent: str, matched_terms: set) -> Optional[KBResult]:
+        """Eşleşen terimlerin posting listelerinden adayları toplar, skorlar ve en iyisini seçer."""
+        intent_bit = index.intent_bits.get(intent, 0)
+        raw_candidates: list[tuple[float, KBResult, CompiledEntry]] = []  # (score, result, entry)
+
+        # Posting listelerinden entry bazında trigger / keyword eşleşmelerini topla
+        # BM25 backend: tüm aday entry'lerin skorları tek seyrek satır toplamıyla
+        bm25_scores = index.bm25.score(matched_terms) if index.bm25 is not None else None
+        trigger_hits: dict[int, set] = defaultdict(set)
+        keyword_hits: dict[int, set] = defaultdict(set)
+        for term in matched_terms:
+            for idx, is_trigger in index.postings[term]:
+                (trigger_hits if is_trigger else keyword_hits)[idx].add(term)
+
+        # Sadece en az bir trigger'ı eşleşen entry'ler aday (Kural 1);
+        # sıralı dolaşım eşit skorlarda KB sırasını korur
+        for idx in sorted(trigger_hits):
+            c = index.compiled[idx]
             # Bu entry istenilen intent'i destekliyor mu?
-            supported_intents = entry.get("intent_types", ["chat", "generation"])
-            if intent not in supported_intents:
+            if not c.intent_mask & intent_bit:
                 continue
 
-            score, matched = self._score(tokens, entry)
+            score, matched = self._score(c, trigger_hits[idx], keyword_hits[idx])
+            if score > 0 and bm25_scores is not None:
+                # Kural 1-2 (trigger kapısı, min_total) aynen geçerli. Kapsama oranı
+                # güven eşiğinin altındaysa aday elenir; geçenler BM25 ile sıralanır.
+                if score < self._MIN_SCORE_THRESHOLD:
+                    continue
+                score = round(bm25_scores.get(idx, 0.0), 3)
 
             if score > 0:
-                raw_candidates.append((score, KBResult(
-                    entry_id=entry["id"],
-                    title=entry["title"],
-                    explanation=entry.get("explanation", ""),
-                    code=entry.get("code", ""),
-                    tips=entry.get("tips", []),
-                    unity_version=entry.get("unity_version", "2021.3+"),
-                    score=score,
-                    matched_keywords=matched,
-                    setup_steps=entry.get("setup_steps", []),
-                ), entry))
+                # Gövde alanları boş — sadece kazanan sonuç _hydrate ile doldurulur
+                raw_candidates.append((score, self._make_result(c, score, matched), c))
 
         if not raw_candidates:
             logger.info(f"[KBEngine] Miss → intent={intent}, tokens={list(tokens)[:5]}")
@@ -159,10 +762,10 @@ class KBEngine:
         grouped: dict[str, list] = defaultdict(list)
         ungrouped: list[tuple[float, KBResult]] = []
 
-        for score, result, entry in raw_candidates:
-            grp = entry.get("group")
+        for score, result, c in raw_candidates:
+            grp = c.group
             if grp:
-                grouped[grp].append((score, result, entry))
+                grouped[grp].append((score, result, c))
             else:
                 ungrouped.append((score, result))
 
@@ -186,10 +789,10 @@ class KBEngine:
                         {
                             "id": r.entry_id,
                             "title": r.title,
-                            "variant_tags": e.get("variant_tags", []),
-                            "variant_label": e.get("variant_label", r.title),
+                            "variant_tags": c.raw.get("variant_tags", []),
+                            "variant_label": c.raw.get("variant_label", r.title),
                         }
-                        for s, r, e in sorted(grp_candidates, key=lambda x: x[0], reverse=True)
+                        for s, r, c in sorted(grp_candidates, key=lambda x: x[0], reverse=True)
                     ]
                     best_score = max(s for s, _, _ in grp_candidates)
                     clarification = KBResult(
@@ -214,7 +817,7 @@ class KBEngine:
         best_score, best_result = max(final_candidates, key=lambda x: x[0])
 
         # Minimum skor eşiği — çok zayıf eşleşmeleri filtrele (false positive önleme)
-        MIN_SCORE_THRESHOLD = 0.16
+        MIN_SCORE_THRESHOLD = self._MIN_SCORE_THRESHOLD
         if best_score < MIN_SCORE_THRESHOLD and not best_result.clarification_needed:
             logger.info(f"[KBEngine] Miss (skor eşiği altı) → skor={best_score:.2f} < {MIN_SCORE_THRESHOLD}")
             return None
@@ -223,8 +826,35 @@ class KBEngine:
             f"[KBEngine] Hit → '{best_result.title}' "
             f"(skor={best_score:.2f}, clarification={best_result.clarification_needed})"
         )
+        if not best_result.clarification_needed:
+            self._hydrate(index, best_result)
         return best_result
 
+    @staticmethod
+    def _make_result(c: CompiledEntry, score: float, matched: list) -> KBResult:
+        """Metadata'dan gövdesiz KBResult oluşturur."""
+        entry = c.raw
+        return KBResult(
+            entry_id=c.entry_id,
+            title=entry["title"],
+            explanation="",
+            code="",
+            tips=entry.get("tips", []),
+            unity_version=entry.get("unity_version", "2021.3+"),
+            score=score,
+            matched_keywords=matched,
+        )
+
+    @staticmethod
+    def _hydrate(index: _KBIndex, result: KBResult) -> KBResult:
+        """Sonucun code / explanation / setup_steps alanlarını body store'dan doldurur."""
+        c = index.by_id[result.entry_id]
+        body = index.bodies.read(c.index)
+        result.explanation = body.get("explanation", "")
+        result.code = body.get("code", "")
+        result.setup_steps = body.get("setup_steps", [])
+        return result
+
     # ── Variant Algılama ─────────────────────────────────────────────────────
     def _detect_variant(self, tokens: set, group_candidates: list) -> Optional[tuple]:
         """
@@ -235,34 +865,29 @@ class KBEngine:
             tokens = {"3d", "fps", "karakter", "kontrolcusu"}
             → character_controller_3d'nin variant_tags'i ["3d", "fps", "tps"] ile eşleşir
         """
-        # Her entry'nin variant_tag'lerini normalize ederek token'larla karşılaştır
+        # Variant sinyalleri _load sırasında normalize edildi (CompiledEntry.variant_signals)
         best_match: Optional[tuple] = None
         best_signal_len = 0  # Daha uzun/spesifik sinyal öncelikli
 
-        for score, result, entry in group_candidates:
-            variant_tags: list[str] = entry.get("variant_tags", [])
-            for tag in variant_tags:
-                tag_norm = tag.lower().translate(_TR_NORMALIZE).strip()
-                # Variant sinyali sözlüğünden genişletilmiş sinyal listesini al
-                signals = self._VARIANT_SIGNALS.get(tag_norm, [tag_norm])
-                for signal in signals:
-                    sig_norm = signal.lower().translate(_TR_NORMALIZE)
-                    # Token seti ile eşleştir (tam veya substring)
-                    for token in tokens:
-                        if sig_norm == token or (len(sig_norm) >= 3 and (sig_norm in token or token in sig_norm)):
-                            if len(sig_norm) > best_signal_len:
-                                best_signal_len = len(sig_norm)
-                                best_match = (score, result, entry)
-                            break
+        for candidate in group_candidates:
+            for sig, allow_substring in candidate[2].variant_signals:
+                # Token seti ile eşleştir (tam veya substring)
+                for token in tokens:
+                    if sig == token or (allow_substring and (sig in token or token in sig)):
+                        if len(sig) > best_signal_len:
+                            best_signal_len = len(sig)
+                            best_match = candidate
+                        break
 
         return best_match
 
     # ── Skor Hesaplama ────────────────────────────────────────────────────────
-    def _score(self, tokens: set, entry: dict) -> tuple[float, list]:
+    def _score(self, entry: CompiledEntry, trigger_matches: set, keyword_matches: set) -> tuple[float, list]:
         """
         Bir entry için eşleşme skoru hesaplar.
 
-        İki katmanlı eşleştirme:
+        trigger_matches / keyword_matches, lookup() içinde TermMatcher ve ters
+        indeksten gelen iki katmanlı eşleşmelerdir:
         1. Exact match: token == keyword
         2. Substring match: keyword token'ın içinde mi VEYA token keyword'ün içinde mi
            Örnek: "ziplama" → "zipla" (keyword token içinde), "ziplasin" → "zipla" (keyword token içinde)
@@ -271,16 +896,6 @@ class KBEngine:
         Kural 2 (Zorunlu): Toplam eşleşme >= min_total_matches.
         Kural 3 (Skor):    Toplam eşleşme / toplam keyword sayısı.
         """
-        triggers = set(entry.get("triggers", []))
-        keywords = set(entry.get("keywords", []))
-        tr_keywords = set(entry.get("turkish_keywords", []))
-        all_keywords = keywords | tr_keywords
-        min_total = entry.get("min_total_matches", 1)
-
-        # İki katmanlı eşleştirme
-        trigger_matches = self._fuzzy_match(tokens, triggers)
-        keyword_matches = self._fuzzy_match(tokens, all_keywords)
-
         # Tüm eşleşmeler (trigger'lar da keyword sayılır)
         all_matches = trigger_matches | keyword_matches
 
@@ -289,11 +904,11 @@ class KBEngine:
             return 0.0, []
 
         # Kural 2: Minimum toplam eşleşme sayısı
-        if len(all_matches) < min_total:
+        if len(all_matches) < entry.min_total:
             return 0.0, []
 
         # Skor hesapla (normalize)
-        total_keywords = len(triggers | all_keywords)
+        total_keywords = entry.total_terms
         score = len(all_matches) / total_keywords if total_keywords > 0 else 0.0
 
         # Trigger eşleşmesi bonus: trigger'lar yüksek sinyal, skoru hafif artır
@@ -302,49 +917,11 @@ class KBEngine:
 
         return round(score, 3), sorted(all_matches)
 
-    @staticmethod
-    def _fuzzy_match(tokens: set, keywords: set) -> set:
-        """
-        Token-keyword fuzzy eşleştirme.
-        Exact match + substring match (min 3 karakter).
-
-        "ziplasin" → "zipla" bulur (keyword token'ın içinde)
-        "coroutine" → "coroutine" bulur (exact)
-        "sg" → eşleşmez (2 karakter, çok kısa)
-        "ai hareket" → sadece "hareket" tokeni ile eşleşmez; her iki parça da gerekli
-        """
-        matched = set()
-        for kw in keywords:
-            # Çok kelimeli keyword: boşluk içeriyorsa parçaların TÜMÜ token setinde olmalı
-            if " " in kw:
-                parts = kw.split()
-                if all(p in tokens for p in parts):
-                    matched.add(kw)
-                continue
-
-            if kw in tokens:
-                # Exact match
-                matched.add(kw)
-                continue
-            if len(kw) < 4:
-                # 3 karakter ve altı keyword'ler sadece exact match ile eşleşir
-                # "so", "ai", "hp" gibi kısaltmalar substring'de false positive yaratır
-                continue
-            for token in tokens:
-                if len(token) < 4:
-                    continue
-                # keyword token'ın içinde mi? ("zipla" in "ziplasin")
-                # veya token keyword'ün içinde mi? ("pool" in "pooling")
-                if kw in token or token in kw:
-                    matched.add(kw)
-                    break
-        return matched
-
     # ── Tokenizer ─────────────────────────────────────────────────────────────
     @staticmethod
-    def _tokenize(text: str) -> set:
+    def _tokenize(text: str) -> frozenset:
         """
-        Metni token setine çevirir.
+        Metni token setine çevirir (önbellek anahtarı olabilmesi için frozenset).
 
         - Küçük harfe çevirir
         - Türkçe karakterleri normalize eder
@@ -355,8 +932,7 @@ class KBEngine:
         normalized = lowered.translate(_TR_NORMALIZE)
         # Harf ve rakam olmayan karakterleri boşluğa çevir
         cleaned = re.sub(r"[^a-z0-9\s]", " ", normalized)
-        tokens = {t for t in cleaned.split() if len(t) > 1}
-        return tokens
+        return frozenset(t for t in cleaned.split() if len(t) > 1)
 
     # ── Yanıt Formatlama ──────────────────────────────────────────────────────
     def format_clarification(self, result: KBResult) -> str:
@@ -712,6 +1288,11 @@ class KBEngine:
         (r"rb\.linearVelocity|_rb\.velocity|moveSpeed.*FixedUpdate|GetAxisRaw.*Horizontal", "movement_basic"),
     ]
 
+    # Öncelik sırası korunarak class load anında bir kez derlenir
+    _CODE_PATTERNS: tuple[_CodePattern, ...] = tuple(
+        _CodePattern(pattern, entry_id) for pattern, entry_id in _CODE_PATTERN_MAP
+    )
+
     def lookup_for_code(self, code: str) -> Optional[KBResult]:
         """
         Mevcut C# koduna en uygun KB referans şablonunu bulur.
@@ -722,30 +1303,24 @@ class KBEngine:
         Önce deterministik pattern eşleştirme (regex) dener.
         Pattern bulamazsa token tabanlı normal lookup'a düşer.
         """
-        import re as _re
-
-        # 1. Önce deterministik pattern map ile dene
-        for pattern, entry_id in self._CODE_PATTERN_MAP:
-            if _re.search(pattern, code):
-                # Entry ID ile doğrudan KB'den çek
-                for entry in self._entries:
-                    if entry["id"] == entry_id:
-                        logger.info(f"[KBEngine] lookup_for_code HIT → '{entry_id}' (pattern: {pattern[:30]})")
-                        return KBResult(
-                            entry_id=entry["id"],
-                            title=entry["title"],
-                            explanation=entry.get("explanation", ""),
-                            code=entry.get("code", ""),
-                            tips=entry.get("tips", []),
-                            unity_version=entry.get("unity_version", "2021.3+"),
-                            score=1.0,
-                            matched_keywords=[pattern[:30]],
-                            setup_steps=entry.get("setup_steps", []),
-                        )
+        start = time.perf_counter()
+        # 1. Önce deterministik pattern map ile dene (liste sırası = öncelik)
+        index = self._index
+        for cp in self._CODE_PATTERNS:
+            # Entry ID ile doğrudan KB'den çek (id → entry sözlüğü)
+            c = index.by_id.get(cp.entry_id)
+            if c is not None and cp.search(code):
+                logger.info(f"[KBEngine] lookup_for_code HIT → '{cp.entry_id}' (pattern: {cp.pattern[:30]})")
+                result = self._hydrate(index, self._make_result(c, 1.0, [cp.pattern[:30]]))
+                self._record("lookup_for_code", "code", code, result, start)
+                return result
 
         # 2. Fallback: kod metnini normal lookup'a gönder
         logger.info("[KBEngine] lookup_for_code: pattern miss → token lookup fallback")
-        return self.lookup(code, intent="chat")
+        slot = self._cached_lookup(code, "chat")
+        result = slot.result if slot else None
+        self._record("lookup_for_code", "code", code, result, start)
+        return result
 
     def format_fix_response(self, analysis_text: str, kb_result: KBResult) -> str:
         """
@@ -797,8 +1372,28 @@ class KBEngine:
 
     # ── Debug / İstatistik ────────────────────────────────────────────────────
     def stats(self) -> dict:
-        """Yüklü KB hakkında özet bilgi döner (debug için)."""
+        """Yüklü KB ve lookup önbelleği hakkında özet bilgi döner (debug için)."""
+        index = self._index
+        return {
+            "kb_path": str(self._kb_path),
+            "overlay_path": str(self.overlay_path) if self.overlay_path else None,
+            "total_entries": len(index.entries),
+            "entry_ids": [c.entry_id for c in index.compiled],
+            "generation": index.generation,
+            "ranker": self._ranker,
+            "match_mode": self._match_mode,
+            "fuzzy": self._fuzzy,
+            "body_store": index.bodies.stats(),
+            "cache": self._cache.stats(),
+        }
+
+    def metrics(self) -> dict:
+        """
+        Trafik telemetrisi: intent / entry bazında hit-miss sayaçları, miss
+        olan sorgulardaki en sık token'lar, gecikme histogramları ve önbellek.
+        """
         return {
-            "total_entries": len(self._entries),
-            "entry_ids": [e["id"] for e in self._entries],
+            "generation": self._index.generation,
+            **self._telemetry.snapshot(),
+            "cache": self._cache.stats(),
         }
@@ -0,0 +1,108 @@
+"""
+KB Snapshot — Önceden Derlenmiş İkili KB Dosyası
+================================================
+
+Masaüstü binary'si her açılışta unity_kb.json'ı parse edip indeksi
+(normalizasyon, posting listeleri, TermMatcher otomatı) yeniden kuruyordu.
+Build sırasında bu derlenmiş hal bir snapshot dosyasına yazılır; KBEngine
+açılışta önce snapshot'ı dener.
+
+Dosya düzeni:
+    header  : magic (8) | format versiyonu (u16) | JSON sha256 (32) | payload uzunluğu (u64)
+    payload : pickle — SADECE builtin tipler (dict/list/tuple/str/int/frozenset)
+    blob    : KBBodyStore gövde dosyasının içeriği (sadece gerektiğinde okunur)
+
+Snapshot şu durumlarda reddedilir ve JSON'a düşülür:
+  - Dosya yok / magic uyuşmuyor / format versiyonu farklı
+  - Header'daki sha256, mevcut unity_kb.json'ın sha256'sı ile aynı değil
+    (JSON düzenlendi ama snapshot yeniden üretilmedi)
+
+Payload, class referansı içermeyen kısıtlı bir Unpickler ile okunur; dosyaya
+enjekte edilmiş bir nesne kod çalıştıramaz.
+
+Build adımı (build_backend.sh):
+    cd app && python -m knowledge.build_snapshot
+"""
+
+import hashlib
+import io
+import logging
+import pickle
+import struct
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"UAKBSNAP"
+# Derlenmiş indeksin yapısı (CompiledEntry alanları, TermMatcher tabloları,
+# normalizasyon kuralları) değiştiğinde artır — eski snapshot'lar reddedilir
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sH32sQ")
+
+
+def snapshot_path(kb_path: Path) -> Path:
+    """unity_kb.json → unity_kb.snapshot"""
+    return Path(kb_path).with_suffix(".snapshot")
+
+
+def json_digest(raw: bytes) -> bytes:
+    return hashlib.sha256(raw).digest()
+
+
+class _BuiltinsOnlyUnpickler(pickle.Unpickler):
+    """Hiçbir global/class yüklemesine izin vermez."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Snapshot'ta izin verilmeyen tip: {module}.{name}")
+
+
+def write_snapshot(path: Path, source_digest: bytes, payload: dict, blob: bytes) -> None:
+    """Snapshot dosyasını yazar (tmp + rename)."""
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, source_digest, len(data)))
+        f.write(data)
+        f.write(blob)
+    tmp.replace(path)
+
+
+def read_snapshot(path: Path, source_digest: bytes) -> Optional[tuple[dict, Callable[[], bytes]]]:
+    """
+    Geçerli snapshot'ı okur.
+
+    Dönüş: (payload, gövde blob'unu okuyan fonksiyon) veya geçersizse None.
+    Blob sadece paylaşılan gövde dosyası henüz yoksa okunur.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, digest, payload_len = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC:
+                logger.warning(f"[KBSnapshot] Geçersiz dosya: {path}")
+                return None
+            if version != SNAPSHOT_VERSION:
+                logger.info(f"[KBSnapshot] Versiyon uyuşmuyor (v{version} ≠ v{SNAPSHOT_VERSION}), JSON kullanılacak")
+                return None
+            if digest != source_digest:
+                logger.info("[KBSnapshot] unity_kb.json snapshot'tan sonra değişmiş, JSON kullanılacak")
+                return None
+            payload = _BuiltinsOnlyUnpickler(io.BytesIO(f.read(payload_len))).load()
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+        logger.warning(f"[KBSnapshot] Okunamadı, JSON kullanılacak: {e}")
+        return None
+
+    blob_offset = _HEADER.size + payload_len
+
+    def read_blob() -> bytes:
+        with open(path, "rb") as f:
+            f.seek(blob_offset)
+            return f.read()
+
+    return payload, read_blob
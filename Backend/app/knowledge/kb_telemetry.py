@@ -0,0 +1,174 @@
+"""
+KB Telemetry — Hit/Miss Sayaçları ve Gecikme Histogramı
+=======================================================
+
+KBEngine hangi entry'lerin trafiğe cevap verdiğini, ne sıklıkla LLM'e
+düşüldüğünü ve lookup'ların ne kadar sürdüğünü bu sınıfa kaydeder:
+
+  - intent bazında hit / miss / clarification / fuzzy sayaçları
+  - entry bazında hit sayaçları (clarification'lar group id'si ile)
+  - miss olan sorgulardaki en sık token'lar (KB'ye eklenecek konu adayları)
+  - LLM modunda KB ön geçişinin cevapladığı istekler ve önlenen LLM çağrıları
+  - lookup / lookup_for_code / lookup_many için sabit kovalı gecikme histogramı
+
+Kayıt maliyeti birkaç dict artırımı + bisect'tir; tek bir kilit altında
+tutulur. Sayaçlar process ömrü boyunca birikir, KB reload'unda sıfırlanmaz.
+
+Kullanım:
+    telemetry = KBTelemetry()
+    telemetry.record("lookup", "chat", result, elapsed_ms)
+    telemetry.snapshot()
+"""
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional
+
+# Histogram kova üst sınırları (ms); son kova +inf
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+# Miss token sayacında tutulan en fazla farklı token (bellek sınırı)
+MAX_MISS_TOKENS = 2000
+# snapshot() çıktısında listelenen en sık miss token / entry sayısı
+TOP_N = 20
+
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı (Prometheus tarzı, kümülatif olmayan)."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Kova üst sınırı cinsinden yaklaşık yüzdelik (ms)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class KBTelemetry:
+    """KBEngine için thread-safe hit/miss sayaçları ve gecikme histogramları."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_intent: dict[str, Counter] = {}
+            self._by_entry: Counter = Counter()
+            self._miss_tokens: Counter = Counter()
+            self._latency: dict[str, LatencyHistogram] = {}
+            # intent → {"answered", "llm_calls_avoided", "forced_ai"}
+            self._shortcut: dict[str, Counter] = {}
+
+    def record(self, op: str, intent: str, result, elapsed_ms: Optional[float] = None,
+               miss_tokens: Iterable[str] = ()) -> None:
+        """
+        Bir lookup sonucunu kaydeder.
+
+        op          : "lookup" / "lookup_for_code" / "lookup_many"
+        result      : KBResult veya None (miss)
+        elapsed_ms  : None ise histogram güncellenmez (batch içindeki tekil sonuçlar)
+        miss_tokens : miss ise mesajın token'ları
+        """
+        if result is None:
+            outcome = "miss"
+        elif result.clarification_needed:
+            outcome = "clarification"
+        else:
+            outcome = "hit"
+        with self._lock:
+            counts = self._by_intent.get(intent)
+            if counts is None:
+                counts = self._by_intent[intent] = Counter()
+            counts[outcome] += 1
+            if result is not None:
+                self._by_entry[result.entry_id] += 1
+                if result.fuzzy_matches:
+                    counts["fuzzy"] += 1
+            else:
+                for token in miss_tokens:
+                    if token in self._miss_tokens or len(self._miss_tokens) < MAX_MISS_TOKENS:
+                        self._miss_tokens[token] += 1
+            if elapsed_ms is not None:
+                self._observe(op, elapsed_ms)
+
+    def record_shortcut(self, intent: str, llm_calls: int) -> None:
+        """LLM modunda KB'nin cevapladığı isteği ve atlanan en az LLM çağrı sayısını kaydeder."""
+        with self._lock:
+            counts = self._shortcut.setdefault(intent, Counter())
+            counts["answered"] += 1
+            counts["llm_calls_avoided"] += llm_calls
+
+    def record_forced_ai(self, intent: str) -> None:
+        """KB ön geçişinin kullanıcı isteğiyle atlandığı (AI ile yeniden üret) isteği kaydeder."""
+        with self._lock:
+            self._shortcut.setdefault(intent, Counter())["forced_ai"] += 1
+
+    def record_latency(self, op: str, elapsed_ms: float) -> None:
+        """Sonuç saymadan sadece gecikme gözlemi ekler."""
+        with self._lock:
+            self._observe(op, elapsed_ms)
+
+    def _observe(self, op: str, elapsed_ms: float) -> None:
+        hist = self._latency.get(op)
+        if hist is None:
+            hist = self._latency[op] = LatencyHistogram()
+        hist.observe(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        """Tüm sayaçların JSON'a uygun kopyası."""
+        with self._lock:
+            by_intent = {}
+            for intent, counts in self._by_intent.items():
+                total = counts["hit"] + counts["miss"] + counts["clarification"]
+                by_intent[intent] = {
+                    "hit": counts["hit"],
+                    "miss": counts["miss"],
+                    "clarification": counts["clarification"],
+                    "fuzzy": counts["fuzzy"],
+                    "total": total,
+                    "hit_ratio": round((total - counts["miss"]) / total, 3) if total else 0.0,
+                }
+            return {
+                "by_intent": by_intent,
+                "by_entry": dict(self._by_entry),
+                "top_entries": self._by_entry.most_common(TOP_N),
+                "top_miss_tokens": self._miss_tokens.most_common(TOP_N),
+                "latency": {op: hist.snapshot() for op, hist in self._latency.items()},
+                "shortcut": {
+                    intent: {key: counts[key] for key in ("answered", "llm_calls_avoided", "forced_ai")}
+                    for intent, counts in self._shortcut.items()
+                },
+            }
@@ -0,0 +1,61 @@
+"""
+KB Watcher — unity_kb.json Değişikliklerini İzler
+=================================================
+
+Backend'i yeniden başlatmadan KB güncellemek için: KB dosyasının mtime'ını
+periyodik olarak kontrol eder, değiştiyse KBEngine.reload_if_changed()'i
+event loop dışında (asyncio.to_thread) çalıştırır. Böylece yeni indeks
+kurulurken devam eden istekler ve uzun pipeline'lar bloklanmaz.
+
+Kullanım (main.py startup/shutdown):
+    watcher = KBWatcher(kb, interval=2.0)
+    watcher.start()
+    ...
+    await watcher.stop()
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from .kb_engine import KBEngine
+
+logger = logging.getLogger(__name__)
+
+# Poll aralığı (saniye). 0 → izleme kapalı (sadece KB operatörünün /kb/reload isteği)
+KB_WATCH_INTERVAL = float(os.environ.get("KB_WATCH_INTERVAL", "2.0"))
+
+
+class KBWatcher:
+    """KB dosyasını mtime üzerinden izleyen asyncio görevi."""
+
+    def __init__(self, kb: KBEngine, interval: float = KB_WATCH_INTERVAL):
+        self.kb = kb
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Çalışan event loop üzerinde izleme görevini başlatır."""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"[KBWatcher] İzleniyor ({self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.kb.reload_if_changed)
+            except Exception as e:
+                logger.error(f"[KBWatcher] Kontrol başarısız: {e}")
@@ -0,0 +1,132 @@
+"""
+Stem Matcher — KB Terimleri için Ek Atan (Suffix-Stripping) Eşleştirici
+=======================================================================
+
+TermMatcher substring kuralıyla çalışır: "zipla" ⊂ "ziplasin" eşleşir ama
+"ai" ⊂ "tail" gibi false positive'ler minimum uzunluk kurallarıyla bastırılmak
+zorundadır. Bu modül alternatif bir eşleştirme modu sunar: hem KB terimleri
+hem mesaj token'ları aynı hafif Türkçe/İngilizce stemmer'dan geçirilir ve
+eşleşme stem eşitliğiyle (tek hash lookup) yapılır.
+
+  "ziplasin" → "zipl"   "ziplama" → "zipl"   "zipla" → "zipl"
+  "enemies"  → "enem"   "enemy"   → "enemy"  (İngilizce çoğul: kısmi)
+
+Girdi _tokenize / _normalize çıktısıdır (küçük harf, _TR_NORMALIZE ile ASCII);
+ekler bu yüzden ASCII yazılır ("ı" → "i", "ş" → "s"). Stemmer kural tabanlıdır,
+sözlük kullanmaz: en uzun ek önce denenir, stem MIN_STEM_LEN'in altına
+düşmeyecekse atılır ve ek kalmayana kadar tekrarlanır.
+
+StemMatcher TermMatcher ile aynı arayüzü sunar (match / match_many /
+to_state / from_state); KBEngine match_mode="stem" iken bunu kullanır.
+
+Kullanım:
+    matcher = StemMatcher(["zipla", "object pool"])
+    matcher.match({"ziplasin", "object", "pooling"})   # {"zipla", "object pool"}
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable
+
+# Stem bu uzunluğun altına inmez — "ses" → "se", "oyun" → "oy" gibi çakışmaları önler
+MIN_STEM_LEN = 4
+
+# ASCII-normalize Türkçe ekler (çoğul, iyelik, hal, fiil çekimi, yapım ekleri)
+_TR_SUFFIXES = (
+    "lari", "leri", "lar", "ler",
+    "sini", "sinin", "sina", "sine", "si", "su",
+    "nin", "nun", "in", "un",
+    "dan", "den", "tan", "ten", "da", "de", "ta", "te",
+    "yla", "yle", "la", "le", "ile",
+    "ni", "nu", "na", "ne", "ya", "ye", "yi", "yu",
+    "mak", "mek", "ma", "me",
+    "iyor", "uyor", "yor",
+    "acak", "ecek", "sin", "sun",
+    "cak", "cek", "dir", "dur", "tir", "tur",
+    "di", "du", "ti", "tu", "mis", "mus",
+    "cilik", "lik", "luk", "ci", "cu",
+    "siz", "suz", "li", "lu",
+    "ki", "a", "e", "i", "u",
+)
+
+# İngilizce çekim ekleri (çoğul, -ing, -ed, -er)
+_EN_SUFFIXES = ("ing", "ies", "ers", "ed", "es", "er", "s")
+
+# En uzun ek önce denenir ("lari" > "lar" > "a")
+_SUFFIXES = tuple(sorted(set(_TR_SUFFIXES + _EN_SUFFIXES), key=len, reverse=True))
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """
+    Normalize edilmiş token'ın stem'i.
+
+    Sonuç önbelleklenir: aynı token (ör. sık geçen "kod", "yaz") her
+    mesajda yeniden işlenmez.
+    """
+    changed = True
+    while changed and len(token) > MIN_STEM_LEN:
+        changed = False
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LEN:
+                token = token[: -len(suffix)]
+                changed = True
+                break
+    return token
+
+
+class StemMatcher:
+    """
+    Sabit bir terim kümesi için stem tablosu.
+
+    KB yüklenirken her terimin stem'i bir kez hesaplanır (stem → terimler).
+    match() her token için bir stem + bir dict lookup yapar; maliyet mesajdaki
+    token sayısıyla orantılıdır, terim uzunluğuna veya KB boyutuna bağlı değildir.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        by_stem: dict[str, set[str]] = defaultdict(set)
+        # Çok kelimeli terimler: ilk parçanın stem'i → [(terim, parça stem'leri)]
+        multi: dict[str, list[tuple[str, tuple[str, ...]]]] = defaultdict(list)
+        for term in set(terms):
+            if " " in term:
+                parts = tuple(stem(p) for p in term.split())
+                if parts:
+                    multi[parts[0]].append((term, parts))
+                continue
+            by_stem[stem(term)].add(term)
+        self._by_stem: dict[str, tuple[str, ...]] = {s: tuple(sorted(ts)) for s, ts in by_stem.items()}
+        self._multi = dict(multi)
+
+    # ── Snapshot ─────────────────────────────────────────────────────────────
+    def to_state(self) -> tuple:
+        """Stem tablolarını builtin tiplerle döner (kb_snapshot için)."""
+        return (self._by_stem, self._multi)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "StemMatcher":
+        matcher = cls.__new__(cls)
+        matcher._by_stem, matcher._multi = state
+        return matcher
+
+    # ── Eşleştirme ───────────────────────────────────────────────────────────
+    def match(self, tokens: set) -> set:
+        """Token setiyle stem'i eşleşen tüm terimleri döner."""
+        return self.match_many([tokens])[0]
+
+    def match_many(self, token_sets: list) -> list[set]:
+        """Birden fazla token seti için match()."""
+        by_stem, multi = self._by_stem, self._multi
+        results: list[set] = []
+        for tokens in token_sets:
+            stems = {stem(t) for t in tokens}
+            matched: set[str] = set()
+            for s in stems:
+                hits = by_stem.get(s)
+                if hits:
+                    matched.update(hits)
+                for term, parts in multi.get(s, ()):
+                    if all(p in stems for p in parts):
+                        matched.add(term)
+            results.append(matched)
+        return results
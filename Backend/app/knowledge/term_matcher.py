@@ -0,0 +1,171 @@
+"""
+Term Matcher — KB Terimleri için Derlenmiş Substring Eşleştirici
+================================================================
+
+KBEngine'in eski _fuzzy_match döngüsü her lookup'ta
+her keyword × her token için `kw in token or token in kw` çalıştırıyordu
+(O(token × keyword × uzunluk)). Uzun yapıştırılan mesajlarda —
+örneğin lookup_for_code fallback'inde tüm C# dosyası — bu çok yavaştı.
+
+TermMatcher KB yüklenirken bir kez derlenir ve mesajı tek geçişte eşleştirir:
+  - Exact match      → hash set lookup
+  - keyword ⊂ token  → Aho-Corasick otomatı (tüm uzun keyword'ler tek geçişte)
+  - token ⊂ keyword  → keyword'lerin tüm ≥4 karakterlik alt dizgilerinin indeksi
+  - Çok kelimeli     → ilk parça üzerinden indeks, parçaların TÜMÜ token setinde olmalı
+
+Eşleştirme kuralları eski _fuzzy_match ile birebir aynıdır:
+  "ziplasin" → "zipla" bulur (keyword token'ın içinde)
+  "coroutine" → "coroutine" bulur (exact)
+  "sg" → eşleşmez (kısa keyword'ler sadece exact match ile eşleşir)
+  "ai hareket" → sadece "hareket" tokeni ile eşleşmez; her iki parça da gerekli
+
+Kullanım:
+    matcher = TermMatcher(["zipla", "pool", "object pool"])
+    matcher.match({"ziplasin", "object", "pool"})   # {"zipla", "pool", "object pool"}
+"""
+
+from collections import defaultdict, deque
+from typing import Iterable
+
+# Substring eşleşmesi için minimum uzunluk — "so", "ai", "hp" gibi kısaltmalar
+# substring'de false positive yaratır, sadece exact match ile eşleşirler
+MIN_SUBSTRING_LEN = 4
+
+
+class TermMatcher:
+    """
+    Sabit bir terim kümesi için derlenmiş eşleştirici.
+
+    Derleme maliyeti terim sayısı × terim uzunluğu² kadardır ve KB yüklenirken
+    bir kez ödenir. match() maliyeti mesajdaki token karakter sayısıyla orantılıdır;
+    KB'deki keyword sayısından bağımsızdır.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._exact: set[str] = set()
+        # Çok kelimeli terimler: ilk parça → [(terim, parçalar)]
+        self._multi: dict[str, list[tuple[str, tuple[str, ...]]]] = defaultdict(list)
+        # token ⊂ keyword: alt dizgi → onu içeren uzun terimler
+        self._contained_in: dict[str, set[str]] = defaultdict(set)
+
+        long_terms: list[str] = []
+        for term in set(terms):
+            if " " in term:
+                parts = tuple(term.split())
+                if parts:
+                    self._multi[parts[0]].append((term, parts))
+                continue
+            self._exact.add(term)
+            if len(term) >= MIN_SUBSTRING_LEN:
+                long_terms.append(term)
+                self._index_substrings(term)
+
+        self._multi = dict(self._multi)
+        self._contained_in = dict(self._contained_in)
+        self._build_automaton(long_terms)
+
+    # ── Derleme ───────────────────────────────────────────────────────────────
+    def _index_substrings(self, term: str) -> None:
+        """Terimin ≥4 karakterlik tüm alt dizgilerini (terimin kendisi dahil) indeksler."""
+        n = len(term)
+        for start in range(n - MIN_SUBSTRING_LEN + 1):
+            for end in range(start + MIN_SUBSTRING_LEN, n + 1):
+                self._contained_in[term[start:end]].add(term)
+
+    def _build_automaton(self, terms: list[str]) -> None:
+        """Uzun terimler için Aho-Corasick otomatı (goto / fail / output tabloları) kurar."""
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[str, ...]] = [()]
+        for term in terms:
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state] = out[state] + (term,)
+
+        # BFS ile fail linkleri: en uzun uygun sonek durumuna geri düş
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    # ── Snapshot ─────────────────────────────────────────────────────────────
+    def to_state(self) -> tuple:
+        """Derlenmiş tabloları builtin tiplerle döner (kb_snapshot için)."""
+        return (self._exact, self._multi, self._contained_in, self._goto, self._fail, self._out)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "TermMatcher":
+        """to_state() çıktısından derleme yapmadan matcher oluşturur."""
+        matcher = cls.__new__(cls)
+        (matcher._exact, matcher._multi, matcher._contained_in,
+         matcher._goto, matcher._fail, matcher._out) = state
+        return matcher
+
+    # ── Eşleştirme ───────────────────────────────────────────────────────────
+    def match(self, tokens: set) -> set:
+        """Token setiyle eşleşen tüm terimleri döner."""
+        return self.match_many([tokens])[0]
+
+    def match_many(self, token_sets: list) -> list[set]:
+        """
+        Birden fazla token seti için match().
+
+        Tek kelimeli eşleşmeler token başına bir kez hesaplanır ve batch
+        boyunca paylaşılır; aynı token'ı içeren mesajlar otomatı tekrar taramaz.
+        """
+        memo: dict[str, tuple[str, ...]] = {}
+        multi = self._multi
+        results: list[set] = []
+        for tokens in token_sets:
+            matched: set[str] = set()
+            for token in tokens:
+                hits = memo.get(token)
+                if hits is None:
+                    hits = memo[token] = self._match_token(token)
+                if hits:
+                    matched.update(hits)
+                for term, parts in multi.get(token, ()):
+                    if all(p in tokens for p in parts):
+                        matched.add(term)
+            results.append(matched)
+        return results
+
+    def _match_token(self, token: str) -> tuple[str, ...]:
+        """Tek bir token'la eşleşen tek kelimeli terimler."""
+        hits: list[str] = []
+        if token in self._exact:
+            hits.append(token)
+        if len(token) < MIN_SUBSTRING_LEN:
+            return tuple(hits)
+
+        # token keyword'ün içinde mi? ("pool" in "pooling")
+        hits.extend(self._contained_in.get(token, ()))
+
+        # keyword token'ın içinde mi? ("zipla" in "ziplasin")
+        if len(self._goto) > 1:
+            goto, fail, out = self._goto, self._fail, self._out
+            state = 0
+            for ch in token:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                if out[state]:
+                    hits.extend(out[state])
+        return tuple(hits)
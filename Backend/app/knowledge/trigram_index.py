@@ -0,0 +1,108 @@
+"""
+Trigram Index — Yazım Hatasına Toleranslı KB Kelime Düzeltici
+=============================================================
+
+Yanlış yazılmış bir kelime ("corutine", "raycst", "objet") ne exact ne de
+substring eşleşmesiyle KB terimlerine ulaşır; lookup miss olur ve istek
+ücretli LLM çağrısına düşer. Bu modül KB yüklenirken keyword / trigger
+kelimelerinden ve entry başlıklarından karakter trigram indeksi kurar;
+lookup'ın normal geçişleri hiçbir şey bulamadığında eşleşmeyen token'lar
+en benzer KB kelimesine düzeltilir.
+
+  - Kelimeler sınır işaretiyle trigramlara bölünür: "pool" → $po, poo, ool, ol$
+  - trigram → kelime id'leri (array("I") posting listesi)
+  - Aday üretimi: ortak trigram sayısına göre en iyi MAX_CANDIDATES kelime
+  - Doğrulama: Damerau-Levenshtein (OSA) mesafesi; harf düşmesi, fazla harf,
+    yanlış harf ve yer değiştirme ("haerket") birer düzenleme sayılır
+  - Güven: 1 - mesafe / uzun kelimenin uzunluğu
+
+Maliyet token başına trigram sayısı × posting uzunluğu + birkaç kısa mesafe
+hesabıdır ve sadece miss yolunda ödenir.
+
+Kullanım:
+    index = TrigramIndex(["coroutine", "raycast"])
+    index.best("corutine")      # ("coroutine", 0.889)
+"""
+
+from array import array
+from typing import Iterable, Optional
+
+# Bu uzunluğun altındaki token'lar düzeltilmez ("ai", "fps" gibi kısaltmalar)
+MIN_FUZZY_LEN = 4
+# Mesafesi hesaplanan en fazla aday kelime (ortak trigram sayısına göre)
+MAX_CANDIDATES = 24
+# İzin verilen en fazla düzenleme: 4-5 harfli token'da 1, daha uzunlarda 2
+LONG_TOKEN_LEN = 6
+
+
+def trigrams(word: str) -> set[str]:
+    """Sınır işaretli ($) karakter trigram seti."""
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment (Damerau-Levenshtein) mesafesi.
+    limit aşıldığı anda limit + 1 döner.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class TrigramIndex:
+    """Sabit bir kelime kümesi üzerinde trigram → kelime posting indeksi."""
+
+    def __init__(self, words: Iterable[str]):
+        self.words: list[str] = sorted({w for w in words if len(w) >= MIN_FUZZY_LEN - 1})
+        self._known = frozenset(self.words)
+        rows: dict[str, list[int]] = {}
+        for word_id, word in enumerate(self.words):
+            for gram in trigrams(word):
+                rows.setdefault(gram, []).append(word_id)
+        self._postings: dict[str, array] = {gram: array("I", ids) for gram, ids in rows.items()}
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._known
+
+    def best(self, token: str) -> Optional[tuple[str, float]]:
+        """
+        Token'a en yakın kelime ve güven skoru (0-1); izin verilen düzenleme
+        sayısında kelime yoksa None. Eşit mesafede alfabetik ilk kelime döner.
+        """
+        if len(token) < MIN_FUZZY_LEN or token in self._known:
+            return None
+        shared: dict[int, int] = {}
+        for gram in trigrams(token):
+            ids = self._postings.get(gram)
+            if ids is None:
+                continue
+            for word_id in ids:
+                shared[word_id] = shared.get(word_id, 0) + 1
+        if not shared:
+            return None
+
+        limit = 1 if len(token) < LONG_TOKEN_LEN else 2
+        candidates = sorted(shared, key=lambda w: (-shared[w], w))[:MAX_CANDIDATES]
+        best_id, best_dist = -1, limit + 1
+        for word_id in sorted(candidates):
+            dist = edit_distance(token, self.words[word_id], min(limit, best_dist))
+            if dist < best_dist:
+                best_id, best_dist = word_id, dist
+        if best_id < 0:
+            return None
+        word = self.words[best_id]
+        return word, round(1.0 - best_dist / max(len(token), len(word)), 3)
@@ -0,0 +1,69 @@
+"""
+LRU Cache — Thread-safe, boyut sınırlı bellek içi önbellek.
+
+KBEngine lookup sonuçları gibi tekrar eden, saf hesaplamaların
+sonuçlarını tutmak için kullanılır. Hit/miss sayaçları stats()
+ile raporlanır.
+
+Kullanım:
+    cache = LRUCache(maxsize=256)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.put(key, value)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """En az kullanılanı atan, kilitli (thread-safe) anahtar-değer önbelleği."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Değeri döner ve en yeni olarak işaretler; yoksa None."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Değeri ekler; kapasite aşılırsa en eski kaydı atar."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Tüm kayıtları siler (sayaçlar korunur)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
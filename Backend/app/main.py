@@ -1,5 +1,7 @@
 import logging
+import multiprocessing
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -10,13 +12,18 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from analysis_cache import AnalysisCache
 from database import DatabaseManager
-from knowledge import KBEngine
+from knowledge import KBEngine, KBWatcher
+from project_scan import ProjectScanner
+from symbol_index import SymbolIndex
+from workspace_watcher import WorkspaceWatchers
 from routes import (
     create_analysis_router,
     create_auth_router,
     create_config_router,
     create_conversation_router,
+    create_kb_router,
     create_workspace_router,
 )
 
@@ -37,10 +44,42 @@ def _resolve_db_path() -> str:
     return os.path.join(db_folder, "unity_master_v3.db")
 
 
+def _resolve_kb_overlay_path(db_path: str) -> Path:
+    # Onaylanmış öğrenilmiş KB entry'leri — varsayılan olarak veritabanının yanında
+    overlay_path = os.environ.get("KB_OVERLAY_PATH")
+    if overlay_path:
+        return Path(overlay_path)
+    return Path(db_path).parent / "unity_kb.local.json"
+
+
+def _build_analysis_cache(db: DatabaseManager) -> AnalysisCache:
+    # ANALYSIS_CACHE_SQLITE=0 → sadece bellek katmanı
+    use_sqlite = os.environ.get("ANALYSIS_CACHE_SQLITE", "1") != "0"
+    maxsize = int(os.environ.get("ANALYSIS_CACHE_SIZE", "256"))
+    return AnalysisCache(db if use_sqlite else None, maxsize=maxsize)
+
+
 db_path = _resolve_db_path()
-app = FastAPI(title="Unity Architect AI")
 db = DatabaseManager(db_path=db_path)
-kb = KBEngine()
+kb = KBEngine(overlay_path=_resolve_kb_overlay_path(db_path))
+analysis_cache = _build_analysis_cache(db)
+kb_watcher = KBWatcher(kb)
+project_scanner = ProjectScanner()
+symbol_index = SymbolIndex(db)
+workspace_watchers = WorkspaceWatchers(analysis_cache, kb)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # unity_kb.json değişince restart gerektirmeden yeniden yükle
+    kb_watcher.start()
+    yield
+    await kb_watcher.stop()
+    await workspace_watchers.stop_all()
+    project_scanner.shutdown()
+
+
+app = FastAPI(title="Unity Architect AI", lifespan=lifespan)
 PROGRESS_STORE = {}
 
 _ALLOWED_ORIGINS = [
@@ -63,9 +102,10 @@ app.add_middleware(
 
 app.include_router(create_auth_router(db))
 app.include_router(create_config_router(db))
-app.include_router(create_analysis_router(db))
-app.include_router(create_workspace_router(db))
-app.include_router(create_conversation_router(db, kb, PROGRESS_STORE))
+app.include_router(create_analysis_router(db, analysis_cache))
+app.include_router(create_workspace_router(db, project_scanner, workspace_watchers, symbol_index))
+app.include_router(create_conversation_router(db, kb, PROGRESS_STORE, analysis_cache, symbol_index))
+app.include_router(create_kb_router(db, kb))
 
 
 @app.get("/health")
@@ -74,6 +114,9 @@ def health_check():
 
 
 if __name__ == "__main__":
+    # PyInstaller (backend.spec): ProjectScanner'ın 'spawn' worker'ları donmuş entrypoint'i
+    # yeniden çalıştırır; freeze_support olmadan her worker aynı portta yeni sunucu açmaya çalışır
+    multiprocessing.freeze_support()
     uvicorn.run(
         app,
         host=os.environ.get("HOST", "127.0.0.1"),
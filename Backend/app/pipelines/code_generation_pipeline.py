@@ -231,6 +231,8 @@ Düzeltme talimatları:
                 logger.info(f"  [Game Feel Check] Skor: {gf_score:.1f}/10 (Eşik: {self.GAME_FEEL_THRESHOLD})")
                 
                 if gf_score >= self.GAME_FEEL_THRESHOLD:
+                    # Skor sadece son üretilen koda aitse saklanır (KB aday kaydı bunu kullanır)
+                    self._result.game_feel_data = gf_result
                     if self.progress_callback: self.progress_callback("step3", "completed", dur3)
                     logger.info(f"  ✅ Game Feel yeterli, loop sonlandırıldı (deneme {attempt})")
                     break
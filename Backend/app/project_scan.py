@@ -0,0 +1,179 @@
+"""
+Project Scan — Unity Workspace'inin Paralel Analizi
+===================================================
+
+/analyze ve /chat tek bir yapıştırılmış scripti analiz eder. Bu modül
+kullanıcının kayıtlı workspace'indeki Assets/Scripts altındaki tüm .cs
+dosyalarını bir process havuzunda UnityAnalyzer + CodeFixer'dan geçirir:
+
+  - dosyalar küçük paketler halinde worker'lara dağıtılır (IPC maliyeti dosya
+    başına değil paket başına ödenir)
+  - her paket bittiğinde dosya sonuçları hemen yield edilir (NDJSON / SSE)
+  - en sonda ReportEngine.build_project_report ile tek proje puanı üretilir
+
+Worker'lar dosyayı kendisi okur; ana process'e sadece smell listesi ve
+fix özeti döner (düzeltilmiş kodun tamamı taşınmaz).
+
+Kullanım:
+    scanner = ProjectScanner(workers=4)
+    async for record in scanner.scan(workspace_path):
+        ...   # {"type": "start" | "file" | "error" | "summary", ...}
+    scanner.shutdown()
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from time import perf_counter
+from typing import AsyncIterator, Optional
+
+from analyzer import UnityAnalyzer
+from auth_utils import is_allowed_unity_script_path, is_path_within_workspace
+from code_fixer import CodeFixer
+from report_engine import ReportEngine
+
+logger = logging.getLogger(__name__)
+
+# Worker sayısı. 0 → process havuzu yok, paketler event loop dışındaki thread'de sırayla çalışır
+PROJECT_SCAN_WORKERS = int(os.environ.get("PROJECT_SCAN_WORKERS", str(min(os.cpu_count() or 1, 8))))
+# Bu boyuttan büyük dosyalar analiz edilmez (üretilmiş / vendor kodu)
+MAX_SCRIPT_BYTES = int(os.environ.get("PROJECT_SCAN_MAX_BYTES", str(1_000_000)))
+_MAX_BATCH = 32
+
+
+def find_project_scripts(workspace_path: str) -> list[Path]:
+    """
+    Workspace'in Assets/Scripts altındaki .cs dosyaları (sıralı; workspace dışına çıkan linkler hariç).
+    Klasör linkleri izlenmez; yol kontrolü (resolve) sadece link olan dosyalar için yapılır.
+    """
+    scripts_dir = Path(workspace_path) / "Assets" / "Scripts"
+    if not scripts_dir.is_dir() or not is_path_within_workspace(str(scripts_dir), workspace_path):
+        return []
+    result = []
+    for dirpath, _, filenames in os.walk(scripts_dir):
+        for name in filenames:
+            if not name.lower().endswith(".cs"):
+                continue
+            path = Path(dirpath) / name
+            if path.is_symlink() and not is_allowed_unity_script_path(str(path), workspace_path):
+                continue
+            if path.is_file():
+                result.append(path)
+    return sorted(result)
+
+
+def stat_project_scripts(workspace_path: str, limit: Optional[int] = None) -> dict:
+    """rel_path → (mtime_ns, size); limit verilirse ilk limit + 1 dosya (aşım kontrolü için)."""
+    root = Path(workspace_path)
+    result = {}
+    for path in find_project_scripts(workspace_path)[:None if limit is None else limit + 1]:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        result[path.relative_to(root).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return result
+
+
+def scan_file(path: str, rel_path: str) -> dict:
+    """Tek dosyanın analiz kaydı: smell'ler, dosya puanı ve CodeFixer özeti."""
+    try:
+        if os.path.getsize(path) > MAX_SCRIPT_BYTES:
+            return {"type": "error", "path": rel_path, "error": f"Dosya {MAX_SCRIPT_BYTES} bayttan büyük, atlandı."}
+        with open(path, encoding="utf-8-sig", errors="replace") as file:
+            code = file.read()
+    except OSError as exc:
+        return {"type": "error", "path": rel_path, "error": str(exc)}
+
+    result = UnityAnalyzer(code).analyze()
+    smells = result["smells"]
+    fix = CodeFixer(code, smells).apply_all()
+    return {
+        "type": "file",
+        "path": rel_path,
+        "class_name": result["stats"]["class_name"],
+        "lines": result["stats"]["total_lines"],
+        "score": ReportEngine.calculate_score(smells),
+        "score_breakdown": ReportEngine.get_category_scores(smells),
+        "smells": smells,
+        "fixes": {"applied": fix.applied, "manual": fix.manual, "changed": fix.changed},
+    }
+
+
+def _scan_batch(items: list[tuple[str, str]]) -> list[dict]:
+    """Worker giriş noktası (modül seviyesinde olmalı: process havuzu pickle eder)."""
+    return [scan_file(path, rel_path) for path, rel_path in items]
+
+
+class ProjectScanner:
+    """Workspace taramalarını paylaşılan bir process havuzunda çalıştırır."""
+
+    def __init__(self, workers: int = PROJECT_SCAN_WORKERS):
+        self.workers = max(0, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        # Havuz ilk taramada kurulur; 'spawn': uvicorn thread'leri varken fork güvenli değil
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _batches(self, workspace_path: str, paths: list[Path]) -> list[list[tuple[str, str]]]:
+        # Worker başına ~4 paket: yük dengelenir, sonuçlar erken akmaya başlar
+        size = max(1, min(_MAX_BATCH, len(paths) // (max(self.workers, 1) * 4)))
+        root = Path(workspace_path)
+        items = [(str(path), path.relative_to(root).as_posix()) for path in paths]
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    async def scan(self, workspace_path: str) -> AsyncIterator[dict]:
+        """
+        Tarama kayıtlarını bittikçe yield eder: önce "start", sonra dosya başına
+        "file" / "error", en sonda proje raporunu taşıyan "summary".
+        Tüketici erken bırakırsa (istemci bağlantıyı kesti) bekleyen paketler iptal edilir.
+        """
+        started = perf_counter()
+        loop = asyncio.get_running_loop()
+        paths = await asyncio.to_thread(find_project_scripts, workspace_path)
+        yield {"type": "start", "workspace": workspace_path, "files": len(paths), "workers": self.workers}
+
+        executor = self._executor()
+        batches = {
+            loop.run_in_executor(executor, _scan_batch, batch): batch
+            for batch in self._batches(workspace_path, paths)
+        }
+        pending = set(batches)
+        reports = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        records = future.result()
+                    except Exception as exc:
+                        # Worker çöktü (BrokenProcessPool vb.): paket dosyaları hata olarak raporlanır
+                        logger.warning(f"[ProjectScan] Paket başarısız: {exc!r}")
+                        if isinstance(exc, BrokenProcessPool):
+                            self._pool = None  # sonraki tarama yeni havuz kurar
+                        records = [{"type": "error", "path": rel, "error": repr(exc)} for _, rel in batches[future]]
+                    for record in records:
+                        if record["type"] == "file":
+                            reports.append(record)
+                        yield record
+        finally:
+            for future in pending:
+                future.cancel()
+
+        duration_ms = int((perf_counter() - started) * 1000)
+        logger.info(f"[ProjectScan] {len(reports)}/{len(paths)} dosya, {duration_ms} ms")
+        yield {"type": "summary", **ReportEngine.build_project_report(reports, duration_ms)}
@@ -63,6 +63,11 @@ class ReportEngine:
         """Tüm smell'leri sınıflandırır."""
         return [ReportEngine.classify_smell(s) for s in smells]
 
+    @staticmethod
+    def count_types(smells: List[Dict]) -> Counter:
+        """Smell tipi → adet. Puan, severity ve kategori sadece tipe bağlıdır."""
+        return Counter(s.get("type", "") for s in smells)
+
     @staticmethod
     def calculate_score(smells: List[Dict]) -> float:
         """
@@ -70,42 +75,79 @@ class ReportEngine:
         Hata yoksa 10, her hata ağırlığına göre puanı düşürür.
         Aynı kategoride tekrar eden hatalar azalan ceza alır (diminishing returns).
         """
-        if not smells:
+        return ReportEngine._score(ReportEngine.count_types(smells))
+
+    @staticmethod
+    def get_severity_counts(smells: List[Dict]) -> Dict[str, int]:
+        """Severity bazlı sayaç döndürür."""
+        return ReportEngine._severity_counts(ReportEngine.count_types(smells))
+
+    @staticmethod
+    def get_category_scores(smells: List[Dict]) -> Dict[str, float]:
+        """
+        Kategori bazlı skor döndürür; 0-10 arası.
+        Her kategori kendi içinde değerlendirilir.
+        """
+        return ReportEngine._category_scores(ReportEngine.count_types(smells))
+
+    @staticmethod
+    def generate_summary(smells: List[Dict]) -> str:
+        """İnsan tarafından okunabilir özet üretir."""
+        return ReportEngine._summary(ReportEngine.count_types(smells))
+
+    @staticmethod
+    def build_report(smells: List[Dict], duration_ms: int = 0) -> Dict[str, Any]:
+        """Tam rapor nesnesi üretir."""
+        return ReportEngine.build_report_from_counts(ReportEngine.count_types(smells), duration_ms)
+
+    @staticmethod
+    def build_report_from_counts(type_counts: Dict[str, int], duration_ms: int = 0) -> Dict[str, Any]:
+        """build_report ile aynı rapor; smell listesi yerine tip → adet (akışta smell'ler tutulmaz)."""
+        return {
+            "score": ReportEngine._score(type_counts),
+            "score_breakdown": ReportEngine._category_scores(type_counts),
+            "severity_counts": ReportEngine._severity_counts(type_counts),
+            "total_smells": sum(type_counts.values()),
+            "summary": ReportEngine._summary(type_counts),
+            "step1_duration_ms": duration_ms,
+        }
+
+    # ─── Tip sayaçlarından hesaplama ───
+    @staticmethod
+    def _score(type_counts: Dict[str, int]) -> float:
+        if not any(type_counts.values()):
             return 10.0
 
-        classified = ReportEngine.classify_all(smells)
-        
         # Kategori bazında ceza biriktir (diminishing returns)
         category_counts: Dict[str, int] = {}
         total_penalty = 0.0
 
-        for smell in classified:
-            category = smell.get("category", "style")
-            severity = smell.get("severity", "info")
+        for smell_type, n in type_counts.items():
+            category = CATEGORY_MAP.get(smell_type, "style")
+            severity = SEVERITY_MAP.get(smell_type, "info")
 
             cat_weight = CATEGORY_WEIGHTS.get(category, 1.0)
             sev_weight = SEVERITY_LEVELS.get(severity, {}).get("weight", 0.5)
 
             # Aynı kategoriden kaçıncı hata?
-            category_counts[category] = category_counts.get(category, 0) + 1
-            count = category_counts[category]
+            seen = category_counts.get(category, 0)
+            category_counts[category] = seen + n
 
             # Diminishing returns: ilk hata tam ceza, sonrakiler azalır
             # 1. hata: ×1.0, 2. hata: ×0.5, 3.: ×0.33, 4.: ×0.25 ...
-            diminish_factor = 1.0 / count
-
             # Ceza = kategori ağırlığı × severity ağırlığı × azaltma × temel çarpan
-            total_penalty += cat_weight * sev_weight * diminish_factor * 0.2
+            for count in range(seen + 1, seen + n + 1):
+                total_penalty += cat_weight * sev_weight * (1.0 / count) * 0.2
 
         # Puan: 10 - toplam ceza, minimum 0
         score = max(0.0, 10.0 - total_penalty)
         return round(score, 1)
 
     @staticmethod
-    def get_severity_counts(smells: List[Dict]) -> Dict[str, int]:
-        """Severity bazlı sayaç döndürür."""
-        classified = ReportEngine.classify_all(smells)
-        counts = Counter(s.get("severity", "info") for s in classified)
+    def _severity_counts(type_counts: Dict[str, int]) -> Dict[str, int]:
+        counts: Counter = Counter()
+        for smell_type, n in type_counts.items():
+            counts[SEVERITY_MAP.get(smell_type, "info")] += n
         return {
             "critical": counts.get("critical", 0),
             "warning":  counts.get("warning", 0),
@@ -113,19 +155,13 @@ class ReportEngine:
         }
 
     @staticmethod
-    def get_category_scores(smells: List[Dict]) -> Dict[str, float]:
-        """
-        Kategori bazlı skor döndürür; 0-10 arası.
-        Her kategori kendi içinde değerlendirilir.
-        """
-        classified = ReportEngine.classify_all(smells)
-
+    def _category_scores(type_counts: Dict[str, int]) -> Dict[str, float]:
         category_penalties: Dict[str, float] = {}
-        for smell in classified:
-            cat = smell.get("category", "style")
-            sev = smell.get("severity", "info")
+        for smell_type, n in type_counts.items():
+            cat = CATEGORY_MAP.get(smell_type, "style")
+            sev = SEVERITY_MAP.get(smell_type, "info")
             penalty = SEVERITY_LEVELS.get(sev, {}).get("weight", 0.5) * 0.5
-            category_penalties[cat] = category_penalties.get(cat, 0) + penalty
+            category_penalties[cat] = category_penalties.get(cat, 0) + penalty * n
 
         # Her kategoriye 10 üzerinden puan ver
         scores = {}
@@ -136,13 +172,14 @@ class ReportEngine:
         return scores
 
     @staticmethod
-    def generate_summary(smells: List[Dict]) -> str:
-        """İnsan tarafından okunabilir özet üretir."""
-        if not smells:
+    def _summary(type_counts: Dict[str, int]) -> str:
+        total = sum(type_counts.values())
+        if not total:
             return "✅ Kodda herhangi bir sorun bulunamadı. Harika iş!"
 
-        classified = ReportEngine.classify_all(smells)
-        category_counts = Counter(s.get("category", "style") for s in classified)
+        category_counts: Counter = Counter()
+        for smell_type, n in type_counts.items():
+            category_counts[CATEGORY_MAP.get(smell_type, "style")] += n
 
         category_labels = {
             "performance": "performans",
@@ -158,16 +195,35 @@ class ReportEngine:
             label = category_labels.get(cat, cat)
             parts.append(f"{count} {label}")
 
-        return f"Toplam {len(smells)} bulgu: {', '.join(parts)}."
+        return f"Toplam {total} bulgu: {', '.join(parts)}."
 
     @staticmethod
-    def build_report(smells: List[Dict], duration_ms: int = 0) -> Dict[str, Any]:
-        """Tam rapor nesnesi üretir."""
+    def build_project_report(files: List[Dict], duration_ms: int = 0) -> Dict[str, Any]:
+        """
+        Proje raporu: dosya raporlarını (path, lines, score, score_breakdown, smells) birleştirir.
+        Tüm smell'ler tek listede puanlansa büyük projeler azalan cezaya rağmen ~0 alır;
+        bu yüzden puanlar dosya başına hesaplanıp satır sayısıyla ağırlıklı ortalanır.
+        """
+        all_smells = [smell for report in files for smell in report["smells"]]
+        weights = [max(report["lines"], 1) for report in files]
+        total_weight = sum(weights)
+
+        def weighted(values) -> float:
+            return round(sum(v * w for v, w in zip(values, weights)) / total_weight, 1) if files else 10.0
+
+        worst = sorted(files, key=lambda r: (r["score"], -len(r["smells"])))[:10]
         return {
-            "score": ReportEngine.calculate_score(smells),
-            "score_breakdown": ReportEngine.get_category_scores(smells),
-            "severity_counts": ReportEngine.get_severity_counts(smells),
-            "total_smells": len(smells),
-            "summary": ReportEngine.generate_summary(smells),
-            "step1_duration_ms": duration_ms,
+            "score": weighted(r["score"] for r in files),
+            "score_breakdown": {
+                cat: weighted(r["score_breakdown"][cat] for r in files) for cat in CATEGORY_WEIGHTS
+            },
+            "severity_counts": ReportEngine.get_severity_counts(all_smells),
+            "total_smells": len(all_smells),
+            "total_files": len(files),
+            "total_lines": sum(r["lines"] for r in files),
+            "summary": ReportEngine.generate_summary(all_smells),
+            "worst_files": [
+                {"path": r["path"], "score": r["score"], "total_smells": len(r["smells"])} for r in worst
+            ],
+            "duration_ms": duration_ms,
         }
@@ -2,6 +2,7 @@ from .analysis_routes import create_analysis_router
 from .auth_routes import create_auth_router
 from .config_routes import create_config_router
 from .conversation_routes import create_conversation_router
+from .kb_routes import create_kb_router
 from .workspace_routes import create_workspace_router
 
 __all__ = [
@@ -9,5 +10,6 @@ __all__ = [
     "create_auth_router",
     "create_config_router",
     "create_conversation_router",
+    "create_kb_router",
     "create_workspace_router",
 ]
@@ -2,31 +2,49 @@ import asyncio
 import json
 import logging
 import re
-from collections import defaultdict
-from time import time
+from collections import Counter, defaultdict
+from time import perf_counter, time
 
 from fastapi import APIRouter, Header, HTTPException, status
 
 from ai_providers import AIProviderManager
+from analysis_cache import AnalysisCache, script_session
 from analyzer import UnityAnalyzer
-from auth_utils import require_analysis_owner, require_user
+from auth_utils import get_current_user, require_analysis_owner, require_user
 from code_detector import CodeDetector
 from pipelines.agents.intent_classifier import IntentClassifierAgent
 from prompts import PROMPT_GREETING, get_language_instr
 from report_engine import ReportEngine
-from schemas import AnalysisRequest, RenameRequest, UpdateFileRequest
+from schemas import AnalysisRequest, AnalysisStreamRequest, RenameRequest, UpdateFileRequest
 from validator import ResponseValidator
 
+from .streaming import check_stream_format, stream_records
+
 
 logger = logging.getLogger(__name__)
 
+# /analyze/stream: event loop dışında tek seferde çekilen smell paketi (sayı / süre sınırı)
+_STREAM_BATCH = 64
+_STREAM_FLUSH = 0.02
+
+
+def _next_batch(smells) -> list:
+    """En fazla _STREAM_BATCH smell; _STREAM_FLUSH saniye dolduysa ilk bulunan smell'le döner."""
+    batch, deadline = [], perf_counter() + _STREAM_FLUSH
+    for smell in smells:
+        batch.append(smell)
+        if len(batch) >= _STREAM_BATCH or perf_counter() >= deadline:
+            break
+    return batch
+
 
 def clean_response(text: str) -> str:
     return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
 
 
-def create_analysis_router(db):
+def create_analysis_router(db, analysis_cache=None):
     router = APIRouter()
+    analysis_cache = analysis_cache or AnalysisCache()
 
     # --- RATE LIMITING ---
     ANALYZE_RATE_LIMIT: defaultdict = defaultdict(list)
@@ -66,7 +84,10 @@ def create_analysis_router(db):
 
         static_results = {"smells": [], "stats": {"total_lines": 0, "class_name": "Analiz"}}
         if is_csharp:
-            static_results = UnityAnalyzer(request.code).analyze()
+            # Aynı kullanıcının aynı sınıfı tekrar göndermesi: değişmeyen metodlar yeniden taranmaz
+            static_results = analysis_cache.static_results(
+                request.code, session=script_session(user_id, request.code)
+            )
 
         lang_instr = get_language_instr(request.language)
         if provider_type == "ollama":
@@ -102,6 +123,39 @@ def create_analysis_router(db):
         db.save_analysis(user_id, title, intent, request.code, final_suggestion, static_results["smells"])
         return {"intent": intent, "static_results": static_results, "ai_suggestion": final_suggestion}
 
+    @router.post("/analyze/stream")
+    async def analyze_stream(request: AnalysisStreamRequest, x_session_token: str = Header(alias="X-Session-Token")):
+        """
+        Sadece statik analiz (LLM yok): smell'ler bulundukça akar, en sonda istatistik ve puan.
+        Kayıtlar: "start", smell başına "smell", "summary" (ReportEngine.build_report + stats).
+        """
+        user_id, _ = require_user(db, x_session_token, request.user_id)
+        _check_analyze_rate_limit(user_id)
+        check_stream_format(request.format)
+
+        async def records():
+            started = perf_counter()
+            analyzer = await asyncio.to_thread(UnityAnalyzer, request.code)
+            yield {"type": "start", "total_lines": len(analyzer.lines)}
+            smells = analyzer.iter_smells()
+            # Puanlama sadece smell tipine bakar: gönderilen smell'ler tutulmaz, tip başına sayılır
+            types = Counter()
+            while batch := await asyncio.to_thread(_next_batch, smells):
+                for smell in batch:
+                    types[smell["type"]] += 1
+                    yield {"type": "smell", "smell": smell}
+            stats = await asyncio.to_thread(analyzer.stats)
+            report = ReportEngine.build_report_from_counts(types, int((perf_counter() - started) * 1000))
+            yield {"type": "summary", "stats": stats, **report}
+
+        return stream_records(records(), request.format)
+
+    @router.get("/analyzer/metrics")
+    async def analyzer_metrics(x_session_token: str = Header(alias="X-Session-Token")):
+        # Kural başına kümülatif süre ve hit sayısı — yavaş kurallar başta; analiz önbelleği hit oranı
+        get_current_user(db, x_session_token)
+        return {**UnityAnalyzer.rule_metrics(), "cache": analysis_cache.stats()}
+
     @router.get("/history/{user_id}")
     async def get_history(user_id: int, x_session_token: str = Header(alias="X-Session-Token")):
         require_user(db, x_session_token, user_id)
@@ -1,12 +1,14 @@
 import asyncio
 import logging
+import os
 from collections import defaultdict
 from time import time
 
 from fastapi import APIRouter, Header, HTTPException
 
 from ai_providers import AIProviderManager
-from analyzer import UnityAnalyzer
+from knowledge.kb_candidates import candidate_key, is_promotable
+from analysis_cache import AnalysisCache
 from auth_utils import require_conversation_owner, require_user
 from code_detector import CodeDetector
 from pipelines import (
@@ -39,6 +41,16 @@ CHAT_RATE_LIMIT: defaultdict = defaultdict(list)
 CHAT_RATE_LIMIT_MAX = 15           # dakikada max istek
 CHAT_RATE_LIMIT_WINDOW = 60        # saniye
 
+# --- KB ÖN GEÇİŞİ: LLM modunda KB'nin birebir cevapladığı istekler LLM'e gitmez ---
+KB_SHORTCUT_ENABLED = os.environ.get("KB_SHORTCUT", "1") != "0"
+# Mesajın KB entry'si tarafından kapsanma oranı (KBEngine.coverage) bu eşiğin altındaysa LLM'e gidilir
+KB_SHORTCUT_MIN_SCORE = float(os.environ.get("KB_SHORTCUT_MIN_SCORE", "0.75"))
+KB_SHORTCUT_MARKER = "<!-- KB_SHORTCUT -->"
+KB_SHORTCUT_NOTE = (
+    "\n\n---\n⚡ *Bu yanıt bilgi bankasından anında geldi. Daha kapsamlı bir çözüm için "
+    "**AI ile Yeniden Üret** seçeneğini kullanabilirsin.*\n" + KB_SHORTCUT_MARKER
+)
+
 
 def _check_chat_rate_limit(user_id: int):
     """Kullanıcı başına /chat ve /analyze rate limit kontrolü."""
@@ -51,6 +63,81 @@ def _check_chat_rate_limit(user_id: int):
     CHAT_RATE_LIMIT[user_id].append(now)
 
 
+def _record_kb_candidate(db, user_id: int, message: str, result) -> None:
+    """
+    Critic skoru yüksek ve validator'dan geçen üretim yanıtını KB adayı olarak kaydeder.
+    Sadece Game Feel değerlendirmesi yapılmış (multi-agent) sonuçlar aday olabilir.
+    """
+    gf_data = result.game_feel_data or {}
+    score = gf_data.get("game_feel_score")
+    key = candidate_key(message)
+    if not key or not is_promotable(result.combined_response, score):
+        return
+    try:
+        hits = db.record_kb_candidate(user_id, key, message, result.combined_response, float(score))
+        logger.info(f"  [KB Aday] '{key}' kaydedildi (skor {score}, tekrar {hits})")
+    except Exception as exc:
+        logger.warning(f"[KB Aday] Kaydedilemedi: {exc}")
+
+
+def _is_gate_question(content: str) -> bool:
+    """Asistan mesajı Clarification Gate sorusu mu?"""
+    return (
+        "Sistemi en iyi şekilde tasarlayabilmem için" in content
+        or "Cevapladıktan sonra hemen kodu üretmeye başlayacağım" in content
+    )
+
+
+def _kb_shortcut(db, kb, request, use_multi_pipeline: bool):
+    """
+    LLM modunda KB ön geçişi. KB mesajı yeterli kapsamayla cevaplıyorsa yanıtı
+    kaydedip döner; aksi halde None (normal LLM akışı devam eder).
+
+    Kod içeren mesajlar, kapsam/gate/devam akışındaki mesajlar, clarification
+    ve yazım hatası düzeltmeli eşleşmeler her zaman LLM'e bırakılır.
+    """
+    if CodeDetector.is_csharp(request.message) or _is_batch_continuation_msg(request.message):
+        return None
+    static_intent = IntentClassifierAgent(None)._static_prefilter(request.message)
+    intent = static_intent or CodeDetector.detect_intent(request.message)
+    if request.mode == "generation":
+        kb_intent = "generation"
+    elif intent in ("GREETING", "OUT_OF_SCOPE", "GENERATION"):
+        # Analiz modunda bunları LLM akışı kendi sabit mesajlarıyla cevaplar
+        return None
+    else:
+        kb_intent = "chat"
+
+    history_messages = db.get_conversation_messages(request.conversation_id)
+    last_assistant = next((m["content"] for m in reversed(history_messages) if m["role"] == "assistant"), "")
+    if "SCOPE_WARNING_ACTIVE" in last_assistant or _is_gate_question(last_assistant):
+        return None
+
+    kb_result, kb_markdown = kb.lookup_response(request.message, intent=kb_intent)
+    if kb_result is None or kb_result.clarification_needed or kb_result.fuzzy_matches:
+        return None
+    coverage = kb.coverage(request.message, kb_result)
+    if coverage < KB_SHORTCUT_MIN_SCORE:
+        logger.info(f"  [KB Shortcut] '{kb_result.entry_id}' kapsama yetersiz ({coverage:.2f}) → LLM")
+        return None
+
+    # Atlanan en az LLM çağrısı: intent sınıflandırma + cevap (multi-agent üretimde gate + architect + coder)
+    llm_calls = (0 if static_intent else 1) + (3 if kb_intent == "generation" and use_multi_pipeline else 1)
+    kb.record_shortcut(kb_intent, llm_calls)
+    logger.info(f"  [KB Shortcut] '{kb_result.entry_id}' (kapsama {coverage:.2f}) — {llm_calls} LLM çağrısı atlandı")
+
+    content = kb_markdown + KB_SHORTCUT_NOTE
+    db.add_message(request.conversation_id, "assistant", content)
+    if len(history_messages) <= 1:
+        auto_title = request.message[:40].strip()
+        if len(request.message) > 40:
+            auto_title += "..."
+        db.rename_conversation(request.conversation_id, auto_title)
+    return {"role": "assistant", "content": content, "intent": intent,
+            "static_results": {"smells": [], "stats": {}}, "pipeline": None, "source": "kb_shortcut",
+            "kb_entry_id": kb_result.entry_id, "kb_coverage": coverage}
+
+
 def _is_batch_continuation_msg(msg: str) -> bool:
     """Kullanıcının batch devam isteği gönderip göndermediğini kontrol eder."""
     msg_lower = msg.strip().lower()
@@ -60,8 +147,9 @@ def _is_batch_continuation_msg(msg: str) -> bool:
     return any(t in msg_lower for t in triggers)
 
 
-def create_conversation_router(db, kb, progress_store):
+def create_conversation_router(db, kb, progress_store, analysis_cache=None, symbol_index=None):
     router = APIRouter()
+    analysis_cache = analysis_cache or AnalysisCache()
 
     @router.get("/chat-progress/{conv_id}")
     async def get_chat_progress(conv_id: int, x_session_token: str = Header(alias="X-Session-Token")):
@@ -127,9 +215,11 @@ def create_conversation_router(db, kb, progress_store):
 
             if is_csharp:
                 pure_code = CodeDetector.extract_code(request.message)
-                static_results = UnityAnalyzer(pure_code).analyze()
-                analysis_text = kb.format_analysis(static_results, original_code=pure_code)
-                kb_ref = kb.lookup_for_code(pure_code)
+                # Aynı kod tekrar yapıştırıldığında analiz, rapor ve KB referansı önbellekten gelir;
+                # düzenlenmiş kodda sadece değişen metodlar yeniden analiz edilir
+                static_results, analysis_text, kb_ref = analysis_cache.report(
+                    pure_code, kb, session=f"conv:{request.conversation_id}"
+                )
                 if kb_ref:
                     final_response = kb.format_fix_response(analysis_text, kb_ref)
                     source = "kb_analysis_with_fix"
@@ -147,16 +237,17 @@ def create_conversation_router(db, kb, progress_store):
                         "static_results": static_results, "pipeline": None, "source": source}
 
             kb_intent = "generation" if intent == "GENERATION" else "chat"
-            kb_result = kb.lookup(request.message, intent=kb_intent)
+            # Sonuç ve render edilmiş markdown KBEngine önbelleğinden gelir
+            kb_result, kb_markdown = kb.lookup_response(request.message, intent=kb_intent)
 
             if kb_result:
                 if kb_result.clarification_needed:
-                    clarification_text = kb.format_clarification(kb_result)
+                    clarification_text = kb_markdown
                     db.add_message(request.conversation_id, "assistant", clarification_text)
                     return {"role": "assistant", "content": clarification_text, "intent": intent,
                             "static_results": {"smells": [], "stats": {}}, "pipeline": None, "source": "kb_clarification"}
 
-                final_suggestion = kb.format_response(kb_result, intent=kb_intent)
+                final_suggestion = kb_markdown
                 db.add_message(request.conversation_id, "assistant", final_suggestion)
                 return {"role": "assistant", "content": final_suggestion, "intent": intent,
                         "static_results": {"smells": [], "stats": {}}, "pipeline": None, "source": "kb"}
@@ -178,6 +269,15 @@ def create_conversation_router(db, kb, progress_store):
                     "static_results": {"smells": [], "stats": {}}, "pipeline": None, "source": "kb_miss"}
 
         provider_type, model_name, _, use_multi_agent, force_claude_coder = db.get_ai_config(user_id)
+
+        # ——— KB ÖN GEÇİŞİ: KB'nin birebir cevapladığı istekler LLM'e hiç gitmez ———
+        if request.force_ai:
+            kb.record_forced_ai("generation" if request.mode == "generation" else "chat")
+        elif KB_SHORTCUT_ENABLED:
+            shortcut = _kb_shortcut(db, kb, request, use_multi_agent and provider_type == "anthropic")
+            if shortcut:
+                return shortcut
+
         api_key = (db.get_api_key(user_id, provider_type) or "") if provider_type not in ("ollama", "kb") else ""
 
         try:
@@ -255,6 +355,12 @@ def create_conversation_router(db, kb, progress_store):
                 f"{'Kullanıcı' if msg['role'] == 'user' else 'AI'}: {msg['content'][:800]}"
                 for msg in recent[:-1]
             )
+        if symbol_index is not None:
+            # Projedeki ilgili sınıflar (üyeleriyle) ve bu kodu kullananlar — dosyaların tamamı yerine
+            project_symbols = await asyncio.to_thread(
+                symbol_index.context_for, db.get_last_workspace(user_id), request.message
+            )
+            context_summary = "\n\n".join(part for part in (context_summary, project_symbols) if part)
 
         # Gate daha önce soru sorduysa (NEEDS_CLARIFICATION) kullanıcı cevap veriyor demektir.
         # Gate'i tekrar çalıştırma — direkt pipeline'a geç.
@@ -262,10 +368,7 @@ def create_conversation_router(db, kb, progress_store):
         _last_assistant_content = next(
             (m["content"] for m in reversed(history_messages[:-1]) if m["role"] == "assistant"), ""
         )
-        _gate_already_asked = (
-            "Sistemi en iyi şekilde tasarlayabilmem için" in _last_assistant_content
-            or "Cevapladıktan sonra hemen kodu üretmeye başlayacağım" in _last_assistant_content
-        )
+        _gate_already_asked = _is_gate_question(_last_assistant_content)
         _combined_prompt = request.message
         if _gate_already_asked:
             # İlk kullanıcı mesajını bul (orijinal istek) ve mevcut cevaplarla birleştir
@@ -561,6 +664,9 @@ def create_conversation_router(db, kb, progress_store):
                         f"**Devam et** yazman yeterli. ✋"
                     )
                     result.combined_response += continuation_msg
+                elif effective_prompt == request.message and not scope_confirmed_flag:
+                    # Tek seferde tamamlanmış, kullanıcının kendi mesajıyla üretilmiş yanıt → KB adayı
+                    _record_kb_candidate(db, user_id, request.message, result)
 
                 final_suggestion = result.combined_response
                 static_results = {"smells": [], "stats": {}}
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter, Header, HTTPException
+
+from auth_utils import get_current_user, is_kb_operator, require_kb_operator
+from knowledge.kb_candidates import KB_CANDIDATE_MIN_HITS, append_overlay_entry, build_entry
+from schemas import KBBatchLookupRequest
+
+
+logger = logging.getLogger(__name__)
+
+# Tek istekte kabul edilen maksimum mesaj sayısı
+KB_BATCH_MAX_MESSAGES = 1000
+
+
+def _batch_item(result) -> dict:
+    if result is None:
+        return {"status": "miss", "entry_id": None, "title": None, "score": 0.0}
+    item = {
+        "status": "clarification" if result.clarification_needed else "hit",
+        "entry_id": result.entry_id,
+        "title": result.title,
+        "score": round(result.score, 4),
+        "matched_keywords": result.matched_keywords,
+    }
+    if result.fuzzy_matches:
+        item["fuzzy_matches"] = result.fuzzy_matches
+    if result.clarification_needed:
+        item["options"] = [{"id": o["id"], "title": o["title"]} for o in result.clarification_options]
+    return item
+
+
+def _candidate_item(candidate: dict) -> dict:
+    return {
+        "id": candidate["id"],
+        "prompt": candidate["prompt"],
+        "critic_score": candidate["critic_score"],
+        "hit_count": candidate["hit_count"],
+        "status": candidate["status"],
+        "updated_at": candidate["updated_at"],
+        "entry": build_entry(candidate),
+    }
+
+
+def create_kb_router(db, kb):
+    router = APIRouter()
+
+    @router.get("/kb/stats")
+    async def kb_stats(x_session_token: str = Header(alias="X-Session-Token")):
+        get_current_user(db, x_session_token)
+        stats = kb.stats()
+        stats.pop("entry_ids", None)
+        return stats
+
+    @router.get("/kb/metrics")
+    async def kb_metrics(x_session_token: str = Header(alias="X-Session-Token")):
+        # Hangi entry'ler trafiğe cevap veriyor, ne sıklıkla LLM'e düşülüyor, lookup ne kadar sürüyor
+        user_id, _ = get_current_user(db, x_session_token)
+        metrics = kb.metrics()
+        if not is_kb_operator(user_id):
+            # Miss token'ları başka kullanıcıların istemlerinden gelir: sadece KB operatörleri görür
+            metrics.pop("top_miss_tokens", None)
+        return metrics
+
+    @router.post("/kb/reload")
+    async def kb_reload(x_session_token: str = Header(alias="X-Session-Token")):
+        # Paylaşılan engine'i yeniden kurar; olağan yeniden yükleme KBWatcher'ın işi, elle tetikleme operatöre açık
+        user_id, _ = require_kb_operator(db, x_session_token)
+        logger.info(f"KB reload isteği - User: {user_id}")
+        # İndeks kurulumu CPU-bound: event loop'u bloklamamak için thread'de çalıştır
+        ok = await asyncio.to_thread(kb.reload)
+        if not ok:
+            raise HTTPException(422, "KB yüklenemedi, mevcut bilgi bankası kullanılmaya devam ediyor.")
+        stats = kb.stats()
+        return {"status": "success", "total_entries": stats["total_entries"], "generation": stats["generation"]}
+
+    @router.post("/kb/lookup-batch")
+    async def kb_lookup_batch(req: KBBatchLookupRequest, x_session_token: str = Header(alias="X-Session-Token")):
+        # Sadece okuma: sohbet / mesaj tablosuna hiçbir şey yazılmaz
+        get_current_user(db, x_session_token)
+        if req.intent not in ("chat", "generation"):
+            raise HTTPException(400, "intent 'chat' veya 'generation' olmalı.")
+        if len(req.messages) > KB_BATCH_MAX_MESSAGES:
+            raise HTTPException(413, f"Tek istekte en fazla {KB_BATCH_MAX_MESSAGES} mesaj gönderilebilir.")
+        results = await asyncio.to_thread(kb.lookup_many, req.messages, req.intent)
+        items = [_batch_item(r) for r in results]
+        counts = {"hit": 0, "clarification": 0, "miss": 0}
+        for item in items:
+            counts[item["status"]] += 1
+        return {"intent": req.intent, "total": len(items), "counts": counts, "results": items}
+
+    # ── Öğrenilmiş KB adayları (bkz. knowledge/kb_candidates.py) ──────────────
+    # Listeleme: kullanıcı kendi adaylarını görür. Onay / red paylaşılan KB'yi değiştirir:
+    # sadece KB_OPERATOR_USER_IDS'teki kullanıcılar (onlar tüm adayları görür).
+    @router.get("/kb/candidates")
+    async def kb_candidates(x_session_token: str = Header(alias="X-Session-Token")):
+        user_id, _ = get_current_user(db, x_session_token)
+        operator = is_kb_operator(user_id)
+        candidates = db.get_kb_candidates(min_hits=KB_CANDIDATE_MIN_HITS, user_id=None if operator else user_id)
+        return {
+            "min_hits": KB_CANDIDATE_MIN_HITS,
+            "operator": operator,
+            "candidates": [_candidate_item(c) for c in candidates],
+        }
+
+    @router.post("/kb/candidates/{candidate_id}/approve")
+    async def kb_candidate_approve(candidate_id: int, x_session_token: str = Header(alias="X-Session-Token")):
+        user_id, _ = require_kb_operator(db, x_session_token)
+        candidate = db.get_kb_candidate(candidate_id)
+        if not candidate:
+            raise HTTPException(404, "KB adayı bulunamadı.")
+        if candidate["status"] != "pending":
+            raise HTTPException(409, "Bu aday zaten işlenmiş.")
+        if kb.overlay_path is None:
+            raise HTTPException(409, "Yerel KB dosyası yapılandırılmamış.")
+        entry = build_entry(candidate)
+        logger.info(f"KB aday onayı - User: {user_id}, aday: {candidate_id}, entry: {entry['id']}")
+        try:
+            await asyncio.to_thread(append_overlay_entry, kb.overlay_path, entry)
+        except OSError as e:
+            logger.error(f"[KB Aday] Overlay yazılamadı: {e}")
+            raise HTTPException(500, "Yerel KB dosyası yazılamadı.")
+        if not await asyncio.to_thread(kb.reload):
+            raise HTTPException(422, "KB yüklenemedi, mevcut bilgi bankası kullanılmaya devam ediyor.")
+        db.set_kb_candidate_status(candidate_id, "approved", entry["id"])
+        stats = kb.stats()
+        return {"status": "success", "entry_id": entry["id"], "total_entries": stats["total_entries"]}
+
+    @router.post("/kb/candidates/{candidate_id}/reject")
+    async def kb_candidate_reject(candidate_id: int, x_session_token: str = Header(alias="X-Session-Token")):
+        require_kb_operator(db, x_session_token)
+        candidate = db.get_kb_candidate(candidate_id)
+        if not candidate:
+            raise HTTPException(404, "KB adayı bulunamadı.")
+        if candidate["status"] != "pending":
+            raise HTTPException(409, "Bu aday zaten işlenmiş.")
+        db.set_kb_candidate_status(candidate_id, "rejected")
+        return {"status": "success"}
+
+    return router
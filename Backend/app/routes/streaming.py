@@ -0,0 +1,29 @@
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+STREAM_FORMATS = ("ndjson", "sse")
+
+
+def check_stream_format(fmt: str) -> None:
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(400, "format 'ndjson' veya 'sse' olmalı.")
+
+
+def encode_record(record: dict, fmt: str) -> str:
+    data = json.dumps(record, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def stream_records(records: AsyncIterator[dict], fmt: str) -> StreamingResponse:
+    """{"type": ...} kayıtlarını üretildikçe NDJSON satırı veya SSE event'i olarak gönderir."""
+    async def body():
+        async for record in records:
+            yield encode_record(record, fmt)
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
@@ -1,14 +1,23 @@
+import asyncio
 import os
 from pathlib import Path
 
 from fastapi import APIRouter, Header, HTTPException
 
 from auth_utils import get_current_user, is_allowed_unity_script_path, require_user
-from schemas import WorkspaceRequest, WriteFileRequest
+from project_scan import ProjectScanner
+from schemas import ProjectScanRequest, WorkspaceRequest, WorkspaceWatchRequest, WriteFileRequest
+from symbol_index import SymbolIndex
+from workspace_watcher import WatcherLimitError, WorkspaceWatchers
 
+from .streaming import check_stream_format, stream_records
 
-def create_workspace_router(db):
+
+def create_workspace_router(db, project_scanner: ProjectScanner = None, workspace_watchers: WorkspaceWatchers = None,
+                            symbol_index: SymbolIndex = None):
     router = APIRouter()
+    project_scanner = project_scanner or ProjectScanner()
+    symbol_index = symbol_index or SymbolIndex(db)
 
     @router.post("/save-workspace")
     async def save_workspace(req: WorkspaceRequest, x_session_token: str = Header(alias="X-Session-Token")):
@@ -22,6 +31,53 @@ def create_workspace_router(db):
         path = db.get_last_workspace(user_id)
         return {"path": path}
 
+    @router.post("/scan-project")
+    async def scan_project(req: ProjectScanRequest, x_session_token: str = Header(alias="X-Session-Token")):
+        """Kayıtlı workspace'in Assets/Scripts'ini tarar; dosya sonuçları bittikçe akar."""
+        user_id, _ = require_user(db, x_session_token, req.user_id)
+        check_stream_format(req.format)
+        workspace = db.get_last_workspace(user_id)
+        if not workspace or not (Path(workspace) / "Assets" / "Scripts").is_dir():
+            raise HTTPException(404, "Kayıtlı workspace'te Assets/Scripts klasörü bulunamadı.")
+
+        # Eşzamanlı taramalar aynı process havuzunu paylaşır; CPU kullanımı worker sayısıyla sınırlı
+        return stream_records(project_scanner.scan(workspace), req.format)
+
+    @router.post("/workspace-watch")
+    async def workspace_watch(req: WorkspaceWatchRequest, x_session_token: str = Header(alias="X-Session-Token")):
+        """Kayıtlı workspace için arka plan izleyicisini açar / kapatır (opt-in)."""
+        user_id, _ = require_user(db, x_session_token, req.user_id)
+        if workspace_watchers is None:
+            raise HTTPException(503, "Workspace izleme bu sunucuda kapalı.")
+        if not req.enabled:
+            return {"status": "stopped", "stopped": await workspace_watchers.stop(user_id)}
+
+        workspace = db.get_last_workspace(user_id)
+        if not workspace or not (Path(workspace) / "Assets" / "Scripts").is_dir():
+            raise HTTPException(404, "Kayıtlı workspace'te Assets/Scripts klasörü bulunamadı.")
+        try:
+            return {"status": "watching", **workspace_watchers.start(user_id, workspace)}
+        except WatcherLimitError as exc:
+            raise HTTPException(429, str(exc))
+
+    @router.get("/workspace-index/{user_id}")
+    async def workspace_index(user_id: int, x_session_token: str = Header(alias="X-Session-Token")):
+        require_user(db, x_session_token, user_id)
+        if workspace_watchers is None:
+            return {"watching": [], "files": []}
+        return workspace_watchers.index(user_id)
+
+    @router.get("/symbols/{user_id}")
+    async def find_symbols(user_id: int, name: str, x_session_token: str = Header(alias="X-Session-Token")):
+        """Kayıtlı workspace'te adı veya sınıfı name olan semboller (indeks önce artımlı güncellenir)."""
+        require_user(db, x_session_token, user_id)
+        workspace = db.get_last_workspace(user_id)
+        if not workspace or not (Path(workspace) / "Assets" / "Scripts").is_dir():
+            raise HTTPException(404, "Kayıtlı workspace'te Assets/Scripts klasörü bulunamadı.")
+        refresh = await asyncio.to_thread(symbol_index.refresh, workspace)
+        symbols = await asyncio.to_thread(symbol_index.find, workspace, name)
+        return {"refresh": refresh, "symbols": symbols}
+
     @router.post("/write-file")
     async def write_file(req: WriteFileRequest, x_session_token: str = Header(alias="X-Session-Token")):
         get_current_user(db, x_session_token)
@@ -12,6 +12,12 @@ class AnalysisRequest(BaseModel):
     user_id: int
 
 
+class AnalysisStreamRequest(BaseModel):
+    code: str
+    user_id: int
+    format: str = "ndjson"  # "ndjson" | "sse"
+
+
 class AIConfigRequest(BaseModel):
     user_id: int
     provider_type: str
@@ -48,6 +54,7 @@ class ChatRequest(BaseModel):
     mode: str = "analysis"
     use_kb: bool = True
     use_or_for_coder: bool = False
+    force_ai: bool = False  # KB ön geçişini atla ("AI ile Yeniden Üret")
 
 
 class WorkspaceRequest(BaseModel):
@@ -55,7 +62,22 @@ class WorkspaceRequest(BaseModel):
     path: str
 
 
+class ProjectScanRequest(BaseModel):
+    user_id: int
+    format: str = "ndjson"  # "ndjson" | "sse"
+
+
+class WorkspaceWatchRequest(BaseModel):
+    user_id: int
+    enabled: bool = True
+
+
 class WriteFileRequest(BaseModel):
     file_path: str
     content: str
     workspace_path: str
+
+
+class KBBatchLookupRequest(BaseModel):
+    messages: list[str]
+    intent: str = "chat"
@@ -0,0 +1,239 @@
+"""
+Symbol Index — Unity Projesi İçin Dosyalar Arası Sembol İndeksi
+===============================================================
+
+LLM'e giden istekler projenin geri kalanını bilmiyordu: yapıştırılan script
+`GetComponent<EnemyHealth>()` çağırıyorsa model EnemyHealth'in alanlarını
+ve metodlarını tahmin ediyor ya da kullanıcıdan o dosyayı istiyordu. Bu
+modül workspace'in Assets/Scripts altındaki scriptlerden sembolleri çıkarır
+ve SQLite'ta (DatabaseManager.symbols, (workspace, name, kind) /
+(workspace, container, kind) indeksleri) saklar:
+
+  - class  : sınıf bildirimi (detail = taban tipler)
+  - base   : taban sınıf / arayüz ilişkisi (name = taban tip, container = sınıf)
+  - method : metod imzası
+  - field  : [SerializeField] ve public alanlar (Inspector'da görünenler)
+  - event  : C# event'leri ve UnityEvent alanları
+  - usage  : GetComponent<T> / AddComponent<T> / FindObjectOfType<T> / RequireComponent kullanımları
+
+Güncelleme artımlıdır: dosyanın mtime/boyutu değişmediyse okunmaz, içerik
+özeti aynıysa semboller yeniden yazılmaz. related() yapıştırılan kodun
+referans verdiği tipleri ve bu kodun sınıflarını kullananları indeksten
+(O(log n) sorgularla) getirir; format_context() bunları prompt'a eklenecek
+kısa bir bloğa çevirir — dosyaların tamamı yerine sadece komşu semboller.
+
+Kullanım:
+    index = SymbolIndex(db)
+    context = index.context_for(workspace_path, pasted_code)   # "" → ilgili sembol yok
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from csharp_lexer import is_word_start, lex
+from project_scan import MAX_SCRIPT_BYTES, stat_project_scripts
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_INDEX_MAX_FILES = int(os.environ.get("SYMBOL_INDEX_MAX_FILES", "5000"))
+# Aynı workspace için dosya sistemi bu aralıktan sık taranmaz (sohbet başına yeniden tarama yok)
+SYMBOL_INDEX_REFRESH_INTERVAL = float(os.environ.get("SYMBOL_INDEX_REFRESH_INTERVAL", "5.0"))
+_MAX_QUERY_NAMES = 400
+
+_TYPE = r'([A-Za-z_][\w.]*(?:<[\w.,\s<>\[\]]*>)?(?:\[[\s,]*\])?\??)'
+_SERIALIZED_FIELD = re.compile(
+    r'\[SerializeField\]\s*(?:\[[^\]]*\]\s*)*(?:(?:private|protected|internal)\s+)?' + _TYPE + r'\s+(\w+)\s*[;=]'
+)
+_PUBLIC_FIELD = re.compile(r'public\s+' + _TYPE + r'\s+(\w+)\s*[;=]')
+_EVENT = re.compile(r'event\s+' + _TYPE + r'\s+(\w+)\s*[;={]')
+_USAGE = re.compile(
+    r'(GetComponents?(?:InChildren|InParent)?|TryGetComponent|AddComponent|RequireComponent'
+    r'|FindObjectsOfType|FindObjectOfType|FindFirstObjectByType|FindAnyObjectByType|FindObjectsByType)'
+    r'\s*(?:<\s*([\w.]+)\s*>|\(\s*typeof\s*\(\s*([\w.]+)\s*\))'
+)
+_CAPITALIZED = re.compile(r'[A-Z]\w*')
+# public alan olarak görülmemesi gereken anahtar kelimeler ("public static int x;" vb.)
+_NOT_FIELD_TYPES = frozenset({
+    "static", "const", "readonly", "event", "class", "struct", "interface", "enum", "abstract",
+    "virtual", "override", "void", "delegate", "new", "partial", "sealed", "async", "unsafe", "extern",
+})
+
+
+def _type_names(type_text: str) -> list[str]:
+    """'List<EnemyHealth>[]' → ["List", "EnemyHealth"] (nokta önekleri atılır)."""
+    return [name.rsplit(".", 1)[-1] for name in re.findall(r'[A-Za-z_][\w.]*', type_text)]
+
+
+def extract_symbols(code: str) -> list[tuple]:
+    """Koddaki semboller: [(kind, name, container, detail, line)] (line 1-based)."""
+    src = lex(code)
+    bare = src.bare_text
+    classes = src.classes
+
+    def container_of(offset: int) -> Optional[str]:
+        # En içteki sınıf (iç içe sınıflarda sonraki bildirim daha içtedir)
+        inner = None
+        for cls in classes:
+            if cls.open < offset < cls.close:
+                inner = cls.name
+        return inner
+
+    def line(offset: int) -> int:
+        return src.line_of(offset) + 1
+
+    symbols = []
+    for cls in classes:
+        symbols.append(("class", cls.name, container_of(cls.open), ", ".join(cls.bases), line(cls.decl)))
+        symbols.extend(("base", base, cls.name, None, line(cls.decl)) for base in cls.bases)
+    for method in src.methods:
+        signature = f"{method.return_type} {method.name}({' '.join(method.params.split())})"
+        symbols.append(("method", method.name, container_of(method.open), signature, line(method.decl)))
+
+    fields = {}
+    for pattern, flag in ((_SERIALIZED_FIELD, "[SerializeField]"), (_PUBLIC_FIELD, "public")):
+        for m in pattern.finditer(bare):
+            if not is_word_start(bare, m.start()) or m.group(1) in _NOT_FIELD_TYPES or m.start(2) in fields:
+                continue
+            type_text = " ".join(m.group(1).split())
+            kind = "event" if type_text.startswith("UnityEvent") else "field"
+            fields[m.start(2)] = (kind, m.group(2), container_of(m.start()), f"{flag} {type_text}", line(m.start(2)))
+    symbols.extend(fields[offset] for offset in sorted(fields))
+    for m in _EVENT.finditer(bare):
+        if is_word_start(bare, m.start()):
+            detail = "event " + " ".join(m.group(1).split())
+            symbols.append(("event", m.group(2), container_of(m.start()), detail, line(m.start())))
+    for m in _USAGE.finditer(bare):
+        if is_word_start(bare, m.start()):
+            target = (m.group(2) or m.group(3)).rsplit(".", 1)[-1]
+            symbols.append(("usage", target, container_of(m.start()), m.group(1), line(m.start())))
+    return symbols
+
+
+class SymbolIndex:
+    """Workspace sembollerini DatabaseManager'da tutan artımlı indeks."""
+
+    def __init__(self, db, refresh_interval: float = SYMBOL_INDEX_REFRESH_INTERVAL,
+                 max_files: int = SYMBOL_INDEX_MAX_FILES):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._refreshed: dict[str, float] = {}
+
+    @staticmethod
+    def workspace_key(workspace_path: str) -> str:
+        return str(Path(workspace_path).resolve(strict=False))
+
+    # ── Güncelleme ───────────────────────────────────────────────────────────
+    def refresh(self, workspace_path: str, force: bool = False) -> dict:
+        """
+        Değişen dosyaların sembollerini günceller; silinen dosyaları indeksten çıkarır.
+        Dönüş: {"files", "parsed", "unchanged", "deleted"}; aralık dolmadıysa {"skipped": True}.
+        """
+        key = self.workspace_key(workspace_path)
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed.get(key, float("-inf")) < self.refresh_interval:
+                return {"skipped": True}
+            stored = self.db.get_symbol_files(key)
+            current = stat_project_scripts(key, self.max_files)
+            current = dict(list(current.items())[:self.max_files])
+
+            entries, parsed = [], 0
+            for rel_path, (mtime_ns, size) in current.items():
+                previous = stored.get(rel_path)
+                if previous is not None and previous[1:] == (mtime_ns, size):
+                    continue
+                symbols = None
+                if size <= MAX_SCRIPT_BYTES:
+                    try:
+                        code = (Path(key) / rel_path).read_text(encoding="utf-8-sig", errors="replace")
+                    except OSError:
+                        continue
+                    content_hash = hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+                    if previous is None or previous[0] != content_hash:
+                        symbols = extract_symbols(code)
+                        parsed += 1
+                else:
+                    content_hash = ""
+                    symbols = []   # çok büyük dosya: indekste yer alır ama sembolü yok
+                entries.append((rel_path, content_hash, mtime_ns, size, symbols))
+
+            deleted = [rel_path for rel_path in stored if rel_path not in current]
+            if entries or deleted:
+                self.db.save_symbol_files(key, entries, deleted)
+            self._refreshed[key] = time.monotonic()
+        return {"files": len(current), "parsed": parsed, "unchanged": len(current) - parsed, "deleted": len(deleted)}
+
+    # ── Sorgu ────────────────────────────────────────────────────────────────
+    def find(self, workspace_path: str, name: str, limit: int = 200) -> list[dict]:
+        """Adı veya sınıfı name olan semboller (tanım, üyeler ve kullanımlar)."""
+        return self.db.find_symbols(self.workspace_key(workspace_path), names=[name], containers=[name], limit=limit)
+
+    def related(self, workspace_path: str, code: str, limit: int = 60) -> dict:
+        """
+        Yapıştırılan kodla ilişkili proje sembolleri:
+          - types : kodun kullandığı projedeki sınıflar ve üyeleri (kodun kendi sınıfları hariç)
+          - users : kodun sınıflarını kullanan / onlardan türeyen başka sınıflar
+        """
+        key = self.workspace_key(workspace_path)
+        own_symbols = extract_symbols(code)
+        own = {name for kind, name, *_ in own_symbols if kind == "class"}
+        referenced = set()
+        for kind, name, _, detail, _ in own_symbols:
+            if kind in ("base", "usage"):
+                referenced.add(name)
+            elif kind in ("field", "event") and detail:
+                referenced.update(_type_names(detail.split(" ", 1)[1]))   # "[SerializeField] float" → float
+        referenced.update(_CAPITALIZED.findall(lex(code).bare_text))
+        referenced = sorted(referenced - own)[:_MAX_QUERY_NAMES]
+
+        type_defs = self.db.find_symbols(key, names=referenced, kinds=["class"], limit=limit) if referenced else []
+        users = [
+            s for s in self.db.find_symbols(key, names=sorted(own), kinds=["usage", "base"], limit=limit * 2)
+            if s["container"] not in own
+        ][:limit] if own else []
+        members = []
+        if type_defs:
+            members = self.db.find_symbols(
+                key, containers=sorted({s["name"] for s in type_defs}), kinds=["field", "method", "event"], limit=limit * 4
+            )
+        return {"types": type_defs, "members": members, "users": users}
+
+    @staticmethod
+    def format_context(related: dict, max_members: int = 12) -> str:
+        """related() sonucunu prompt'a eklenecek kısa metne çevirir; ilgili sembol yoksa ""."""
+        if not related["types"] and not related["users"]:
+            return ""
+        lines = ["[PROJE SEMBOLLERİ — ilgili diğer scriptler]"]
+        for cls in related["types"]:
+            bases = f" : {cls['detail']}" if cls["detail"] else ""
+            lines.append(f"class {cls['name']}{bases}  ({cls['path']}:{cls['line']})")
+            own_members = [m for m in related["members"] if m["container"] == cls["name"] and m["path"] == cls["path"]]
+            for member in own_members[:max_members]:
+                suffix = "" if member["kind"] == "method" else f" {member['name']}"
+                lines.append(f"  {member['detail']}{suffix}")
+            if len(own_members) > max_members:
+                lines.append(f"  … (+{len(own_members) - max_members} üye)")
+        if related["users"]:
+            lines.append("Bu kodun sınıflarını kullananlar:")
+            for use in related["users"]:
+                relation = f": {use['name']}" if use["kind"] == "base" else f"{use['detail']}<{use['name']}>"
+                lines.append(f"  {use['container'] or '?'} {relation}  ({use['path']}:{use['line']})")
+        return "\n".join(lines)
+
+    def context_for(self, workspace_path: Optional[str], code: str) -> str:
+        """Workspace indeksini (gerekirse) günceller ve kod için sembol bağlamını döner; hata → ""."""
+        if not workspace_path or not (Path(workspace_path) / "Assets" / "Scripts").is_dir():
+            return ""
+        try:
+            self.refresh(workspace_path)
+            return self.format_context(self.related(workspace_path, code))
+        except Exception as e:
+            logger.error(f"[SymbolIndex] Bağlam üretilemedi: {e}")
+            return ""
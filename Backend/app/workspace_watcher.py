@@ -0,0 +1,226 @@
+"""
+Workspace Watcher — Düzenlenen Scriptlerin Analizini Sıcak Tutar
+================================================================
+
+Kullanıcı bir scripti editörde kaydettikten sonra /analyze veya /chat'e
+yapıştırdığında analiz zaten hazır olsun diye: açıkça etkinleştirilen
+(opt-in) izleyiciler kayıtlı workspace'in Assets/Scripts klasörünü izler,
+değişen .cs dosyalarını arka planda yeniden analiz eder.
+
+  - izleme      : KBWatcher gibi mtime/boyut yoklaması (ek bağımlılık yok);
+                  dosya listesi event loop dışında (asyncio.to_thread) taranır
+  - debounce    : dosya `debounce` saniye boyunca değişmeden kalınca kuyruğa girer
+                  (editörlerin art arda yazmaları tek analize düşer)
+  - worker      : tüm izleyiciler için tek arka plan görevi; dosyalar sırayla
+                  analiz edilir, her analizden sonra `cpu_share` oranını
+                  koruyacak kadar beklenir (CPU kısıtı)
+  - sonuç       : AnalysisCache ısıtılır (session = script_session; /analyze ve
+                  /chat aynı kodda bellekten okur) ve dosya başına smell + puan
+                  indekste tutulur (GET /workspace-index)
+  - sınır       : kullanıcı başına ve toplam izleyici sayısı, izleyici başına dosya sayısı
+
+Kullanım (main.py):
+    watchers = WorkspaceWatchers(analysis_cache, kb)
+    watchers.start(user_id, workspace_path)      # route içinden (çalışan loop gerekir)
+    watchers.index(user_id)
+    await watchers.stop_all()                     # shutdown
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from analysis_cache import AnalysisCache, script_session
+from project_scan import MAX_SCRIPT_BYTES, stat_project_scripts
+from report_engine import ReportEngine
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = float(os.environ.get("WORKSPACE_WATCH_INTERVAL", "1.0"))
+WATCH_DEBOUNCE = float(os.environ.get("WORKSPACE_WATCH_DEBOUNCE", "0.5"))
+# Arka plan analizinin kullanabileceği CPU oranı (0-1]; 0.25 → her 1 sn analiz için 3 sn bekleme
+WATCH_CPU_SHARE = float(os.environ.get("WORKSPACE_WATCH_CPU_SHARE", "0.25"))
+MAX_WATCHERS_PER_USER = int(os.environ.get("WORKSPACE_WATCH_MAX_PER_USER", "2"))
+MAX_WATCHERS = int(os.environ.get("WORKSPACE_WATCH_MAX_TOTAL", "32"))
+MAX_WATCHED_FILES = int(os.environ.get("WORKSPACE_WATCH_MAX_FILES", "5000"))
+
+
+class WatcherLimitError(Exception):
+    """Kullanıcı veya sunucu izleyici sınırına ulaşıldı."""
+
+
+@dataclass
+class _Watch:
+    user_id: int
+    workspace: str
+    task: Optional[asyncio.Task] = None
+    stats: dict = field(default_factory=dict)        # rel_path → (mtime_ns, size) (son analiz edilen)
+    pending: dict = field(default_factory=dict)      # rel_path → ((mtime_ns, size), ilk görülme zamanı)
+    files: dict = field(default_factory=dict)        # rel_path → indeks kaydı
+    truncated: bool = False
+
+
+class WorkspaceWatchers:
+    """Kullanıcı başına workspace izleyicileri ve ortak (kısıtlı) analiz worker'ı."""
+
+    def __init__(self, analysis_cache: AnalysisCache, kb=None, interval: float = WATCH_INTERVAL,
+                 debounce: float = WATCH_DEBOUNCE, cpu_share: float = WATCH_CPU_SHARE,
+                 max_per_user: int = MAX_WATCHERS_PER_USER, max_total: int = MAX_WATCHERS):
+        self.analysis_cache = analysis_cache
+        self.kb = kb
+        self.interval = interval
+        self.debounce = debounce
+        self.cpu_share = cpu_share
+        self.max_per_user = max_per_user
+        self.max_total = max_total
+        self._watches: dict[tuple[int, str], _Watch] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: set = set()
+        self._worker: Optional[asyncio.Task] = None
+
+    # ── Yönetim ──────────────────────────────────────────────────────────────
+    def start(self, user_id: int, workspace: str) -> dict:
+        """İzlemeyi başlatır (zaten izleniyorsa durumunu döner); sınır aşılırsa WatcherLimitError."""
+        key = (user_id, str(Path(workspace).resolve(strict=False)))
+        if key not in self._watches:
+            if sum(1 for uid, _ in self._watches if uid == user_id) >= self.max_per_user:
+                raise WatcherLimitError(f"Kullanıcı başına en fazla {self.max_per_user} workspace izlenebilir.")
+            if len(self._watches) >= self.max_total:
+                raise WatcherLimitError("Sunucu izleyici sınırına ulaşıldı.")
+            loop = asyncio.get_running_loop()
+            if self._worker is None:
+                self._queue = asyncio.Queue()
+                self._worker = loop.create_task(self._run_worker())
+            watch = _Watch(user_id, key[1])
+            watch.task = loop.create_task(self._run_watch(watch))
+            self._watches[key] = watch
+            logger.info(f"[WorkspaceWatcher] İzleniyor: user={user_id} {key[1]}")
+        return self._describe(self._watches[key])
+
+    async def stop(self, user_id: int) -> int:
+        """Kullanıcının tüm izleyicilerini durdurur; durdurulan sayısını döner."""
+        keys = [key for key in self._watches if key[0] == user_id]
+        for key in keys:
+            await self._cancel(self._watches.pop(key).task)
+        return len(keys)
+
+    async def stop_all(self) -> None:
+        for watch in self._watches.values():
+            await self._cancel(watch.task)
+        self._watches.clear()
+        await self._cancel(self._worker)
+        self._worker = self._queue = None
+        self._queued.clear()
+
+    @staticmethod
+    async def _cancel(task: Optional[asyncio.Task]) -> None:
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # ── Okuma ────────────────────────────────────────────────────────────────
+    def index(self, user_id: int) -> dict:
+        """Kullanıcının izlenen workspace'leri ve dosya başına son analiz kayıtları."""
+        watches = [watch for (uid, _), watch in self._watches.items() if uid == user_id]
+        return {
+            "watching": [self._describe(watch) for watch in watches],
+            "files": [record for watch in watches for record in watch.files.values()],
+        }
+
+    @staticmethod
+    def _describe(watch: _Watch) -> dict:
+        return {
+            "workspace": watch.workspace,
+            "indexed": len(watch.files),
+            "pending": len(watch.pending),
+            "truncated": watch.truncated,
+        }
+
+    # ── İzleme ───────────────────────────────────────────────────────────────
+    async def _run_watch(self, watch: _Watch) -> None:
+        while True:
+            try:
+                await self._poll(watch)
+            except Exception as e:
+                logger.error(f"[WorkspaceWatcher] Tarama başarısız ({watch.workspace}): {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _poll(self, watch: _Watch) -> None:
+        current = await asyncio.to_thread(stat_project_scripts, watch.workspace, MAX_WATCHED_FILES)
+        watch.truncated = len(current) > MAX_WATCHED_FILES
+        if watch.truncated:
+            current = dict(list(current.items())[:MAX_WATCHED_FILES])
+
+        for rel_path in (set(watch.stats) | set(watch.pending) | set(watch.files)) - set(current):
+            watch.files.pop(rel_path, None)
+            watch.stats.pop(rel_path, None)
+            watch.pending.pop(rel_path, None)
+
+        now = time.monotonic()
+        for rel_path, stat in current.items():
+            if watch.stats.get(rel_path) == stat:
+                watch.pending.pop(rel_path, None)
+                continue
+            seen = watch.pending.get(rel_path)
+            if seen is None or seen[0] != stat:
+                watch.pending[rel_path] = (stat, now)   # yeni değişiklik: debounce baştan
+            elif now - seen[1] >= self.debounce:
+                del watch.pending[rel_path]
+                watch.stats[rel_path] = stat
+                self._enqueue(watch, rel_path)
+
+    def _enqueue(self, watch: _Watch, rel_path: str) -> None:
+        key = (watch.user_id, watch.workspace, rel_path)
+        if key not in self._queued:
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    # ── Arka plan analizi ────────────────────────────────────────────────────
+    async def _run_worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            self._queued.discard(key)
+            watch = self._watches.get(key[:2])
+            if watch is None:
+                continue  # izleme bu arada durduruldu
+            started = time.perf_counter()
+            try:
+                record = await asyncio.to_thread(self._analyze_file, watch, key[2])
+            except Exception as e:
+                logger.error(f"[WorkspaceWatcher] Analiz başarısız ({key[2]}): {e}")
+                record = None
+            if record is not None:
+                watch.files[key[2]] = record
+            # CPU kısıtı: analiz süresi cpu_share oranında kalacak kadar bekle
+            elapsed = time.perf_counter() - started
+            if 0 < self.cpu_share < 1:
+                await asyncio.sleep(elapsed * (1 - self.cpu_share) / self.cpu_share)
+
+    def _analyze_file(self, watch: _Watch, rel_path: str) -> Optional[dict]:
+        path = Path(watch.workspace) / rel_path
+        if path.stat().st_size > MAX_SCRIPT_BYTES:
+            return None
+        code = path.read_text(encoding="utf-8-sig", errors="replace")
+        session = script_session(watch.user_id, code)
+        if self.kb is not None:
+            static_results, _, _ = self.analysis_cache.report(code, self.kb, session=session)
+        else:
+            static_results = self.analysis_cache.static_results(code, session=session)
+        smells = static_results["smells"]
+        return {
+            "path": rel_path,
+            "class_name": static_results["stats"]["class_name"],
+            "lines": static_results["stats"]["total_lines"],
+            "score": ReportEngine.calculate_score(smells),
+            "severity_counts": ReportEngine.get_severity_counts(smells),
+            "smells": smells,
+            "analyzed_at": time.time(),
+        }
@@ -2,12 +2,17 @@
 # PyInstaller spec — Unity Architect AI backend
 # Kullanım: cd Backend && pyinstaller backend.spec
 
+import os
+
 a = Analysis(
     ['app/main.py'],
     pathex=['app'],
     binaries=[],
     datas=[
         ('app/knowledge/unity_kb.json', 'knowledge'),
+        # build_backend.sh tarafından üretilen derlenmiş KB (yoksa JSON'dan yüklenir)
+        *([('app/knowledge/unity_kb.snapshot', 'knowledge')]
+          if os.path.exists('app/knowledge/unity_kb.snapshot') else []),
     ],
     hiddenimports=[
         # uvicorn — otomatik bulunamayan modüller
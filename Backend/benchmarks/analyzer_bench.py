@@ -0,0 +1,85 @@
+"""
+Analyzer Benchmark — Büyük Scriptlerde UnityAnalyzer
+====================================================
+
+Sentetik MonoBehaviour'larda (bkz. synthetic_cs.py) ölçer:
+  - analyze() toplam süresi (p50, N tekrar)
+  - yapısal indeks kurulumu (ortak lexer taraması dahil; ilk erişimde kurulur) süresi
+  - iter_smells() ile ilk smell'in gelme süresi (akış gecikmesi)
+  - kural başına süre (RULE_STATS) — hangi kuralın baskın olduğunu gösterir
+
+Kullanım:
+    cd Backend && python benchmarks/analyzer_bench.py [--sizes 300,3000,20000] [--rounds 7]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR / "app"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analyzer import RULE_STATS, UnityAnalyzer  # noqa: E402
+from csharp_lexer import clear_lex_cache  # noqa: E402
+from synthetic_cs import generate_script  # noqa: E402
+
+
+def _p50_ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def _build_index(analyzer: UnityAnalyzer) -> None:
+    analyzer.code_lines, analyzer.signature_lines
+
+
+def _first_smell(analyzer: UnityAnalyzer) -> None:
+    smells = analyzer.iter_smells()
+    next(smells, None)
+    smells.close()
+
+
+def _cold(code: str) -> UnityAnalyzer:
+    """lex() önbelleğini boşaltıp analyzer kurar — ilk istekteki maliyet."""
+    clear_lex_cache()
+    return UnityAnalyzer(code)
+
+
+def bench(lines: int, rounds: int) -> dict:
+    code = generate_script(lines)
+    RULE_STATS.reset()
+    result = {
+        "lines": len(code.split("\n")),
+        "analyze_ms": _p50_ms(lambda: _cold(code).analyze(), rounds),
+        "index_ms": _p50_ms(lambda: _build_index(_cold(code)), rounds),
+    }
+    rules = RULE_STATS.snapshot()["rules"]
+    result["smells"] = sum(r["hits"] for r in rules.values()) // rounds
+    result["per_rule_ms"] = {name: r["avg_ms"] for name, r in rules.items()}
+    result["first_ms"] = _p50_ms(lambda: _first_smell(_cold(code)), rounds)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="300,3000,20000")
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'satır':>7} {'smell':>6} {'analyze ms':>11} {'indeks ms':>10} {'ilk smell ms':>13}  en yavaş kurallar")
+    for n in (int(s) for s in args.sizes.split(",")):
+        r = bench(n, args.rounds)
+        slowest = sorted(r["per_rule_ms"].items(), key=lambda kv: -kv[1])[:3]
+        top = ", ".join(f"{name} {ms}" for name, ms in slowest)
+        print(f"{r['lines']:>7} {r['smells']:>6} {r['analyze_ms']:>11} {r['index_ms']:>10} {r['first_ms']:>13}  {top}")
+
+
+if __name__ == "__main__":
+    main()
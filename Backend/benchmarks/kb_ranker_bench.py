@@ -0,0 +1,111 @@
+"""
+KB Ranker Benchmark — heuristic vs BM25
+=======================================
+
+İki sıralama backend'ini (ve iki terim eşleştirme modunu) karşılaştırır:
+  - Kalite : test_kb_stress.py sorgu setleri (entry, varyant, clarification,
+             karışık dil, yanlış pozitif) üzerinde doğru sonuç oranı;
+             her ranker için substring ve stem eşleştirme modu ayrı raporlanır
+  - Gecikme: 28 (gerçek), 1k ve 10k (sentetik) entry'de lookup ve
+             lookup_many süresi (önbellek kapalı)
+
+Kullanım:
+    cd Backend && python benchmarks/kb_ranker_bench.py [--sizes 28,1000,10000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR / "app"))
+# Sentetik KB gövde dosyaları kullanıcının kb_cache dizinini kirletmesin
+os.environ.setdefault("KB_CACHE_DIR", str(Path(tempfile.gettempdir()) / "kb_bench_cache"))
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from knowledge.kb_engine import KB_FILE, KBEngine  # noqa: E402
+from synthetic_kb import write_kb  # noqa: E402
+from tests.test_kb_stress import (  # noqa: E402
+    CLARIFICATION_QUERIES,
+    ENTRY_QUERIES,
+    FALSE_POSITIVE_QUERIES,
+    MIXED_QUERIES,
+    VARIANT_QUERIES,
+)
+
+RANKERS = ("heuristic", "bm25")
+MATCH_MODES = ("substring", "stem")
+
+
+def quality(kb: KBEngine) -> dict:
+    """Her sorgu seti için doğru sonuç oranı."""
+    def ok_entry(query, expected, intent="generation"):
+        r = kb.lookup(query, intent=intent)
+        return r is not None and not r.clarification_needed and r.entry_id == expected
+
+    entry = [ok_entry(q, eid) for eid, qs in ENTRY_QUERIES for q in qs]
+    variant = [ok_entry(q, eid) for q, eid in VARIANT_QUERIES]
+    clar = [bool((r := kb.lookup(q, intent="generation")) and r.clarification_needed) for q in CLARIFICATION_QUERIES]
+    mixed = [ok_entry(q, eid, intent) for q, eid, intent, strict in MIXED_QUERIES if strict]
+    false_pos = []
+    for q, intent in FALSE_POSITIVE_QUERIES:
+        r = kb.lookup(q, intent=intent)
+        false_pos.append(r is None or r.clarification_needed or r.score < 0.18)
+
+    sets = {"entry": entry, "variant": variant, "clarification": clar, "mixed": mixed, "no_false_positive": false_pos}
+    report = {name: round(sum(v) / len(v), 3) for name, v in sets.items()}
+    all_checks = [x for v in sets.values() for x in v]
+    report["overall"] = round(sum(all_checks) / len(all_checks), 3)
+    return report
+
+
+def latency(kb: KBEngine, queries: list[str], rounds: int = 5) -> dict:
+    samples = []
+    for _ in range(rounds):
+        for q in queries:
+            start = time.perf_counter()
+            kb.lookup(q, intent="generation")
+            samples.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    kb.lookup_many(queries, intent="generation")
+    batch_ms = (time.perf_counter() - start) * 1000
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "batch_ms": round(batch_ms, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="28,1000,10000")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    queries = [q for _, qs in ENTRY_QUERIES for q in qs] + [q for q, *_ in MIXED_QUERIES]
+
+    print("── Kalite (gerçek KB, 28 entry) ──")
+    for ranker in RANKERS:
+        for mode in MATCH_MODES:
+            kb = KBEngine(use_snapshot=False, cache_size=0, ranker=ranker, match_mode=mode)
+            print(f"{ranker:<10} {mode:<10} {quality(kb)}")
+
+    print("\n── Gecikme (generation, önbellek kapalı) ──")
+    print(f"{'entry':>7} {'ranker':<10} {'p50 ms':>8} {'p95 ms':>8} {'batch ms':>9} {'doğruluk':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            kb_path = KB_FILE if n == 28 else write_kb(Path(tmp) / f"kb_{n}.json", n)
+            for ranker in RANKERS:
+                kb = KBEngine(kb_path=kb_path, use_snapshot=False, cache_size=0, ranker=ranker)
+                lat = latency(kb, queries)
+                acc = quality(kb)["entry"]
+                print(f"{n:>7} {ranker:<10} {lat['p50_ms']:>8} {lat['p95_ms']:>8} {lat['batch_ms']:>9} {acc:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+KB Ölçekleme Benchmark'ı
+========================
+
+test_kb_stress.py sadece 28 gerçek entry'de birkaç sorgunun 50ms altında
+bittiğini kontrol eder; ölçekleme gerilemelerini yakalayamaz. Bu suite
+sentetik KB'leri (benchmarks/synthetic_kb.py) 1k / 10k / 50k entry'ye
+büyütür ve her boyutta şunları ölçer:
+
+  - lookup          : ENTRY_QUERIES + yazım hatalı + karışık dil sorguları
+  - lookup_for_code : CODE_SNIPPETS (yapıştırılmış C# kodu)
+  - format_response : hit sonuçlarının markdown render süresi
+
+Her işlem için p50/p95/p99 gecikme (ms), hit doğruluğu (beklenen entry
+top-1 mi), lookup miss oranı (sonuç yok → LLM'e düşen sorgular) ve KB
+yükleme süresi + tracemalloc ile ölçülen bellek raporlanır. Önbellek
+kapalıdır; her çağrı gerçek arama maliyetini ölçer. --no-fuzzy trigram
+yazım hatası fallback'ini kapatır (öncesi/sonrası miss oranı karşılaştırması).
+
+Sonuçlar JSON baseline'a yazılır; --compare ile önceki bir baseline'a göre
+fark tablosu basılır:
+
+    cd Backend
+    python benchmarks/kb_scaling_bench.py                          # baseline yaz
+    python benchmarks/kb_scaling_bench.py --compare benchmarks/results/kb_scaling_baseline.json \\
+        --out /tmp/kb_scaling_new.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR / "app"))
+# Sentetik KB gövde dosyaları kullanıcının kb_cache dizinini kirletmesin
+os.environ.setdefault("KB_CACHE_DIR", str(Path(tempfile.gettempdir()) / "kb_bench_cache"))
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from knowledge.kb_engine import KBEngine  # noqa: E402
+from synthetic_kb import write_kb  # noqa: E402
+from tests.test_kb_stress import CODE_SNIPPETS, ENTRY_QUERIES, MIXED_QUERIES  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+DEFAULT_OUT = BENCH_DIR / "results" / "kb_scaling_baseline.json"
+ROUNDS = 3
+
+
+# ─── Sorgu Setleri ───────────────────────────────────────────────────────────
+def _typo(query: str, rng: random.Random) -> str:
+    """Kelimelerden birinde harf düşürme / yer değiştirme / Türkçe karakter kaybı."""
+    words = query.split()
+    i = rng.randrange(len(words))
+    w = words[i]
+    kind = rng.choice(("drop", "swap", "ascii"))
+    if kind == "drop" and len(w) > 4:
+        j = rng.randrange(1, len(w) - 1)
+        w = w[:j] + w[j + 1:]
+    elif kind == "swap" and len(w) > 4:
+        j = rng.randrange(1, len(w) - 2)
+        w = w[:j] + w[j + 1] + w[j] + w[j + 2:]
+    else:
+        w = w.translate(str.maketrans("çğıöşü", "cgiosu"))
+    words[i] = w
+    return " ".join(words)
+
+
+def build_queries(seed: int = 0) -> list[tuple[str, str, str | None]]:
+    """(sorgu, intent, beklenen entry id veya None) listesi."""
+    rng = random.Random(seed)
+    queries: list[tuple[str, str, str | None]] = []
+    for entry_id, qs in ENTRY_QUERIES:
+        for q in qs:
+            queries.append((q, "generation", entry_id))
+            queries.append((_typo(q, rng), "generation", entry_id))
+    for q, expected, intent, strict in MIXED_QUERIES:
+        queries.append((q, intent, expected if strict else None))
+    return queries
+
+
+# ─── Ölçüm ───────────────────────────────────────────────────────────────────
+def _percentiles(samples: list[float]) -> dict:
+    s = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(s[min(len(s) - 1, int(round(p * (len(s) - 1))))], 4)
+
+    return {"p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "n": len(s)}
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def load_kb(kb_path: Path, fuzzy: bool = True) -> tuple[KBEngine, dict]:
+    """KB'yi yükler; süre ve tracemalloc bellek ölçümünü döner."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kb = KBEngine(kb_path=kb_path, use_snapshot=False, cache_size=0, fuzzy=fuzzy)
+    load_ms = (time.perf_counter() - start) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return kb, {
+        "load_ms": round(load_ms, 1),
+        "resident_mb": round(current / 2**20, 2),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def bench_size(kb_path: Path, queries: list, fuzzy: bool = True) -> dict:
+    kb, memory = load_kb(kb_path, fuzzy=fuzzy)
+
+    lookup_ms, hits, correct, expected_total, misses = [], [], 0, 0, 0
+    for _ in range(ROUNDS):
+        for q, intent, expected in queries:
+            result, ms = _timed(kb.lookup, q, intent=intent)
+            lookup_ms.append(ms)
+            if _ == 0:
+                misses += result is None
+                if result and not result.clarification_needed:
+                    hits.append((result, intent))
+                if expected is not None:
+                    expected_total += 1
+                    correct += bool(result and not result.clarification_needed and result.entry_id == expected)
+
+    code_ms, code_correct = [], 0
+    for _ in range(ROUNDS):
+        for code, expected in CODE_SNIPPETS:
+            result, ms = _timed(kb.lookup_for_code, code)
+            code_ms.append(ms)
+            if _ == 0:
+                code_correct += bool(result and result.entry_id == expected)
+
+    format_ms = []
+    for _ in range(ROUNDS):
+        for result, intent in hits:
+            _, ms = _timed(kb.format_response, result, intent=intent)
+            format_ms.append(ms)
+
+    return {
+        "entries": kb.stats()["total_entries"],
+        "memory": memory,
+        "lookup": {
+            **_percentiles(lookup_ms),
+            "accuracy": round(correct / max(expected_total, 1), 3),
+            "miss_rate": round(misses / len(queries), 3),
+        },
+        "lookup_for_code": {**_percentiles(code_ms), "accuracy": round(code_correct / len(CODE_SNIPPETS), 3)},
+        "format_response": _percentiles(format_ms) if format_ms else {},
+    }
+
+
+# ─── Karşılaştırma ───────────────────────────────────────────────────────────
+def compare(old: dict, new: dict) -> None:
+    """İki baseline arasındaki farkları basar (pozitif % = yavaşlama/artış)."""
+    print(f"\n── Karşılaştırma: {old.get('commit', '?')} → {new.get('commit', '?')} ──")
+    for size, new_res in new["results"].items():
+        old_res = old["results"].get(size)
+        if not old_res:
+            continue
+        for op in ("lookup", "lookup_for_code", "format_response"):
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "accuracy", "miss_rate"):
+                a, b = old_res.get(op, {}).get(metric), new_res.get(op, {}).get(metric)
+                if a is None or b is None:
+                    continue
+                delta = ((b - a) / a * 100) if a else 0.0
+                print(f"{size:>7} {op:<16} {metric:<9} {a:>9} → {b:<9} ({delta:+.1f}%)")
+        a, b = old_res["memory"]["resident_mb"], new_res["memory"]["resident_mb"]
+        print(f"{size:>7} {'memory':<16} {'MB':<9} {a:>9} → {b:<9} ({((b - a) / a * 100) if a else 0:+.1f}%)")
+
+
+def _git_commit() -> str:
+    try:
+        import subprocess
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--compare", type=Path, help="Karşılaştırılacak önceki baseline JSON'u")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fuzzy", action="store_true", help="Trigram yazım hatası fallback'ini kapat")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    queries = build_queries(args.seed)
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "fuzzy": not args.no_fuzzy,
+        "queries": len(queries),
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(s) for s in args.sizes.split(",")):
+            kb_path = write_kb(Path(tmp) / f"kb_{n}.json", n, seed=args.seed)
+            res = bench_size(kb_path, queries, fuzzy=not args.no_fuzzy)
+            report["results"][str(n)] = res
+            lk = res["lookup"]
+            print(f"{n:>7} entry  load={res['memory']['load_ms']}ms  mem={res['memory']['resident_mb']}MB  "
+                  f"lookup p50/p95/p99={lk['p50_ms']}/{lk['p95_ms']}/{lk['p99_ms']}ms  acc={lk['accuracy']}  "
+                  f"miss={lk['miss_rate']}  "
+                  f"code acc={res['lookup_for_code']['accuracy']}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"\nBaseline yazıldı: {args.out}")
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+KB Startup Benchmark — JSON vs Snapshot
+=======================================
+
+KBEngine açılış süresini iki yolla ölçer:
+  - json     : unity_kb.json parse + indeks derleme
+  - snapshot : build_snapshot ile üretilen derlenmiş snapshot
+
+Her ölçüm ayrı bir Python sürecinde yapılır (soğuk dosya okuma + yükleme;
+modül import süresi hariç), medyan ve min değerleri raporlanır.
+
+Kullanım:
+    cd Backend && python benchmarks/kb_startup_bench.py [--runs 15]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+from knowledge.kb_engine import KB_FILE, KBEngine  # noqa: E402
+
+_CHILD = """
+import sys, time
+sys.path.insert(0, {app!r})
+from knowledge.kb_engine import KBEngine
+from pathlib import Path
+t0 = time.perf_counter()
+kb = KBEngine(kb_path=Path({kb!r}), use_snapshot={snap!r})
+assert kb.stats()["total_entries"] > 0
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def _measure(kb_path: Path, use_snapshot: bool, runs: int) -> list[float]:
+    code = _CHILD.format(app=str(APP_DIR), kb=str(kb_path), snap=use_snapshot)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--kb", type=Path, default=KB_FILE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Depodaki snapshot'a dokunmadan geçici kopya üzerinde çalış
+        kb_path = Path(tmp) / "unity_kb.json"
+        kb_path.write_bytes(args.kb.read_bytes())
+        KBEngine(kb_path=kb_path, use_snapshot=False).save_snapshot()
+
+        print(f"KB: {args.kb} ({args.kb.stat().st_size / 1024:.0f} KB), {args.runs} süreç/yol")
+        print(f"{'yol':<10} {'medyan ms':>10} {'min ms':>10}")
+        results = {}
+        for label, use_snapshot in (("json", False), ("snapshot", True)):
+            samples = _measure(kb_path, use_snapshot, args.runs)
+            results[label] = statistics.median(samples)
+            print(f"{label:<10} {results[label]:>10.1f} {min(samples):>10.1f}")
+        print(f"hızlanma: {results['json'] / results['snapshot']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
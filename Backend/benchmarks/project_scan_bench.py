@@ -0,0 +1,78 @@
+"""
+Project Scan Benchmark — Workspace Taraması
+===========================================
+
+Geçici bir Unity workspace'i (Assets/Scripts altında N sentetik script, bkz.
+synthetic_cs.py) oluşturur ve ProjectScanner.scan() ile ölçer:
+  - ilk dosya sonucunun gelme süresi (akış gecikmesi)
+  - toplam süre ve dosya/saniye (worker sayısına göre)
+
+Kullanım:
+    cd Backend && python benchmarks/project_scan_bench.py [--files 2000] [--workers 0,4]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR / "app"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from project_scan import ProjectScanner  # noqa: E402
+from synthetic_cs import generate_script  # noqa: E402
+
+
+def build_workspace(root: Path, files: int) -> None:
+    rng = random.Random(0)
+    for i in range(files):
+        folder = root / "Assets" / "Scripts" / f"Module{i % 20}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Script{i}.cs").write_text(generate_script(rng.randint(50, 400), seed=i), encoding="utf-8")
+
+
+async def bench(workspace: str, workers: int) -> dict:
+    scanner = ProjectScanner(workers=workers)
+    start = time.perf_counter()
+    first_ms, files, summary = None, 0, {}
+    try:
+        async for record in scanner.scan(workspace):
+            if record["type"] == "file":
+                files += 1
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - start) * 1000
+            elif record["type"] == "summary":
+                summary = record
+    finally:
+        scanner.shutdown()
+    total = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "files": files,
+        "first_ms": round(first_ms or 0.0, 1),
+        "total_s": round(total, 2),
+        "files_per_s": round(files / total, 1) if total else 0.0,
+        "score": summary.get("score"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--workers", default="0,4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="scan_bench_") as tmp:
+        build_workspace(Path(tmp), args.files)
+        print(f"{'worker':>6} {'dosya':>6} {'ilk ms':>8} {'toplam s':>9} {'dosya/s':>8} {'puan':>5}")
+        for workers in (int(w) for w in args.workers.split(",")):
+            r = asyncio.run(bench(tmp, workers))
+            print(f"{r['workers']:>6} {r['files']:>6} {r['first_ms']:>8} {r['total_s']:>9} {r['files_per_s']:>8} {r['score']:>5}")
+
+
+if __name__ == "__main__":
+    main()
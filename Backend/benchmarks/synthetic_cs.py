@@ -0,0 +1,128 @@
+"""
+Sentetik C# Script Üretici
+==========================
+
+Analyzer benchmark'ları için istenen uzunlukta MonoBehaviour scriptleri üretir.
+Parçalar UnityAnalyzer'ın tüm kontrollerini tetikleyecek şekilde seçilir ve
+gerçek kodda görülen biçim farklarını içerir:
+
+  - K&R ve Allman parantez stili, tek satırlık ve boş callback'ler
+  - Satır ve blok yorumları, string / verbatim string içinde parantez
+  - Update / FixedUpdate / LateUpdate / OnGUI gövdeleri, coroutine döngüleri
+  - Callback olmayan yardımcı metodlar (gövdeleri kontrol dışı kalmalı)
+
+Aynı seed aynı scripti üretir.
+
+Kullanım:
+    from synthetic_cs import generate_script
+    code = generate_script(3000)
+"""
+
+import random
+
+_FIELDS = [
+    "    public float speed = 5f;",
+    "    public GameObject target;",
+    "    [SerializeField] private int health = 100;",
+    "    private Rigidbody rb;",
+    "    public static int Count;",
+    "    // public int commented;",
+]
+
+_UPDATE_LINES = [
+    "        var r = GetComponent<Rigidbody>();",
+    "        var p = GameObject.Find(\"Player\");",
+    "        var e = FindObjectOfType<Enemy>();",
+    "        Object.Instantiate(prefab);",
+    "        scoreText.text = \"Score: \" + score;",
+    "        if (Vector3.Distance(transform.position, target.position) < 2f) Attack();",
+    "        gameObject.AddComponent<BoxCollider>();",
+    "        Camera.main.transform.LookAt(target);",
+    "        // GetComponent<Collider>();",
+    "        /* Camera.main */",
+    "        if (other.tag == \"Enemy\") Hit();",
+    "        anim.SetBool(\"Run\", moving);",
+    "        Debug.Log(\"{ brace in string\");",
+    "        var path = @\"C:\\{data}\";",
+    "        transform.position = transform.position + Vector3.up;",
+    "        transform.Translate(Vector3.forward * speed);",
+    "        SendMessage(\"OnHit\");",
+    "        Destroy(gameObject, 2f);",
+    "        timer += Time.deltaTime;",
+    "        if (timer > 1f) { timer = 0f; Tick(); }",
+]
+
+_FIXED_LINES = [
+    "        if (Input.GetKey(KeyCode.Space)) Jump();",
+    "        rb.velocity = new Vector3(h, rb.velocity.y, v);",
+    "        if (Vector2.Distance(a, b) > 1f) Move();",
+    "        transform.position = rb.position;",
+]
+
+_HELPER_LINES = [
+    "        int total = 0;",
+    "        for (int i = 0; i < items.Count; i++) { total += items[i]; }",
+    "        var c = GetComponent<Collider>();",
+    "        Destroy(c);",
+    "        label = \"Item \" + name;",
+    "        return;",
+]
+
+
+def _method(rng: random.Random, signature: str, body_pool: list[str], allman: bool) -> list[str]:
+    body = [rng.choice(body_pool) for _ in range(rng.randint(3, 14))]
+    if allman:
+        return [f"    {signature}", "    {", *body, "    }", ""]
+    return [f"    {signature} {{", *body, "    }", ""]
+
+
+def _block(rng: random.Random) -> list[str]:
+    roll = rng.random()
+    allman = rng.random() < 0.4
+    if roll < 0.30:
+        return _method(rng, "void Update()", _UPDATE_LINES, allman)
+    if roll < 0.40:
+        return _method(rng, "void FixedUpdate()", _FIXED_LINES, allman)
+    if roll < 0.45:
+        return _method(rng, "void LateUpdate()", _UPDATE_LINES, allman)
+    if roll < 0.48:
+        return _method(rng, "void OnGUI()", _UPDATE_LINES, allman)
+    if roll < 0.52:
+        sig = rng.choice(["void Start()", "void Awake()", "void Update()"])
+        return [f"    {sig}", "    {", "    }", ""]
+    if roll < 0.54:
+        return ["    void LateUpdate() { }", "        int afterOneLiner = 0;", ""]
+    if roll < 0.60:
+        return [
+            "    IEnumerator SpawnLoop()",
+            "    {",
+            "        while (true)",
+            "        {",
+            "            Spawn();",
+            "            yield return new WaitForSeconds(1f);",
+            "        }",
+            "    }",
+            "",
+        ]
+    if roll < 0.64:
+        return ["    /*", "    void Update() {", "        GetComponent<Rigidbody>();", "    }", "    */", ""]
+    name = f"Helper{rng.randint(0, 999)}"
+    return _method(rng, f"private void {name}()", _HELPER_LINES, allman)
+
+
+def generate_script(total_lines: int, seed: int = 7, class_name: str = "SyntheticController") -> str:
+    """Yaklaşık total_lines satırlık tek sınıflı bir MonoBehaviour üretir."""
+    rng = random.Random(seed)
+    lines = [
+        "using UnityEngine;",
+        "using System.Collections;",
+        "",
+        f"public class {class_name} : MonoBehaviour",
+        "{",
+        *rng.sample(_FIELDS, len(_FIELDS)),
+        "",
+    ]
+    while len(lines) < total_lines - 1:
+        lines.extend(_block(rng))
+    lines.append("}")
+    return "\n".join(lines)
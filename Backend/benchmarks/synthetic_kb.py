@@ -0,0 +1,79 @@
+"""
+Sentetik KB Üretici
+===================
+
+Ölçekleme benchmark'ları için unity_kb.json'dan türetilmiş sentetik KB üretir.
+Gerçek 28 entry her zaman başta yer alır (gerçek sorgular cevaplanabilir kalır);
+kalan entry'ler gerçekçi terim örtüşmesiyle üretilir:
+
+  - Sentetik entry'lerin yarısı bir trigger'ı rastgele bir gerçek entry'den
+    ödünç alır (gerçek sorgularla yarışan "benzer" entry'ler)
+  - Geri kalan trigger/keyword'ler Zipf dağılımlı sentetik bir sözlükten gelir
+    (bazı terimler çok yaygın, çoğu nadir — gerçek KB'deki gibi)
+  - Gövdeler (code/explanation/setup_steps) kısa tutulur; bellek ölçümü
+    metadata + indeks maliyetini yansıtır
+
+Kullanım:
+    from synthetic_kb import generate_entries, write_kb
+    path = write_kb(tmp_dir / "kb_10k.json", 10_000)
+"""
+
+import json
+import random
+from pathlib import Path
+
+KB_FILE = Path(__file__).resolve().parent.parent / "app" / "knowledge" / "unity_kb.json"
+
+_SYLLABLES = ["ka", "ro", "mi", "tan", "vel", "zor", "pix", "len", "dar", "qu", "sel", "bor",
+              "nim", "tek", "ual", "gri", "fen", "dos", "lup", "har"]
+_VOCAB_SIZE = 4000
+
+
+def load_real_entries(kb_path: Path = KB_FILE) -> list[dict]:
+    with open(kb_path, encoding="utf-8") as f:
+        return json.load(f)["entries"]
+
+
+def _vocabulary(rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < _VOCAB_SIZE:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def generate_entries(n: int, seed: int = 0, kb_path: Path = KB_FILE) -> list[dict]:
+    """Gerçek entry'ler + (n - gerçek) sentetik entry döner."""
+    rng = random.Random(seed)
+    real = load_real_entries(kb_path)
+    entries = [dict(e) for e in real[:n]]
+    vocab = _vocabulary(rng)
+    # Zipf ağırlıkları: rank r → 1/r
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]
+
+    for i in range(len(entries), n):
+        base = rng.choice(real)
+        borrowed = [rng.choice(base["triggers"])] if base["triggers"] and rng.random() < 0.5 else []
+        own = rng.choices(vocab, weights=weights, k=rng.randint(2, 5))
+        keywords = rng.choices(vocab, weights=weights, k=rng.randint(4, 12))
+        keywords += rng.sample(base.get("keywords", []), k=min(len(base.get("keywords", [])), 2))
+        entries.append({
+            "id": f"{base['id']}_syn{i}",
+            "title": f"{base['title']} #{i}",
+            "triggers": sorted(set(borrowed + own)),
+            "keywords": sorted(set(keywords)),
+            "turkish_keywords": [],
+            "intent_types": base.get("intent_types", ["chat", "generation"]),
+            "min_total_matches": base.get("min_total_matches", 1),
+            "unity_version": base.get("unity_version", "2021.3+"),
+            "explanation": f"{base['title']} varyantı {i}.",
+            "code": f"public class Synthetic{i} : MonoBehaviour {{ }}",
+            "tips": [],
+            "setup_steps": [f"Synthetic{i} script'ini bir GameObject'e ekle."],
+        })
+    return entries
+
+
+def write_kb(path: Path, n: int, seed: int = 0) -> Path:
+    """n entry'lik sentetik KB'yi JSON olarak yazar."""
+    path.write_text(json.dumps({"entries": generate_entries(n, seed)}, ensure_ascii=False), encoding="utf-8")
+    return path
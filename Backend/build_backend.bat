@@ -19,6 +19,12 @@ REM Eski build'i temizle
 if exist dist\backend rmdir /s /q dist\backend
 if exist build\backend rmdir /s /q build\backend
 
+echo --- KB snapshot uretiliyor ---
+pushd app
+..\venv\Scripts\python.exe -m knowledge.build_snapshot
+if errorlevel 1 exit /b 1
+popd
+
 echo --- PyInstaller calistiriliyor ---
 "%PYINSTALLER%" backend.spec
 
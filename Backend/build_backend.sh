@@ -20,6 +20,9 @@ fi
 # Eski build'i temizle
 rm -rf dist/backend build/backend
 
+echo "--- KB snapshot üretiliyor ---"
+(cd app && ../venv/bin/python -m knowledge.build_snapshot)
+
 echo "--- PyInstaller çalıştırılıyor ---"
 "$PYINSTALLER" backend.spec
 
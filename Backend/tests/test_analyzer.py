@@ -0,0 +1,196 @@
+import unittest
+import subprocess
+import sys
+import os
+
+# App dizinini path'e ekle
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../app')))
+
+from analyzer import RULE_STATS, RULES, UnityAnalyzer
+from code_fixer import CodeFixer
+from csharp_lexer import LEX_CACHE_MAX_CHARS, lex
+
+PLAYER_SCRIPT = """using UnityEngine;
+
+public class Player : MonoBehaviour
+{
+    public float speed = 5f;
+    private Rigidbody rb;
+
+    void Update()
+    {
+        var r = GetComponent<Rigidbody>();
+        // GetComponent<Collider>();
+        if (Vector3.Distance(a, b) < 2f) Attack();
+    }
+
+    void FixedUpdate() {
+        if (Input.GetKey(KeyCode.Space)) Jump();
+    }
+
+    private void Helper()
+    {
+        var c = GetComponent<Collider>();
+    }
+
+    void Start()
+    {
+    }
+
+    void OnGUI() { }
+}"""
+
+
+class TestUnityAnalyzer(unittest.TestCase):
+
+    def _smells(self, code):
+        return [(s["line"], s["type"]) for s in UnityAnalyzer(code).analyze()["smells"]]
+
+    def test_structural_index(self):
+        """Sınıf ve callback gövdeleri tek geçişte indekslenir ('{' ve '}' satırları, 0-based)."""
+        analyzer = UnityAnalyzer(PLAYER_SCRIPT)
+        self.assertEqual(analyzer.class_spans, [("Player", 3, 28)])
+        self.assertEqual(analyzer._method_spans(["void Update()"]), [(8, 12)])
+        self.assertEqual(analyzer._method_spans(["void Update()", "void FixedUpdate()"]), [(8, 12), (14, 16)])
+        self.assertEqual(analyzer.signature_lines["void OnGUI()"], [27])
+        self.assertNotIn(10, [i for i, _ in analyzer.code_lines])
+
+    def test_callback_bodies_only(self):
+        """Update/FixedUpdate kontrolleri sadece kendi gövdelerine bakar; yorumlar ve yardımcı metodlar atlanır."""
+        smells = self._smells(PLAYER_SCRIPT)
+        self.assertIn((10, "⚡ Performans"), smells)       # Update içinde GetComponent
+        self.assertIn((16, "🐛 Mantık Hatası"), smells)    # FixedUpdate içinde Input
+        self.assertIn((12, "⚡ Performans"), smells)       # Update içinde Distance
+        self.assertNotIn(11, [line for line, _ in smells])  # yorum satırı
+        self.assertNotIn(21, [line for line, _ in smells])  # Helper() gövdesi
+        self.assertIn((24, "⚡ Performans"), smells)       # boş Start()
+        self.assertIn((28, "⚡ Performans"), smells)       # OnGUI
+
+    def test_allman_and_unclosed_signature(self):
+        """Allman stili gövde bulunur; '{' hiç gelmeyen imza gövde üretmez."""
+        allman = "void Update()\n{\n    gameObject.AddComponent<BoxCollider>();\n}\nvoid Other() { AddComponent<A>(); }"
+        self.assertEqual(self._smells(allman), [(3, "⚡ Performans")])
+        self.assertEqual(UnityAnalyzer("void Update();").analyze()["smells"], [])
+
+    def test_smell_order_and_code_line(self):
+        """Smell'ler kontrol sırasıyla döner ve gerçek kod satırını taşır."""
+        result = UnityAnalyzer(PLAYER_SCRIPT).analyze()
+        first = result["smells"][0]
+        self.assertEqual((first["line"], first["code"]), (10, "var r = GetComponent<Rigidbody>();"))
+        self.assertEqual(result["stats"], {"total_lines": 29, "class_name": "Player", "has_update": True})
+
+    def test_lexer_masks_strings_and_comments(self):
+        """String, verbatim string ve blok yorumdaki parantez/kod gövde sınırlarını bozmaz."""
+        code = (
+            "void Update()\n{\n"
+            "    Debug.Log(\"{ not a brace\");\n"
+            "    var path = @\"C:\\{data}\";\n"
+            "    /* } */ GetComponent<A>();\n"
+            "}\n"
+            "/*\nvoid Update() {\n    GetComponent<B>();\n}\n*/\n"
+            "void Helper() { GetComponent<C>(); }"
+        )
+        src = lex(code)
+        self.assertEqual([(m.name, src.line_of(m.open), src.line_of(m.close)) for m in src.methods],
+                         [("Update", 1, 5), ("Helper", 11, 11)])
+        self.assertEqual(self._smells(code), [(5, "⚡ Performans")])
+        self.assertEqual(self._smells("void Start() { }\nvoid Update() { AddComponent<A>(); }"),
+                         [(1, "⚡ Performans"), (2, "⚡ Performans")])
+
+    def test_lex_cache_skips_large_sources(self):
+        """Küçük metinler paylaşılır; eşikten büyük metin önbellekte tutulmaz."""
+        self.assertIs(lex(PLAYER_SCRIPT), lex(PLAYER_SCRIPT))
+        big = PLAYER_SCRIPT * (LEX_CACHE_MAX_CHARS // len(PLAYER_SCRIPT) + 1)
+        self.assertIsNot(lex(big), lex(big))
+        self.assertEqual(lex(big).bare_text, lex(big).bare_text)
+
+    def test_fixer_uses_lexer_class_bounds(self):
+        """Her sınıf kendi gövdesinde düzeltilir; yorumdaki kod değişmez."""
+        code = (
+            "public class A : MonoBehaviour\n{\n"
+            "    // public int commented;\n"
+            "    public int hp;\n"
+            "    void Update()\n    {\n"
+            "        Debug.Log(\"}\");\n"
+            "        Camera.main.transform.Rotate(0, 1, 0); // Camera.main\n"
+            "    }\n}\n\n"
+            "public class B : MonoBehaviour\n{\n"
+            "    void Start()\n    {\n        var c = Camera.main;\n    }\n}"
+        )
+        fixed = CodeFixer(code, []).apply_all().fixed_code
+        self.assertEqual(fixed.count("private Camera _cam;"), 2)
+        self.assertEqual(fixed.count("_cam = Camera.main;"), 2)
+        self.assertIn("_cam.transform.Rotate(0, 1, 0); // Camera.main", fixed)
+        self.assertIn("// public int commented;", fixed)
+        self.assertIn("[SerializeField] private int hp;", fixed)
+
+    def test_rule_registry_stats(self):
+        """Her kural kayıtta bir kez bulunur; analyze() kural başına çalışma ve hit sayar."""
+        names = [rule.name for rule in RULES]
+        self.assertEqual(len(names), 15)
+        self.assertEqual(len(set(names)), len(names))
+        RULE_STATS.reset()
+        smells = UnityAnalyzer(PLAYER_SCRIPT).analyze()["smells"]
+        rules = UnityAnalyzer.rule_metrics()["rules"]
+        self.assertEqual(rules["heavy_update"]["hits"], 1)
+        self.assertEqual(rules["ongui_usage"]["hits"], 1)
+        self.assertEqual(sum(r["hits"] for r in rules.values()), len(smells))
+        self.assertIn("code", UnityAnalyzer.rule_metrics()["scopes"])
+
+    def test_incremental_analysis_matches_full(self):
+        """Değişmeyen metodların smell'leri kaydırılarak alınır; sonuç tam analizle aynıdır."""
+        _, snapshot = UnityAnalyzer(PLAYER_SCRIPT).analyze_incremental()
+        edited = PLAYER_SCRIPT.replace("    void Update()\n", "    // yeni\n    void Update()\n", 1)
+        edited = edited.replace("Jump();", "Jump(); GetComponent<A>();")
+        result, snapshot = UnityAnalyzer(edited).analyze_incremental(snapshot)
+        self.assertEqual(result, UnityAnalyzer(edited).analyze())
+        self.assertGreater(snapshot.reused, 0)
+        self.assertLess(snapshot.reused, snapshot.total)
+        # Rigidbody bağlamı değişince önceki segmentler kullanılmaz
+        no_rb = edited.replace("Rigidbody", "Collider")
+        result, fresh = UnityAnalyzer(no_rb).analyze_incremental(snapshot)
+        self.assertEqual((result, fresh.reused), (UnityAnalyzer(no_rb).analyze(), 0))
+
+    def test_iter_smells_yields_same_smells_as_analyze(self):
+        """Akış sırası farklı olabilir; smell kümesi (koşullu kurallar dahil) analyze() ile aynıdır."""
+        def key(smell):
+            return (str(smell["line"]), smell["type"], smell["msg"], smell.get("code"))
+
+        for code in (PLAYER_SCRIPT, PLAYER_SCRIPT.replace("Rigidbody", "Collider"), ""):
+            expected = sorted(map(key, UnityAnalyzer(code).analyze()["smells"]))
+            self.assertEqual(sorted(map(key, UnityAnalyzer(code).iter_smells())), expected)
+        # Kod satırı kuralları lex'i beklemez: ilk smell tam yapısal indeks kurulmadan gelir
+        analyzer = UnityAnalyzer(PLAYER_SCRIPT)
+        first = next(analyzer.iter_smells())
+        self.assertEqual((first["line"], first["code"]), (5, "public float speed = 5f;"))
+        self.assertNotIn("_src", vars(analyzer))
+        # Tam akış: bayraklar ve stats akıştan; LexedSource lex() önbelleğine girmez
+        code = PLAYER_SCRIPT + "\n// streamed"
+        analyzer = UnityAnalyzer(code)
+        list(analyzer.iter_smells())
+        self.assertEqual(analyzer.stats(), UnityAnalyzer(code).analyze()["stats"])
+        self.assertIsNot(analyzer._src, lex(code))
+
+
+    def test_ruleset_version_without_module_sources(self):
+        """Paketli sürümde .py kaynakları okunamaz; analyzer ve önbellek yine içe aktarılır."""
+        script = (
+            "import pathlib\n"
+            "def unreadable(self):\n"
+            "    raise FileNotFoundError(self)\n"
+            "pathlib.Path.read_bytes = unreadable\n"
+            "import analyzer, analysis_cache\n"
+            "print(analyzer.RULESET_VERSION, analysis_cache.ANALYSIS_CACHE_VERSION)\n"
+        )
+        app_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../app'))
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=app_dir,
+            capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        ruleset, report = result.stdout.split()
+        self.assertEqual((len(ruleset), len(report)), (16, 16))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,7 @@ Amaç: KB modunun sınırlarını zorlamak.
     cd Backend/app && python -m pytest ../tests/test_kb_stress.py -v
 """
 
+import json
 import sys
 import time
 import os
@@ -27,6 +28,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
 
 import pytest
 from knowledge.kb_engine import KBEngine, KBResult
+from knowledge.stemmer import StemMatcher, stem
+from knowledge.term_matcher import TermMatcher
+from knowledge.trigram_index import TrigramIndex
 
 # ─── Fixtures ────────────────────────────────────────────────────────────────
 
@@ -385,6 +389,409 @@ def test_score_ordering(kb):
     assert not specific.clarification_needed
 
 
+# ─── 11. Ters İndeks ─────────────────────────────────────────────────────────
+
+def test_inverted_index_covers_all_terms(kb):
+    """Her trigger/keyword ters indekste ilgili entry'ye işaret etmeli."""
+    postings = kb._index.postings
+    for c in kb._index.compiled:
+        for trig in c.triggers:
+            assert (c.index, True) in postings[trig], f"'{trig}' → {c.entry_id} posting eksik"
+        for kw in c.keywords:
+            assert any(i == c.index for i, _ in postings[kw]), f"'{kw}' → {c.entry_id} posting eksik"
+
+
+def test_compiled_entries_are_normalized(kb):
+    """Derlenmiş entry'ler normalize terimler ve intent maskesi taşımalı."""
+    proj = next(c for c in kb._index.compiled if c.entry_id == "projectile_shooting")
+    assert "ates sistemi" in proj.keywords            # "ateş sistemi" → normalize
+    assert isinstance(proj.triggers, frozenset) and isinstance(proj.keywords, frozenset)
+    assert proj.intent_mask & kb._index.intent_bits["generation"]
+    assert not hasattr(proj, "__dict__")              # __slots__
+
+
+def test_lookup_scores_only_trigger_candidates(kb, monkeypatch):
+    """lookup() sadece trigger paylaşan entry'leri skorlamalı, tüm KB'yi değil."""
+    scored = []
+    original = kb._score
+    monkeypatch.setattr(kb, "_score", lambda entry, t, k: scored.append(entry.entry_id) or original(entry, t, k))
+    kb._cache.clear()
+    kb.lookup("singleton pattern yaz", intent="generation")
+    assert scored and len(scored) < len(kb._entries)
+    assert "singleton" in scored
+
+
+# ─── 12. Substring Otomatı (TermMatcher) ─────────────────────────────────────
+
+def test_term_matcher_rules():
+    """Exact, keyword⊂token, token⊂keyword, min-4 ve çok kelimeli kurallar korunmalı."""
+    matcher = TermMatcher(["zipla", "pooling", "so", "ai hareket", "coroutine"])
+    assert matcher.match({"ziplasin"}) == {"zipla"}          # keyword token'ın içinde
+    assert matcher.match({"pool"}) == {"pooling"}            # token keyword'ün içinde
+    assert matcher.match({"coroutine"}) == {"coroutine"}     # exact
+    assert matcher.match({"so"}) == {"so"}                   # kısa keyword sadece exact
+    assert matcher.match({"sound"}) == set()                 # "so" substring ile eşleşmez
+    assert matcher.match({"zip"}) == set()                   # kısa token substring'e girmez
+    assert matcher.match({"hareket"}) == set()               # çok kelimeli: tüm parçalar gerekli
+    assert matcher.match({"ai", "hareket"}) == {"ai hareket"}
+
+
+def test_long_code_lookup_performance(kb):
+    """Binlerce satırlık kodun token lookup fallback'i hızlı kalmalı."""
+    code = "\n".join(
+        f"    private float speed{i} = GetComponent<Rigidbody>().velocity.magnitude; // jump{i}"
+        for i in range(3000)
+    )
+    start = time.perf_counter()
+    kb.lookup(code, intent="chat")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    assert elapsed_ms < 200, f"Uzun kod lookup {elapsed_ms:.1f}ms sürdü (limit: 200ms)"
+
+
+# ─── 13. Lookup Önbelleği ────────────────────────────────────────────────────
+
+def test_lookup_cache_hit_returns_same_result():
+    """Aynı token seti + intent ikinci seferde önbellekten gelmeli (kelime sırası önemsiz)."""
+    engine = KBEngine()
+    first = engine.lookup("singleton pattern yaz", intent="generation")
+    hits_before = engine._cache.hits
+    second = engine.lookup("yaz pattern singleton", intent="generation")
+    assert second is first
+    assert engine._cache.hits == hits_before + 1
+    # Farklı intent ayrı anahtar
+    engine.lookup("singleton pattern yaz", intent="chat")
+    assert engine.stats()["cache"]["size"] == 2
+
+
+def test_lookup_response_caches_markdown():
+    """lookup_response markdown'ı bir kez render edip önbellekte tutmalı."""
+    engine = KBEngine()
+    result, md = engine.lookup_response("object pool sistemi oluştur", intent="generation")
+    assert result is not None
+    assert md == engine.format_response(result, intent="generation")
+    _, md_again = engine.lookup_response("object pool sistemi oluştur", intent="generation")
+    assert md_again is md
+    assert engine.lookup_response("xyzabc qwerty", intent="chat") == (None, None)
+
+
+def test_index_swap_invalidates_cache():
+    """Yeni KB indeksi devreye girince önbellek temizlenmeli, generation artmalı."""
+    engine = KBEngine()
+    assert engine.lookup("singleton pattern yaz", intent="generation") is not None
+    generation = engine.stats()["generation"]
+    engine._swap_index(engine._build_index([]))
+    assert len(engine._cache) == 0
+    assert engine.stats()["generation"] > generation
+    assert engine.lookup("singleton pattern yaz", intent="generation") is None
+
+
+
+# ─── 14. Hot Reload ──────────────────────────────────────────────────────────
+
+def test_reload_swaps_and_keeps_old_on_malformed_json(tmp_path):
+    """reload() yeni KB'yi devreye almalı; bozuk JSON'da eski KB hizmette kalmalı."""
+    from knowledge.kb_engine import KB_FILE
+    kb_file = tmp_path / "unity_kb.json"
+    kb_file.write_text(KB_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    engine = KBEngine(kb_path=kb_file)
+    total = len(engine._entries)
+    assert engine.lookup("singleton pattern yaz", intent="generation") is not None
+
+    kb_file.write_text('{"entries": [', encoding="utf-8")
+    assert engine.reload() is False
+    assert len(engine._entries) == total
+    assert engine.lookup("singleton pattern yaz", intent="generation") is not None
+
+    entries = json.loads(KB_FILE.read_text(encoding="utf-8"))["entries"]
+    kept = [e for e in entries if e["id"] != "singleton"]
+    kb_file.write_text(json.dumps({"entries": kept}), encoding="utf-8")
+    os.utime(kb_file, (time.time() + 5, time.time() + 5))
+    assert engine.reload_if_changed() is True
+    assert engine.reload_if_changed() is False          # mtime değişmedi
+    assert len(engine._entries) == total - 1
+    result = engine.lookup("singleton pattern yaz", intent="generation")
+    assert result is None or result.entry_id != "singleton"
+
+
+
+# ─── 15. mmap Gövde Deposu ───────────────────────────────────────────────────
+
+def test_body_store_lazy_bodies(kb):
+    """Metadata gövde taşımamalı; gövde sadece kazanan sonuç için okunmalı."""
+    assert all("code" not in c.raw and "explanation" not in c.raw for c in kb._index.compiled)
+    result = kb.lookup("object pool sistemi oluştur", intent="generation")
+    assert result.code and result.setup_steps
+    assert kb._entries[kb._index.by_id[result.entry_id].index]["code"] == result.code
+
+
+def test_body_store_shared_between_engines(tmp_path):
+    """Aynı KB'yi yükleyen iki engine aynı gövde dosyasını eşlemeli."""
+    from knowledge.body_store import KBBodyStore
+    entries = [{"id": "a", "title": "A", "code": "class A {}", "setup_steps": ["1"]},
+               {"id": "b", "title": "B", "explanation": "ğüşiöç"}]
+    first, meta = KBBodyStore.build(entries, cache_dir=tmp_path)
+    second, _ = KBBodyStore.build(entries, cache_dir=tmp_path)
+    assert first.path is not None and first.path == second.path
+    assert meta == [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]
+    assert second.read(0) == {"code": "class A {}", "setup_steps": ["1"]}
+    assert second.read(1) == {"explanation": "ğüşiöç"}
+
+
+
+# ─── 16. Derlenmiş Snapshot ──────────────────────────────────────────────────
+
+def test_snapshot_roundtrip_and_fallback(tmp_path):
+    """Snapshot JSON ile aynı sonuçları vermeli; JSON değişince veya versiyon farklıysa JSON'a düşülmeli."""
+    from knowledge import kb_snapshot
+    from knowledge.kb_engine import KB_FILE
+    kb_file = tmp_path / "unity_kb.json"
+    kb_file.write_bytes(KB_FILE.read_bytes())
+    snap_file = KBEngine(kb_path=kb_file, use_snapshot=False).save_snapshot()
+    assert snap_file == tmp_path / "unity_kb.snapshot"
+
+    from_json = KBEngine(kb_path=kb_file, use_snapshot=False)
+    from_snap = KBEngine(kb_path=kb_file)
+    assert kb_snapshot.read_snapshot(snap_file, from_json._index.source_digest) is not None
+    for query, intent in [("singleton pattern yaz", "generation"), ("3d karakter kontrolcüsü", "generation"),
+                          ("coroutine nasıl kullanılır", "chat"), ("object pool sistemi oluştur", "generation")]:
+        assert from_snap.lookup_response(query, intent) == from_json.lookup_response(query, intent)
+
+    # JSON düzenlendi → hash uyuşmaz → snapshot yok sayılır
+    kb_file.write_bytes(KB_FILE.read_bytes() + b"\n")
+    assert kb_snapshot.read_snapshot(snap_file, kb_snapshot.json_digest(kb_file.read_bytes())) is None
+    assert len(KBEngine(kb_path=kb_file)._index.entries) == len(from_json._index.entries)
+
+    # Format versiyonu değişti → reddedilir
+    kb_file.write_bytes(KB_FILE.read_bytes())
+    digest = kb_snapshot.json_digest(kb_file.read_bytes())
+    data = bytearray(snap_file.read_bytes())
+    data[8] ^= 0xFF
+    snap_file.write_bytes(bytes(data))
+    assert kb_snapshot.read_snapshot(snap_file, digest) is None
+
+
+
+# ─── 17. Toplu Lookup ────────────────────────────────────────────────────────
+
+def test_lookup_many_matches_single_lookup():
+    """lookup_many her mesaj için lookup() ile aynı sonucu, aynı sırada dönmeli."""
+    messages = [q for _, qs in ENTRY_QUERIES for q in qs] + ["xyzabc qwerty", "", "singleton pattern yaz"]
+    for intent in ("chat", "generation"):
+        batch = KBEngine().lookup_many(messages, intent=intent)
+        single = KBEngine()
+        assert len(batch) == len(messages)
+        for message, result in zip(messages, batch):
+            assert result == single.lookup(message, intent=intent), message
+
+
+
+# ─── 18. Derlenmiş Kod Pattern'leri ──────────────────────────────────────────
+
+def test_code_patterns_match_re_search():
+    """Derlenmiş pattern'ler re.search(pattern, code) ile aynı kararı vermeli."""
+    import re
+    samples = [
+        "void Update() { rb.linearVelocity = dir; }",
+        "cc = GetComponent<CharacterController>(); Input.GetAxis(\"Mouse X\");",
+        "File.WriteAllText(path, json);",
+        "FileXWriteAllText(path, json);",
+        "public void Shoot() {}", "public void Shooting() {}",
+        "enum   PlayerState { Idle }", "switch (currentState)",
+        "ReturnToPool(obj); // pool",
+    ]
+    for code in samples:
+        for cp in KBEngine._CODE_PATTERNS:
+            assert cp.search(code) == bool(re.search(cp.pattern, code)), (cp.pattern, code)
+
+
+def test_lookup_for_code_priority_order(kb):
+    """Birden fazla pattern eşleşirse listede önce gelen kazanmalı."""
+    code = "void Awake() { DontDestroyOnLoad(gameObject); _audio = GetComponent<AudioSource>(); }"
+    assert kb.lookup_for_code(code).entry_id == "audio_manager"
+
+
+def test_lookup_for_code_5000_lines_latency(kb):
+    """5.000 satırlık script'te pattern taraması hızlı kalmalı (eşleşme en sonda)."""
+    code = "\n".join(
+        f"    private float value{i} = transform.position.x * {i}; // satır {i}" for i in range(5000)
+    ) + "\n    void FixedUpdate() { rb.linearVelocity = input * speed; }"
+    start = time.perf_counter()
+    result = kb.lookup_for_code(code)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    assert result is not None and result.entry_id == "movement_basic"
+    assert elapsed_ms < 80, f"5.000 satır lookup_for_code {elapsed_ms:.1f}ms sürdü (limit: 80ms)"
+
+
+
+# ─── 19. BM25 Ranker ─────────────────────────────────────────────────────────
+
+def test_bm25_ranker_keeps_gates_and_variants():
+    """BM25 backend'inde trigger kapısı, varyant ve clarification akışı korunmalı."""
+    bm25 = KBEngine(ranker="bm25")
+    assert bm25.stats()["ranker"] == "bm25"
+    for query, expected_id in VARIANT_QUERIES:
+        result = bm25.lookup(query, intent="generation")
+        assert result and not result.clarification_needed and result.entry_id == expected_id, query
+    for query in CLARIFICATION_QUERIES:
+        assert bm25.lookup(query, intent="generation").clarification_needed, query
+    for query, intent in FALSE_POSITIVE_QUERIES:
+        result = bm25.lookup(query, intent=intent)
+        assert result is None or result.clarification_needed, query
+    result = bm25.lookup("object pool sistemi oluştur", intent="generation")
+    assert result.entry_id == "object_pooling" and 0 < result.score < 1
+    with pytest.raises(ValueError):
+        KBEngine(ranker="tfidf")
+
+
+
+# ─── 20. Stem Eşleştirme Modu ────────────────────────────────────────────────
+
+def test_stem_matcher_rules():
+    """Stem modu: ek atılmış hallerin eşitliği, substring false positive'i yok."""
+    assert stem("ziplasin") == stem("ziplama") == stem("zipla")
+    assert stem("enemies") == stem("enemie")
+    assert stem("fps") == "fps"                               # kısa token'a dokunulmaz
+    matcher = StemMatcher(["zipla", "pooling", "ai", "object pool", "coroutine"])
+    assert matcher.match({"ziplasin"}) == {"zipla"}
+    assert matcher.match({"pools"}) == {"pooling"}            # pool+s / pool+ing
+    assert matcher.match({"tail"}) == set()                   # "ai" substring ile eşleşmez
+    assert matcher.match({"objects"}) == set()                # çok kelimeli: tüm parçalar gerekli
+    assert matcher.match({"objects", "pooling"}) == {"pooling", "object pool"}
+    assert StemMatcher.from_state(matcher.to_state()).match({"ziplasin"}) == {"zipla"}
+
+
+def test_stem_mode_engine(tmp_path):
+    """match_mode="stem" seçilebilir, snapshot'la birlikte çalışır."""
+    engine = KBEngine(use_snapshot=False, match_mode="stem")
+    assert engine.stats()["match_mode"] == "stem"
+    result = engine.lookup("object pool sistemi oluştur", intent="generation")
+    assert result and result.entry_id == "object_pooling"
+    for query, intent in FALSE_POSITIVE_QUERIES:
+        result = engine.lookup(query, intent=intent)
+        assert result is None or result.clarification_needed, query
+
+    kb_file = tmp_path / "unity_kb.json"
+    kb_file.write_bytes(open(engine._kb_path, "rb").read())
+    engine_file = KBEngine(kb_path=kb_file, use_snapshot=False, match_mode="stem")
+    engine_file.save_snapshot()
+    substring = KBEngine(kb_path=kb_file, match_mode="substring")
+    assert isinstance(substring._index.matcher, TermMatcher)
+    assert isinstance(KBEngine(kb_path=kb_file, match_mode="stem")._index.matcher, StemMatcher)
+    assert substring.lookup("ziplasin karakter", intent="generation") is not None
+    with pytest.raises(ValueError):
+        KBEngine(match_mode="fuzzy")
+
+
+
+# ─── 21. Trigram Yazım Hatası Fallback'i ─────────────────────────────────────
+
+def test_trigram_index_corrections():
+    index = TrigramIndex(["coroutine", "hareket", "envanter", "input", "ai"])
+    assert index.best("haerket")[0] == "hareket"               # yer değiştirme
+    assert index.best("corutine")[0] == "coroutine"            # harf düşmesi
+    assert index.best("inut")[0] == "input"
+    assert index.best("hareket") is None                       # zaten bilinen kelime
+    assert index.best("muzik") is None                         # yakın kelime yok
+    word, confidence = index.best("enavnter")
+    assert word == "envanter" and 0 < confidence < 1
+
+
+def test_fuzzy_fallback_recovers_typos():
+    """Yazım hatalı sorgu fallback ile bulunmalı; güven skoru exact sonuçtan düşük."""
+    engine = KBEngine(use_snapshot=False)
+    strict = KBEngine(use_snapshot=False, fuzzy=False)
+    for query, expected_id in [
+        ("envnater sistemi yaz", "inventory_system"),
+        ("rigidbody haerket sistemi", "movement_basic"),
+        ("minimp sistemi yaz", "minimap"),
+    ]:
+        assert strict.lookup(query, intent="generation") is None, query
+        result = engine.lookup(query, intent="generation")
+        assert result and result.entry_id == expected_id, query
+        assert result.fuzzy_matches and result.code, query
+    assert engine.lookup("envanter sistemi yaz", intent="generation").fuzzy_matches == {}
+    for query, intent in FALSE_POSITIVE_QUERIES:
+        result = engine.lookup(query, intent=intent)
+        assert result is None or result.clarification_needed, query
+
+
+
+# ─── 22. Telemetri ───────────────────────────────────────────────────────────
+
+def test_telemetry_counts_and_histogram():
+    engine = KBEngine(cache_size=0)
+    engine.lookup("singleton pattern yaz", intent="generation")
+    engine.lookup("karakter hareketi sistemi oluştur", intent="generation")
+    engine.lookup_response("hava durumu nasıl", intent="chat")
+    engine.lookup_for_code(CODE_SNIPPETS[0][0])
+
+    metrics = engine.metrics()
+    gen = metrics["by_intent"]["generation"]
+    assert (gen["hit"], gen["clarification"], gen["miss"]) == (1, 1, 0)
+    assert metrics["by_intent"]["chat"]["miss"] == 1
+    assert metrics["by_intent"]["code"]["hit"] == 1
+    assert metrics["by_entry"]["singleton"] == 1
+    assert CODE_SNIPPETS[0][1] in metrics["by_entry"]
+    assert ("hava", 1) in metrics["top_miss_tokens"]
+    lookup_hist = metrics["latency"]["lookup"]
+    assert lookup_hist["count"] == 3 and sum(lookup_hist["buckets"].values()) == 3
+    assert metrics["latency"]["lookup_for_code"]["count"] == 1
+
+
+
+# ─── 23. Öğrenilmiş KB Adayları ──────────────────────────────────────────────
+
+LEARNED_RESPONSE = (
+    "Boss faz yöneticisi.\n\n**📄 BossPhaseController.cs**\n```csharp\nusing UnityEngine;\n\n"
+    "public class BossPhaseController : MonoBehaviour\n{\n    public int phase;\n}\n```\n\n"
+    "🎮 Editor Setup\n- Boss objesine ekle\n"
+)
+
+
+def test_promoted_candidate_served_from_overlay(tmp_path):
+    from knowledge.kb_candidates import append_overlay_entry, build_entry, candidate_key, is_promotable
+
+    message = "boss savaşı faz geçişi sistemi yaz"
+    assert is_promotable(LEARNED_RESPONSE, 8.5)
+    assert not is_promotable(LEARNED_RESPONSE, 6.0)
+    assert not is_promotable("kod yok", 9.5)
+
+    overlay = tmp_path / "unity_kb.local.json"
+    engine = KBEngine(cache_size=0, overlay_path=overlay)
+    base_count = len(engine._index.entries)
+    assert engine.lookup(message, intent="generation") is None
+
+    entry = build_entry({"token_key": candidate_key(message), "prompt": message,
+                         "response": LEARNED_RESPONSE, "critic_score": 8.5})
+    assert entry["code"].startswith("using UnityEngine;") and entry["setup_steps"] == ["Boss objesine ekle"]
+    append_overlay_entry(overlay, entry)
+    append_overlay_entry(overlay, entry)  # aynı id ikinci kez eklenmez
+    assert engine.reload_if_changed()
+
+    assert len(engine._index.entries) == base_count + 1
+    result = engine.lookup(message, intent="generation")
+    assert result is not None and result.entry_id == entry["id"]
+    assert engine.lookup("singleton pattern yaz", intent="generation").entry_id == "singleton"
+    assert engine.lookup("boss savaşı yaz", intent="generation") is None
+
+
+
+# ─── 24. Mesaj Kapsaması (LLM Modu KB Ön Geçişi) ─────────────────────────────
+
+@pytest.mark.parametrize("query,expected_full", [
+    ("singleton pattern yaz", True),
+    ("object pool sistemi oluştur", True),
+    ("ses yöneticisi oluştur", True),
+    ("ui manager oluştur", False),
+    ("singleton pattern ile ses yöneticisi, müzik crossfade ve ses havuzu yaz", False),
+    ("karakter için coyote time, jump buffer, dash ve duvar zıplaması olan gelişmiş bir hareket sistemi yaz", False),
+])
+def test_coverage_separates_exact_and_compound_requests(kb, query, expected_full):
+    result = kb.lookup(query, intent="generation")
+    assert result is not None and not result.clarification_needed
+    assert (kb.coverage(query, result) >= 0.75) is expected_full
+
+
 if __name__ == "__main__":
     # Direkt çalıştırma için özet çıktı
     import subprocess
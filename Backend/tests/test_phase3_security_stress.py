@@ -1,9 +1,11 @@
 import importlib
+import json
 import os
 import shutil
 import sqlite3
 import sys
 import tempfile
+import time
 import unittest
 from contextlib import closing
 from urllib.parse import parse_qs, urlparse
@@ -54,6 +56,7 @@ class TestPhase3SecurityStress(unittest.TestCase):
         os.environ.pop("GOOGLE_CLIENT_SECRET", None)
         os.environ.pop("GITHUB_CLIENT_ID", None)
         os.environ.pop("GITHUB_CLIENT_SECRET", None)
+        os.environ.pop("KB_OPERATOR_USER_IDS", None)
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     def _register_and_login(self, username: str, password: str = "12345678") -> dict:
@@ -415,6 +418,323 @@ class TestPhase3SecurityStress(unittest.TestCase):
         delete_history = self.client.delete(f"/history/{item_id}", headers=headers_a)
         self.assertEqual(delete_history.status_code, 200, delete_history.text)
 
+    def test_kb_reload_requires_operator(self):
+        unauthorized = self.client.post("/kb/reload", headers=self._auth_headers("invalid-token"))
+        self.assertEqual(unauthorized.status_code, 401, unauthorized.text)
+
+        user = self._register_and_login("kb_reload_user")
+        forbidden = self.client.post("/kb/reload", headers=self._auth_headers(user["session_token"]))
+        self.assertEqual(forbidden.status_code, 403, forbidden.text)
+        os.environ["KB_OPERATOR_USER_IDS"] = str(user["user_id"])
+        reload_res = self.client.post("/kb/reload", headers=self._auth_headers(user["session_token"]))
+        self.assertEqual(reload_res.status_code, 200, reload_res.text)
+        self.assertGreater(reload_res.json()["total_entries"], 0)
+
+    def test_kb_lookup_batch_does_not_write_messages(self):
+        batch_body = {"messages": ["singleton pattern yaz", "xyzabc qwerty"], "intent": "generation"}
+        unauthorized = self.client.post("/kb/lookup-batch", json=batch_body, headers=self._auth_headers("invalid-token"))
+        self.assertEqual(unauthorized.status_code, 401, unauthorized.text)
+
+        user = self._register_and_login("kb_batch_user")
+        res = self.client.post("/kb/lookup-batch", json=batch_body, headers=self._auth_headers(user["session_token"]))
+        self.assertEqual(res.status_code, 200, res.text)
+        payload = res.json()
+        self.assertEqual([item["status"] for item in payload["results"]], ["hit", "miss"])
+        self.assertEqual(payload["results"][0]["entry_id"], "singleton")
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            message_count = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        self.assertEqual(message_count, 0)
+
+    def test_kb_metrics_requires_session_and_counts_lookups(self):
+        unauthorized = self.client.get("/kb/metrics", headers=self._auth_headers("invalid-token"))
+        self.assertEqual(unauthorized.status_code, 401, unauthorized.text)
+
+        user = self._register_and_login("kb_metrics_user")
+        headers = self._auth_headers(user["session_token"])
+        batch_body = {"messages": ["singleton pattern yaz", "xyzabc qwerty"], "intent": "generation"}
+        self.client.post("/kb/lookup-batch", json=batch_body, headers=headers)
+
+        res = self.client.get("/kb/metrics", headers=headers)
+        self.assertEqual(res.status_code, 200, res.text)
+        metrics = res.json()
+        self.assertGreaterEqual(metrics["by_intent"]["generation"]["hit"], 1)
+        self.assertGreaterEqual(metrics["by_intent"]["generation"]["miss"], 1)
+        self.assertGreaterEqual(metrics["by_entry"]["singleton"], 1)
+        self.assertGreaterEqual(metrics["latency"]["lookup_many"]["count"], 1)
+        # Miss token'ları diğer kullanıcıların istemlerinden gelir: sadece KB operatörü görür
+        self.assertNotIn("top_miss_tokens", metrics)
+        os.environ["KB_OPERATOR_USER_IDS"] = str(user["user_id"])
+        operator_metrics = self.client.get("/kb/metrics", headers=headers).json()
+        self.assertIn("xyzabc", dict(operator_metrics["top_miss_tokens"]))
+
+    def test_llm_mode_kb_shortcut_and_force_ai(self):
+        user = self._register_and_login("kb_shortcut_user")
+        headers = self._auth_headers(user["session_token"])
+        conv_id = self._create_conversation(user["user_id"], user["session_token"])
+        body = {
+            "conversation_id": conv_id,
+            "message": "singleton pattern yaz",
+            "language": "tr",
+            "user_id": user["user_id"],
+            "mode": "generation",
+            "use_kb": False,
+        }
+
+        res = self.client.post("/chat", json=body, headers=headers)
+        self.assertEqual(res.status_code, 200, res.text)
+        data = res.json()
+        self.assertEqual((data["source"], data["kb_entry_id"]), ("kb_shortcut", "singleton"))
+        self.assertIn("<!-- KB_SHORTCUT -->", data["content"])
+
+        forced = self.client.post("/chat", json={**body, "force_ai": True}, headers=headers)
+        self.assertEqual(forced.status_code, 200, forced.text)
+        self.assertNotEqual(forced.json().get("source"), "kb_shortcut")
+
+        shortcut = self.client.get("/kb/metrics", headers=headers).json()["shortcut"]["generation"]
+        self.assertEqual((shortcut["answered"], shortcut["forced_ai"]), (1, 1))
+        self.assertGreaterEqual(shortcut["llm_calls_avoided"], 2)
+
+    def test_project_scan_streams_file_results_and_summary(self):
+        user = self._register_and_login("project_scan_user")
+        headers = self._auth_headers(user["session_token"])
+        body = {"user_id": user["user_id"]}
+        self.assertEqual(self.client.post("/scan-project", json=body, headers=headers).status_code, 404)
+
+        workspace = Path(self.temp_dir) / "ScanProject"
+        scripts_dir = workspace / "Assets" / "Scripts" / "Player"
+        scripts_dir.mkdir(parents=True)
+        (scripts_dir / "Mover.cs").write_text(
+            "public class Mover : MonoBehaviour\n{\n    void Update()\n    {\n"
+            "        var rb = GetComponent<Rigidbody>();\n    }\n}", encoding="utf-8")
+        (workspace / "Assets" / "Scripts" / "Clean.cs").write_text("public class Clean {}", encoding="utf-8")
+        (workspace / "Assets" / "Scripts" / "Notes.txt").write_text("void Update() {}", encoding="utf-8")
+        (workspace / "Assets" / "Editor").mkdir()
+        (workspace / "Assets" / "Editor" / "Tool.cs").write_text("public class Tool {}", encoding="utf-8")
+        self.client.post("/save-workspace", json={"user_id": user["user_id"], "path": str(workspace)}, headers=headers)
+
+        try:
+            res = self.client.post("/scan-project", json=body, headers=headers)
+        finally:
+            self.app_main.project_scanner.shutdown()
+        self.assertEqual(res.status_code, 200, res.text)
+        self.assertEqual(res.headers["content-type"], "application/x-ndjson")
+        records = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual((records[0]["type"], records[0]["files"]), ("start", 2))
+        files = {r["path"]: r for r in records if r["type"] == "file"}
+        self.assertEqual(set(files), {"Assets/Scripts/Clean.cs", "Assets/Scripts/Player/Mover.cs"})
+        self.assertEqual(files["Assets/Scripts/Clean.cs"]["score"], 10.0)
+        self.assertTrue(files["Assets/Scripts/Player/Mover.cs"]["smells"])
+        summary = records[-1]
+        self.assertEqual((summary["type"], summary["total_files"]), ("summary", 2))
+        self.assertEqual(summary["worst_files"][0]["path"], "Assets/Scripts/Player/Mover.cs")
+        self.assertLess(summary["score"], 10.0)
+
+    def test_analyze_stream_sends_smells_then_summary(self):
+        from analyzer import UnityAnalyzer
+        from report_engine import ReportEngine
+
+        user = self._register_and_login("analyze_stream_user")
+        headers = self._auth_headers(user["session_token"])
+        code = ("public class Mover : MonoBehaviour\n{\n    public int hp;\n    void Update()\n    {\n"
+                "        GetComponent<Rigidbody>();\n        Camera.main.Render();\n    }\n}")
+        body = {"user_id": user["user_id"], "code": code}
+        res = self.client.post("/analyze/stream", json=body, headers=headers)
+        self.assertEqual(res.status_code, 200, res.text)
+        self.assertEqual(res.headers["content-type"], "application/x-ndjson")
+        records = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual(records[0], {"type": "start", "total_lines": 9})
+        smells = [r["smell"] for r in records[1:-1]]
+        self.assertTrue(all(r["type"] == "smell" for r in records[1:-1]))
+        expected = UnityAnalyzer(code).analyze()
+        self.assertCountEqual(smells, expected["smells"])
+        summary = records[-1]
+        self.assertEqual((summary["type"], summary["stats"]), ("summary", expected["stats"]))
+        self.assertEqual(summary["score"], ReportEngine.calculate_score(expected["smells"]))
+        self.assertEqual(summary["total_smells"], len(smells))
+
+        sse = self.client.post("/analyze/stream", json={**body, "format": "sse"}, headers=headers)
+        self.assertEqual(sse.headers["content-type"].split(";")[0], "text/event-stream")
+        self.assertTrue(sse.text.startswith("event: start\ndata: "))
+        self.assertEqual(self.client.post("/analyze/stream", json={**body, "format": "xml"}, headers=headers).status_code, 400)
+
+    def test_workspace_watcher_keeps_edited_scripts_analyzed(self):
+        user = self._register_and_login("watch_user")
+        headers = self._auth_headers(user["session_token"])
+        workspace = Path(self.temp_dir) / "WatchProject"
+        scripts_dir = workspace / "Assets" / "Scripts"
+        scripts_dir.mkdir(parents=True)
+        script = scripts_dir / "Mover.cs"
+        script.write_text("public class Mover : MonoBehaviour\n{\n    void Start() { }\n}", encoding="utf-8")
+        self.client.post("/save-workspace", json={"user_id": user["user_id"], "path": str(workspace)}, headers=headers)
+
+        watchers = self.app_main.workspace_watchers
+        watchers.interval, watchers.debounce, watchers.cpu_share, watchers.max_per_user = 0.02, 0.05, 1.0, 1
+
+        def wait_for(predicate, key="files"):
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                files = client.get(f"/workspace-index/{user['user_id']}", headers=headers).json()[key]
+                if predicate(files):
+                    return files
+                time.sleep(0.02)
+            self.fail("workspace index güncellenmedi")
+
+        with TestClient(self.app_main.app) as client:
+            start = client.post("/workspace-watch", json={"user_id": user["user_id"]}, headers=headers)
+            self.assertEqual(start.status_code, 200, start.text)
+            files = wait_for(lambda f: len(f) == 1)
+            self.assertEqual(files[0]["path"], "Assets/Scripts/Mover.cs")
+
+            edited = ("public class Mover : MonoBehaviour\n{\n    void Update()\n    {\n"
+                      "        var rb = GetComponent<Rigidbody>();\n    }\n}")
+            script.write_text(edited, encoding="utf-8")
+            files = wait_for(lambda f: f and any(s["line"] == 5 for s in f[0]["smells"]))
+            self.assertLess(files[0]["score"], 10.0)
+
+            # Debounce sırasında silinen dosya bekleyenlerden düşer
+            watchers.debounce = 60
+            spawner = scripts_dir / "Spawner.cs"
+            spawner.write_text("public class Spawner : MonoBehaviour { }", encoding="utf-8")
+            wait_for(lambda w: w[0]["pending"] == 1, key="watching")
+            spawner.unlink()
+            wait_for(lambda w: w[0]["pending"] == 0, key="watching")
+            watchers.debounce = 0.05
+
+            # /chat (KB modu) aynı kodu izleyicinin ısıttığı önbellekten okur
+            conv_id = self._create_conversation(user["user_id"], user["session_token"])
+            before = watchers.analysis_cache.stats()["hits"]["memory"]
+            res = client.post("/chat", json={"conversation_id": conv_id, "message": edited, "language": "tr",
+                                             "user_id": user["user_id"], "use_kb": True}, headers=headers)
+            self.assertEqual(res.status_code, 200, res.text)
+            self.assertEqual(watchers.analysis_cache.stats()["hits"]["memory"], before + 1)
+
+            other = Path(self.temp_dir) / "OtherProject"
+            (other / "Assets" / "Scripts").mkdir(parents=True)
+            client.post("/save-workspace", json={"user_id": user["user_id"], "path": str(other)}, headers=headers)
+            limited = client.post("/workspace-watch", json={"user_id": user["user_id"]}, headers=headers)
+            self.assertEqual(limited.status_code, 429, limited.text)
+
+            stop = client.post("/workspace-watch", json={"user_id": user["user_id"], "enabled": False}, headers=headers)
+            self.assertEqual(stop.json(), {"status": "stopped", "stopped": 1})
+
+    def test_symbol_index_links_scripts_across_files(self):
+        user = self._register_and_login("symbol_user")
+        headers = self._auth_headers(user["session_token"])
+        workspace = Path(self.temp_dir) / "SymbolProject"
+        scripts_dir = workspace / "Assets" / "Scripts"
+        scripts_dir.mkdir(parents=True)
+        (scripts_dir / "EnemyHealth.cs").write_text(
+            "public class EnemyHealth : MonoBehaviour, IDamageable\n{\n"
+            "    [SerializeField] private float maxHp = 100f;\n"
+            "    public event System.Action Died;\n"
+            "    public void TakeDamage(int amount) { }\n}", encoding="utf-8")
+        (scripts_dir / "Spawner.cs").write_text(
+            "public class Spawner : MonoBehaviour\n{\n"
+            "    void Start() { var p = FindObjectOfType<PlayerCombat>(); }\n}", encoding="utf-8")
+        self.client.post("/save-workspace", json={"user_id": user["user_id"], "path": str(workspace)}, headers=headers)
+
+        res = self.client.get(f"/symbols/{user['user_id']}", params={"name": "EnemyHealth"}, headers=headers)
+        self.assertEqual(res.status_code, 200, res.text)
+        self.assertEqual(res.json()["refresh"]["parsed"], 2)
+        kinds = {(s["kind"], s["name"]) for s in res.json()["symbols"]}
+        self.assertTrue({("class", "EnemyHealth"), ("field", "maxHp"), ("event", "Died"),
+                         ("method", "TakeDamage")} <= kinds)
+
+        # Sadece değişen dosya yeniden ayrıştırılır; silinen dosya indeksten çıkar
+        (scripts_dir / "Spawner.cs").unlink()
+        (scripts_dir / "EnemyHealth.cs").write_text(
+            "public class EnemyHealth : MonoBehaviour\n{\n    public void Heal() { }\n}", encoding="utf-8")
+        refresh = self.app_main.symbol_index.refresh(str(workspace), force=True)
+        self.assertEqual((refresh["parsed"], refresh["deleted"]), (1, 1))
+
+        code = ("public class PlayerCombat : MonoBehaviour\n{\n"
+                "    void Hit(GameObject go) { go.GetComponent<EnemyHealth>().Heal(); }\n}")
+        context = self.app_main.symbol_index.context_for(str(workspace), code)
+        self.assertIn("class EnemyHealth : MonoBehaviour  (Assets/Scripts/EnemyHealth.cs:1)", context)
+        self.assertIn("void Heal()", context)
+        self.assertNotIn("TakeDamage", context)
+
+    def test_kb_mode_code_analysis_is_cached(self):
+        user = self._register_and_login("analysis_cache_user")
+        headers = self._auth_headers(user["session_token"])
+        conv_id = self._create_conversation(user["user_id"], user["session_token"])
+        code = (
+            "using UnityEngine;\npublic class Mover : MonoBehaviour\n{\n"
+            "    void Update()\n    {\n        var rb = GetComponent<Rigidbody>();\n    }\n}"
+        )
+        body = {"conversation_id": conv_id, "message": code, "language": "tr",
+                "user_id": user["user_id"], "use_kb": True}
+
+        first = self.client.post("/chat", json=body, headers=headers)
+        second = self.client.post("/chat", json=body, headers=headers)
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(first.json()["content"], second.json()["content"])
+        self.assertEqual(first.json()["static_results"], second.json()["static_results"])
+
+        cache = self.client.get("/analyzer/metrics", headers=headers).json()["cache"]
+        self.assertEqual((cache["misses"], cache["hits"]["memory"]), (1, 1))
+        self.assertEqual(cache["hit_ratio"], 0.5)
+        self.assertEqual((cache["incremental"]["runs"], cache["incremental"]["sessions"]), (1, 1))
+
+        # Restart sonrası: bellek boş, sonuç SQLite katmanından gelir; eski sürüm satırları silinir
+        fresh = self.app_main.AnalysisCache(self.app_main.db)
+        self.assertEqual(fresh.static_results(code), first.json()["static_results"])
+        self.assertEqual(fresh.stats()["hits"]["sqlite"], 1)
+        self.app_main.AnalysisCache(self.app_main.db, version="next-ruleset")
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0], 0)
+
+    def test_kb_candidate_approve_and_reject_flow(self):
+        unauthorized = self.client.get("/kb/candidates", headers=self._auth_headers("invalid-token"))
+        self.assertEqual(unauthorized.status_code, 401, unauthorized.text)
+
+        user = self._register_and_login("kb_candidate_user")
+        other_user = self._register_and_login("kb_candidate_other")
+        operator = self._register_and_login("kb_operator")
+        os.environ["KB_OPERATOR_USER_IDS"] = str(operator["user_id"])
+        headers = self._auth_headers(user["session_token"])
+        operator_headers = self._auth_headers(operator["session_token"])
+        db = self.app_main.db
+        uid = user["user_id"]
+        response = "Boss.\n\n```csharp\npublic class BossPhaseController : MonoBehaviour { }\n```"
+        db.record_kb_candidate(uid, "boss faz gecisi savasi sistemi yaz", "boss savaşı faz geçişi sistemi yaz", response, 8.0)
+        self.assertEqual(
+            db.record_kb_candidate(uid, "boss faz gecisi savasi sistemi yaz", "boss savaşı faz geçişi sistemi yaz", response, 9.0), 2
+        )
+        db.record_kb_candidate(uid, "kapi animasyonu", "kapı animasyonu", response, 8.5)
+        # Başka kullanıcının aynı istemi ayrı satırdır: sayaç ve içerik karışmaz
+        self.assertEqual(
+            db.record_kb_candidate(other_user["user_id"], "kapi animasyonu", "kapı animasyonu (gizli)", response, 9.5), 1
+        )
+
+        listed = self.client.get("/kb/candidates", headers=headers).json()["candidates"]
+        self.assertEqual(len(listed), 1)  # tek kez görülen aday listelenmez
+        candidate = listed[0]
+        self.assertEqual((candidate["hit_count"], candidate["critic_score"]), (2, 9.0))
+        other_listed = self.client.get("/kb/candidates", headers=self._auth_headers(other_user["session_token"]))
+        self.assertEqual(other_listed.json()["candidates"], [])
+        self.assertEqual(len(self.client.get("/kb/candidates", headers=operator_headers).json()["candidates"]), 1)
+
+        # Onay / red paylaşılan KB'yi değiştirir: sadece operatör
+        for action in ("approve", "reject"):
+            forbidden = self.client.post(f"/kb/candidates/{candidate['id']}/{action}", headers=headers)
+            self.assertEqual(forbidden.status_code, 403, forbidden.text)
+
+        approved = self.client.post(f"/kb/candidates/{candidate['id']}/approve", headers=operator_headers)
+        self.assertEqual(approved.status_code, 200, approved.text)
+        self.assertEqual(approved.json()["entry_id"], candidate["entry"]["id"])
+        self.assertEqual(self.app_main.kb.lookup("boss savaşı faz geçişi sistemi yaz", intent="generation").entry_id,
+                         candidate["entry"]["id"])
+
+        again = self.client.post(f"/kb/candidates/{candidate['id']}/approve", headers=operator_headers)
+        self.assertEqual(again.status_code, 409, again.text)
+        missing = self.client.post("/kb/candidates/9999/reject", headers=operator_headers)
+        self.assertEqual(missing.status_code, 404, missing.text)
+        for pending in db.get_kb_candidates(min_hits=1):
+            rejected = self.client.post(f"/kb/candidates/{pending['id']}/reject", headers=operator_headers)
+            self.assertEqual(rejected.status_code, 200, rejected.text)
+        self.assertEqual(db.get_kb_candidates(min_hits=1), [])
 
 if __name__ == "__main__":
     unittest.main()
@@ -738,7 +738,7 @@ export default function HomePage() {
     }
   };
 
-  const sendMessage = async (overrideMessage?: string) => {
+  const sendMessage = async (overrideMessage?: string, forceAi: boolean = false) => {
     const inputToUse = (overrideMessage || chatInput).trim();
     if (!inputToUse || !user) return;
 
@@ -801,6 +801,7 @@ export default function HomePage() {
         mode: appMode,
         use_kb: aiConfig.provider_type === 'kb',
         use_or_for_coder: gpt54OrToggled,
+        force_ai: forceAi,
       }, { timeout: 900000 }); // 900 saniye timeout (backend limiti ile eşleştirildi)
 
       clearInterval(progressInterval);
@@ -1934,7 +1935,7 @@ export default function HomePage() {
                         )}
                         {/* AI Yanıt İçeriği */}
                         <div className="prose prose-invert max-w-none text-[13px] leading-relaxed prose-p:my-2 prose-headings:my-3 prose-ul:my-2 prose-li:my-0.5">
-                          <MarkdownRenderer content={msg.content.replace('<!-- SCOPE_WARNING_ACTIVE -->', '')} workspacePath={workspacePath} onExportToUnity={handleExportToUnity} />
+                          <MarkdownRenderer content={msg.content.replace('<!-- SCOPE_WARNING_ACTIVE -->', '').replace('<!-- KB_SHORTCUT -->', '')} workspacePath={workspacePath} onExportToUnity={handleExportToUnity} />
                         </div>
                         {/* Scope Warning Butonları */}
                         {msg.content.includes('SCOPE_WARNING_ACTIVE') && msgIdx === messages.length - 1 && !loading && (
@@ -1953,6 +1954,17 @@ export default function HomePage() {
                             </button>
                           </div>
                         )}
+                        {/* KB Ön Geçişi: Aynı isteği AI ile yeniden üret */}
+                        {msg.content.includes('<!-- KB_SHORTCUT -->') && msgIdx === messages.length - 1 && msgIdx > 0 && messages[msgIdx - 1].role === 'user' && !loading && (
+                          <div className="flex gap-2 mt-3">
+                            <button
+                              onClick={() => sendMessage(messages[msgIdx - 1].content, true)}
+                              className="flex items-center gap-1.5 px-3 py-1.5 rounded-lg bg-blue-600/20 border border-blue-500/30 text-blue-300 text-[12px] font-medium hover:bg-blue-600/35 transition-colors"
+                            >
+                              🤖 AI ile Yeniden Üret
+                            </button>
+                          </div>
+                        )}
                       </div>
                     </div>
                   ) : (